@@ -0,0 +1,110 @@
+import numpy as np
+
+
+# --- 🧭 APPROXIMATE NEAREST NEIGHBORS (IVF) ---
+
+class IVFIndex:
+
+    """
+    Inverted-file (IVF) index για approximate kNN πάνω στον weighted feature space.
+
+    Οι γραμμές χωρίζονται σε `n_lists` clusters με k-means (spherical για cosine).
+    Ένα query ψάχνει μόνο στα `n_probe` πιο κοντινά clusters, οπότε το κόστος
+    είναι ~ n_probe / n_lists του brute-force.
+
+    Knobs ακρίβειας / ταχύτητας:
+        n_lists: Περισσότερα lists -> μικρότερα lists, γρηγορότερα queries, χαμηλότερο recall
+        n_probe: Περισσότερα probes -> υψηλότερο recall, πιο αργά queries
+    """
+
+    def __init__(self, matrix, metric='euclidean', n_lists=None, n_probe=8,
+                 n_iter=10, train_size=50_000, seed=0):
+        self.matrix = matrix
+        self.metric = metric
+        self.n_probe = n_probe
+
+        n = len(matrix)
+        if n_lists is None:
+            n_lists = int(np.sqrt(n))
+        self.n_lists = int(np.clip(n_lists, 1, max(n, 1)))
+
+        rng = np.random.default_rng(seed)
+
+        # Training σε δείγμα (το k-means σε 10^6 γραμμές δεν χρειάζεται όλα τα δεδομένα)
+        sample = matrix[rng.choice(n, min(n, train_size), replace=False)] if n else matrix
+        self.centroids = self._kmeans(sample, n_iter, rng)
+
+        # Inverted lists: γραμμές ταξινομημένες ανά cluster + offsets
+        assignment = self._assign(matrix)
+        self.order = np.argsort(assignment, kind='stable')
+        self.offsets = np.searchsorted(assignment[self.order], np.arange(self.n_lists + 1))
+
+    def _centroid_scores(self, vectors, centroids=None):
+
+        """
+        'Απόσταση' κάθε vector από κάθε centroid (μικρότερο = πιο κοντά).
+        """
+
+        centroids = self.centroids if centroids is None else centroids
+
+        if self.metric == 'cosine':
+            return -(vectors @ centroids.T)
+
+        # Το ||v||² είναι κοινό ανά γραμμή, δεν επηρεάζει τη σειρά
+        return np.einsum('ij,ij->i', centroids, centroids)[None, :] - 2 * (vectors @ centroids.T)
+
+    def _normalize(self, centroids):
+        if self.metric != 'cosine':
+            return centroids
+
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return centroids / norms
+
+    def _kmeans(self, sample, n_iter, rng):
+        n_lists = min(self.n_lists, len(sample)) or 1
+        centroids = self._normalize(sample[rng.choice(len(sample), n_lists, replace=False)].copy())
+
+        for _ in range(n_iter):
+            labels = np.argmin(self._centroid_scores(sample, centroids), axis=1)
+
+            counts = np.bincount(labels, minlength=n_lists)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+
+            empty = counts == 0
+            centroids[~empty] = sums[~empty] / counts[~empty, None]
+
+            # Άδεια clusters -> νέο τυχαίο σημείο
+            if empty.any():
+                centroids[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+
+            centroids = self._normalize(centroids)
+
+        self.n_lists = n_lists
+        return centroids
+
+    def _assign(self, matrix, block_size=65_536):
+        assignment = np.empty(len(matrix), dtype=np.int64)
+
+        for start in range(0, len(matrix), block_size):
+            block = matrix[start:start + block_size]
+            assignment[start:start + block_size] = np.argmin(self._centroid_scores(block), axis=1)
+
+        return assignment
+
+    def candidates(self, vector, min_candidates=1, n_probe=None):
+
+        """
+        Οι γραμμές των n_probe πιο κοντινών lists. Αν δεν φτάνουν τα min_candidates,
+        ανοίγουν επιπλέον lists μέχρι να φτάσουν.
+        """
+
+        n_probe = self.n_probe if n_probe is None else n_probe
+        probe_order = np.argsort(self._centroid_scores(vector[None, :])[0])
+
+        sizes = (self.offsets[1:] - self.offsets[:-1])[probe_order]
+        needed = int(np.searchsorted(np.cumsum(sizes), min_candidates)) + 1
+        probes = probe_order[:max(n_probe, needed)]
+
+        return np.concatenate([self.order[self.offsets[p]:self.offsets[p + 1]] for p in probes])
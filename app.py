@@ -1,17 +1,20 @@
+import html
+import os
+from collections import OrderedDict
+
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.metrics.pairwise import cosine_similarity, euclidean_distances
 
+import metrics
 from sonar import (
     load_and_prep_data,
-    find_similar_players_gui,
-    classify_player_role,
-    get_weights_by_role,
-    league_weights
+    prep_cache_key,
+    similarity_scores,
+    SimilarityEngine,
+    NameIndex,
+    BrowseIndex,
+    DEFAULT_DIVERSITY,
+    WEIGHT_PROFILES
 )
 
 
@@ -87,6 +90,13 @@ def local_css():
     }
     
     /* ===== PLAYER GRID CARD (Browse) ===== */
+    .player-grid {
+        display: grid;
+        grid-template-columns: repeat(4, 1fr);
+        gap: 16px;
+        margin-bottom: 16px;
+    }
+    
     .player-grid-card {
         background: #1E1E1E;
         padding: 16px;
@@ -115,6 +125,11 @@ def local_css():
         font-size: 14px;
     }
     
+    .player-grid-card .grid-rank {
+        color: #00D9FF;
+        font-size: 12px;
+    }
+    
     /* ===== STATS BOX ===== */
     .stat-box {
         background: #1E1E1E;
@@ -243,14 +258,116 @@ def local_css():
 # ============================================
 
 
-@st.cache_data
+DATA_FILE = 'perfect_merge.csv'
+
+# Τα αποτελέσματα ομοιότητας υπολογίζονται πάντα για το max του slider και κόβονται
+MAX_SIMILAR = 20
+
+# Πόσα (παίκτης, αλγόριθμος) κρατάει το memo κάθε session
+SIMILAR_CACHE_SIZE = 32
+
+# Κάρτες ανά σελίδα στο browse (6 σειρές των 4)
+BROWSE_PAGE_SIZE = 24
+
+
+@st.cache_resource
 def load_cached_data():
     
     """
-    Φορτώνει τα δεδομένα με caching για performance.
+    Φορτώνει τα δεδομένα μία φορά (κοινά για όλα τα sessions, χωρίς αντίγραφο ανά rerun).
     """
     
-    return load_and_prep_data('perfect_merge.csv')
+    return load_and_prep_data(DATA_FILE)
+
+
+@st.cache_resource
+def load_dataset_version():
+
+    """
+    Έκδοση του dataset για τα κλειδιά του memo (ίδιο κλειδί με το prepared cache).
+    """
+
+    return prep_cache_key(DATA_FILE) if os.path.isfile(DATA_FILE) else DATA_FILE
+
+
+@st.cache_resource
+def load_engine():
+    
+    """
+    Χτίζει το SimilarityEngine μία φορά (κοινό για όλα τα sessions).
+    """
+    
+    return SimilarityEngine(load_cached_data())
+
+
+@st.cache_resource
+def load_name_index():
+    
+    """
+    Χτίζει το NameIndex (accent folding, prefixes, trigrams) μία φορά.
+    """
+    
+    return NameIndex(load_cached_data()['Player'])
+
+
+@st.cache_resource
+def load_browse_index():
+    
+    """
+    Χτίζει το BrowseIndex (bitmaps ρόλων/λιγκών, προταξινομημένες στατιστικές) μία φορά.
+    """
+    
+    return BrowseIndex(load_cached_data())
+
+
+def similar_players(target, algorithm, top_n, filters=None, profile=None):
+
+    """
+    Οι top_n παρόμοιοι του target (και η συνεισφορά κάθε feature, βλ. contributions)
+    από ένα LRU memo του session, με κλειδί
+    (έκδοση dataset, Player_ID, αλγόριθμος, k, φίλτρα, προφίλ βαρών και ο ορισμός του).
+    Τα φίλτρα (βλ. FILTER_KEYS) εφαρμόζονται πριν το top-k μέσα στο engine και το
+    profile (default: ο ρόλος του target) διαλέγει τα βάρη. Οι γείτονες (θέσεις + αποστάσεις)
+    υπολογίζονται μία φορά για k = MAX_SIMILAR: τα πρώτα n είναι ακριβώς το top-n
+    (και με diversity), αρκεί το score να βγει από τις n αποστάσεις (median του euclidean).
+    """
+
+    engine = load_engine()
+    cache = st.session_state.setdefault('similar_cache', OrderedDict())
+    filters = {name: value for name, value in (filters or {}).items() if value is not None}
+    signature = WEIGHT_PROFILES.signature(profile or target['Role'])
+    key = (load_dataset_version(), target['Player_ID'], algorithm, MAX_SIMILAR, tuple(sorted(filters.items())),
+           profile, signature)
+
+    neighbors = cache.get(key)
+    if neighbors is not None:
+        cache.move_to_end(key)
+        metrics.count('app.similar_cache', result='hit')
+    else:
+        metrics.count('app.similar_cache', result='miss')
+        row = engine.locate(target['Player_ID'])
+        if row is None:
+            return None, None
+
+        with st.spinner("🔍 Searching for similar players..."):
+            indices, distances = engine.kneighbors(row, algorithm, MAX_SIMILAR, profile, DEFAULT_DIVERSITY, filters)
+
+            # Το μερίδιο κάθε feature για όλους τους γείτονες μαζί (ένα vectorized πέρασμα)
+            contributions = None if indices is None else engine.contributions(row, indices, algorithm, profile)
+            neighbors = (indices, distances, contributions)
+
+        cache[key] = neighbors
+        while len(cache) > SIMILAR_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    indices, distances, contributions = neighbors
+    if indices is None:
+        return None, None
+
+    results = engine.df.iloc[indices[:top_n]].copy()
+    results['Similarity_Score'] = similarity_scores(distances[:top_n], algorithm)
+
+    return results, None if contributions is None else contributions.iloc[:top_n]
 
 
 # ============================================
@@ -342,6 +459,45 @@ def render_results_table(results):
         hide_index=True        
     )
     
+def render_contributions(results, contributions, algorithm):
+
+    """
+    Stacked bar ανά παίκτη: πόσο μετράει κάθε feature στην ομοιότητα με τον target
+    (μερίδιο στο cosine dot product ή στην euclidean squared distance).
+    """
+
+    if contributions is None or len(contributions) == 0:
+        return
+
+    import plotly.express as px
+
+    shares = contributions.iloc[:len(results)] * 100
+    shares.index = [f"#{rank} {player}" for rank, player in enumerate(results['Player'], 1)]
+
+    long = shares.rename_axis('Player').reset_index().melt(id_vars='Player', var_name='Feature', value_name='Share')
+
+    if algorithm == 'cosine':
+        st.markdown("#### ⚖️ Why Similar? (share of the cosine match per feature)")
+    else:
+        st.markdown("#### ⚖️ Where They Differ (share of the euclidean distance per feature)")
+
+    fig = px.bar(
+        long, x='Share', y='Player', color='Feature', orientation='h',
+        template='plotly_dark',
+        labels={'Share': 'Share (%)', 'Player': ''},
+    )
+    fig.update_layout(
+        barmode='stack',
+        yaxis={'autorange': 'reversed'},
+        height=60 + 32 * len(shares),
+        paper_bgcolor='#0E1117',
+        plot_bgcolor='#0E1117',
+        font=dict(color='#FAFAFA')
+    )
+
+    st.plotly_chart(fig, use_container_width=True)
+
+
 def render_radar_chart(target, similar_players):
     
     """
@@ -362,7 +518,9 @@ def render_radar_chart(target, similar_players):
         st.warning("Not enough metrics available for radar chart")
         return
     
-    # Plotly radar chart
+    # Plotly radar chart (το plotly φορτώνεται μόνο όταν χρειάζεται γράφημα)
+    import plotly.graph_objects as go
+
     fig = go.Figure()
     
     colors = ['#00D9FF', '#51CF66', '#FFD43B', '#FF6B6B']
@@ -476,8 +634,27 @@ def page_home():
     if search_btn and search_query:
         st.session_state.page = "search"
         st.session_state.query = search_query
+        st.session_state.pop("player_id", None)
         st.rerun()
         
+    # Autocomplete: προτάσεις από το NameIndex (χωρίς τόνους, με typos)
+    if search_query and not search_btn:
+        suggestions = load_name_index().search(search_query, limit=5)
+        
+        if suggestions:
+            df = load_cached_data()
+            st.caption("💡 Suggestions:")
+            cols = st.columns(len(suggestions))
+            
+            for col, (row, _) in zip(cols, suggestions):
+                player = df.iloc[row]
+                with col:
+                    if st.button(f"{player['Player']} ({player['Squad']})", key=f"suggest_{row}", use_container_width=True):
+                        st.session_state.page = "search"
+                        st.session_state.query = player['Player']
+                        st.session_state.player_id = player['Player_ID']
+                        st.rerun()
+        
     st.markdown("---")
     
     # Role Browsing Section
@@ -554,23 +731,31 @@ def page_search_results():
     
     query = st.session_state.get("query", "")
 
-    # Εύρεση παίκτη(ες)
-    matches = df[df['Player'].str.contains(query, case=False, na=False)]
+    # Συγκεκριμένος παίκτης (suggestion / browse): O(1) lookup με το Player_ID
+    row = load_engine().locate(st.session_state.get("player_id", ""))
+
+    # Αλλιώς εύρεση παίκτη(ες) μέσω του NameIndex (accent-insensitive, typo-tolerant)
+    hits = [(row, NameIndex.EXACT)] if row is not None else load_name_index().search(query)
+    matches = df.iloc[[row for row, _ in hits]]
+    fuzzy = len(hits) > 0 and hits[0][1] < NameIndex.SUBSTRING
 
     if len(matches) == 0:
         st.error(f"❌ No players found matching '{query}'.")
         st.info("💡 Try searching by last name (e.g., 'Haaland' instead of  'Erling Haaland')")
         return
     
-    elif len(matches) > 1:
-        st.warning(f"👥 Found {len(matches)} players matching '{query}'. Please select:")
+    elif len(matches) > 1 or fuzzy:
+        if fuzzy:
+            st.warning(f"🤔 No exact match for '{query}'. Did you mean:")
+        else:
+            st.warning(f"👥 Found {len(matches)} players matching '{query}'. Please select:")
 
         players_options = [
             f"{row['Player']} ({row['Squad']}, {row['Age']})" for _, row in matches.iterrows()
         ]
         
-        selected = st.selectbox("Choose Player", players_options)
-        selected_idx = players_options.index(selected)
+        # Επιλογή με θέση (όχι με το label), ώστε ίδια labels να μη μπερδεύονται
+        selected_idx = st.selectbox("Choose Player", range(len(players_options)), format_func=players_options.__getitem__)
         target = matches.iloc[selected_idx]
     else:
         target = matches.iloc[0]
@@ -594,7 +779,7 @@ def page_search_results():
     # Ρυθμίσεις αλγορίθμου
     st.subheader("⚙️ Search Configuration")
 
-    col1, col2 = st.columns([2, 1])
+    col1, col2, col3 = st.columns([2, 2, 1])
 
     with col1:
         algorithm = st.selectbox(
@@ -604,17 +789,41 @@ def page_search_results():
         )
 
     with col2:
-        top_n = st.slider("Number of Similar Players", 5, 20, 10)
-
-    # Εύρεση παρόμοιων παικτών
-    with st.spinner("🔍 Searching for similar players..."):
-        results = find_similar_players_gui(
-            df=df,
-            target_player=target,
-            algorithm=algorithm,
-            n_neighbors=top_n
+        # Τα βάρη: του ρόλου του παίκτη (default) ή οποιοδήποτε built-in / custom προφίλ
+        profile = st.selectbox(
+            "⚖️ Weight Profile",
+            [None] + WEIGHT_PROFILES.names,
+            format_func=lambda name: f"Player's role ({target['Role']})" if name is None else name
         )
 
+    with col3:
+        top_n = st.slider("Number of Similar Players", 5, MAX_SIMILAR, 10)
+
+    # Φίλτρα πάνω στους υποψήφιους (default: κανένα)
+    with st.expander("🔧 Filters"):
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            age_range = st.slider("👤 Age Range", 16, 40, (16, 40), key="similar_age")
+
+        with col2:
+            min_minutes = st.number_input("⏱️ Min Minutes Played", 0, 3000, 0, step=50, key="similar_minutes")
+
+        with col3:
+            league_column = 'League_Clean' if 'League_Clean' in df.columns else 'Comp'
+            excluded_leagues = st.multiselect(
+                "🚫 Exclude Leagues", sorted(df[league_column].dropna().unique().tolist()), key="similar_leagues"
+            )
+
+    filters = {
+        'age': None if age_range == (16, 40) else age_range,
+        'min_minutes': min_minutes or None,
+        'exclude_league': tuple(excluded_leagues) or None,
+    }
+
+    # Εύρεση παρόμοιων παικτών (slider / tabs / expanders δεν ξαναϋπολογίζουν)
+    results, contributions = similar_players(target, algorithm, top_n, filters, profile)
+
     if results is None or len(results) == 0:
         st.warning("❌ No similar players found.")
         return
@@ -647,6 +856,8 @@ def page_search_results():
         # Bar chart για similarity scores
         st.markdown("#### 📊 Similarity Scores")
 
+        import plotly.express as px
+
         fig_bar = px.bar(
             results.head(10),
             x='Player',
@@ -668,10 +879,16 @@ def page_search_results():
         st.plotly_chart(fig_bar, use_container_width=True)
 
     with tab3:
+        render_contributions(results.head(10), contributions, algorithm)
+
         st.markdown("#### 📋 Detailed Players Profiles")
 
         for idx, (_, row) in enumerate(results.head(10).iterrows()):
             with st.expander(f"#{idx + 1} {row['Player']} - {row['Squad']} ({row['Similarity_Score']:.1f}% similar)"):
+                if contributions is not None:
+                    top = contributions.iloc[idx].sort_values(ascending=False).head(3)
+                    st.caption("⚖️ Why similar: " + ", ".join(f"{feat} {share:.0%}" for feat, share in top.items()))
+
                 col1, col2, col3 = st.columns(3)
 
                 with col1:
@@ -723,10 +940,9 @@ def page_browse_role():
         st.error("❌ Failed to load data.")
         return
     
-    # Φιλτράρουμε για τον επιλεγμένο ρόλο
-    filtered = df[df['Role'] == role]
+    browse_index = load_browse_index()
 
-    st.caption(f"📊 {len(filtered)} players found")
+    st.caption(f"📊 {browse_index.role_counts.get(role, 0)} players found")
 
     st.markdown("---")
 
@@ -760,55 +976,145 @@ def page_browse_role():
     with col4:
         min_minutes = st.number_input("⏱️ Min Minutes Played", 0, 3000, 450, step=50)
         
-    # Εφαρμογή φίλτρων
-    if league_filter != 'Top 5 Leagues':
-        if 'League_Clean' in filtered.columns:
-            filtered = filtered[filtered['League_Clean'] == league_filter]
-        elif 'Comp' in filtered.columns:
-            filtered = filtered[filtered['Comp'] == league_filter]
-            
-    filtered = filtered[
-        (filtered['Age'] >= age_range[0]) &
-        (filtered['Age'] <= age_range[1]) &
-        (filtered['Min'] >= min_minutes)
-    ]
-    
-    filtered = filtered.sort_values(by=sort_options[sort_by], ascending=False)
+    # Εφαρμογή φίλτρων: τομή bitmaps του BrowseIndex + έτοιμη σειρά ταξινόμησης
+    rows = browse_index.rows(
+        role=role,
+        league=None if league_filter == 'Top 5 Leagues' else league_filter,
+        age_range=age_range,
+        min_minutes=min_minutes,
+        sort=sort_options[sort_by]
+    )
     
     st.markdown("---")
     
     # Εμφάνιση αποτελεσμάτων σε grid
-    st.subheader(f"📋 {len(filtered)} Players")
+    st.subheader(f"📋 {len(rows)} Players")
     
-    if len(filtered) == 0:
+    if len(rows) == 0:
         st.warning("❌ No players found with the selected filters.")
         return
     
-    # Grid layout (4 columns per row)
-    cols_per_row = 4
-    
-    for i in range(0, len(filtered), cols_per_row):
-        cols = st.columns(cols_per_row)
-        
-        for j, col in enumerate(cols):
-            if i + j < len(filtered):
-                player = filtered.iloc[i + j]
-                
-                with col:
-                    st.markdown(f"""
-                    <div class="player-grid-card">
-                        <h4>{player['Player']}</h4>
-                        <p>{player['Squad']}</p>
-                        <p><strong>{int(player['Gls'])}G</strong> | {int(player['Ast'])}A</p>
-                        <p>{player['SoT%']:.1f}% SoT</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    if st.button("🔎 View", key=f"view_{i+j}", use_container_width=True):
-                        st.session_state.page = "search"
-                        st.session_state.query = player['Player']
-                        st.rerun()
-                        
+    # Σελιδοποίηση: HTML και widgets μόνο για την τρέχουσα σελίδα (νέα φίλτρα -> σελίδα 1)
+    filters = (role, league_filter, age_range, sort_by, min_minutes)
+    if st.session_state.get("browse_filters") != filters:
+        st.session_state.browse_filters = filters
+        st.session_state.browse_page = 0
+
+    n_pages = (len(rows) + BROWSE_PAGE_SIZE - 1) // BROWSE_PAGE_SIZE
+    page = min(st.session_state.get("browse_page", 0), n_pages - 1)
+    start = page * BROWSE_PAGE_SIZE
+    visible = df.iloc[rows[start:start + BROWSE_PAGE_SIZE]]
+
+    st.markdown(render_player_grid(visible, start), unsafe_allow_html=True)
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+
+    with col1:
+        if st.button("⬅️ Previous", disabled=page == 0, use_container_width=True):
+            st.session_state.browse_page = page - 1
+            st.rerun()
+
+    with col2:
+        st.caption(f"Page {page + 1} of {n_pages} · players {start + 1}-{start + len(visible)} of {len(rows)}")
+
+    with col3:
+        if st.button("Next ➡️", disabled=page == n_pages - 1, use_container_width=True):
+            st.session_state.browse_page = page + 1
+            st.rerun()
+
+    # Ένα selectbox για τους παίκτες της σελίδας αντί για ένα button ανά κάρτα
+    col1, col2 = st.columns([3, 1])
+
+    with col1:
+        choice = st.selectbox(
+            "🔎 View player",
+            range(len(visible)),
+            format_func=lambda i: f"#{start + i + 1} {visible['Player'].iloc[i]} ({visible['Squad'].iloc[i]})"
+        )
+
+    with col2:
+        st.write("")
+        if st.button("🔎 View", use_container_width=True):
+            st.session_state.page = "search"
+            st.session_state.query = visible['Player'].iloc[choice]
+            st.session_state.player_id = visible['Player_ID'].iloc[choice]
+            st.rerun()
+
+
+def render_player_grid(players, offset=0):
+
+    """
+    Οι κάρτες μιας σελίδας ως ένα HTML block (ένα element αντί για ένα ανά παίκτη).
+    """
+
+    cards = ''.join(
+        f'<div class="player-grid-card">'
+        f'<span class="grid-rank">#{offset + i + 1}</span>'
+        f'<h4>{html.escape(str(name))}</h4>'
+        f'<p>{html.escape(str(squad))}</p>'
+        f'<p><strong>{int(goals)}G</strong> | {int(assists)}A</p>'
+        f'<p>{accuracy:.1f}% SoT</p>'
+        f'</div>'
+        for i, (name, squad, goals, assists, accuracy) in enumerate(zip(
+            players['Player'], players['Squad'], players['Gls'], players['Ast'], players['SoT%']
+        ))
+    )
+
+    return f'<div class="player-grid">{cards}</div>'
+
+
+# ============================================
+# 📈 DEBUG PANEL (HOT-PATH METRICS)
+# ============================================
+
+
+def debug_enabled():
+
+    """
+    Το metrics panel εμφανίζεται με ?debug=1 στο URL ή με TRIDENT_DEBUG=1.
+    """
+
+    return st.query_params.get("debug") == "1" or os.environ.get("TRIDENT_DEBUG") == "1"
+
+
+def render_metrics_panel():
+
+    """
+    Sidebar panel με p50/p95/p99 ανά στάδιο (load, prep, engine, search, render).
+    """
+
+    snapshot = metrics.snapshot()
+
+    with st.sidebar.expander("📈 Performance Metrics", expanded=True):
+        if not metrics.REGISTRY.enabled:
+            st.info("Metrics are disabled (TRIDENT_METRICS=0).")
+            return
+
+        timers = pd.DataFrame([
+            {
+                'Metric': timer['name'],
+                'Labels': ', '.join(f"{key}={value}" for key, value in timer['labels'].items()),
+                'Count': timer['count'],
+                'p50 (ms)': timer['p50_ms'],
+                'p95 (ms)': timer['p95_ms'],
+                'p99 (ms)': timer['p99_ms'],
+            }
+            for timer in snapshot['timers']
+        ])
+
+        if len(timers):
+            st.dataframe(timers, hide_index=True, use_container_width=True)
+
+        for counter in snapshot['counters']:
+            labels = ', '.join(f"{key}={value}" for key, value in counter['labels'].items())
+            st.caption(f"{counter['name']} ({labels}): {counter['value']}" if labels else f"{counter['name']}: {counter['value']}")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("JSON", metrics.to_json(), "trident_metrics.json", "application/json")
+        with col2:
+            st.download_button("Prometheus", metrics.to_prometheus(), "trident_metrics.prom", "text/plain")
+
 
 # ============================================
 # 🚀 MAIN APP ROUTER
@@ -828,12 +1134,16 @@ def main():
         st.session_state.page = "home"
     
     # Route to appropriate page
-    if st.session_state.page == "home":
-        page_home()
-    elif st.session_state.page == "search":
-        page_search_results()
-    elif st.session_state.page == "browse":
-        page_browse_role()
+    with metrics.timer('app.page_render', page=st.session_state.page):
+        if st.session_state.page == "home":
+            page_home()
+        elif st.session_state.page == "search":
+            page_search_results()
+        elif st.session_state.page == "browse":
+            page_browse_role()
+
+    if debug_enabled():
+        render_metrics_panel()
         
         
 
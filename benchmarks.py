@@ -0,0 +1,661 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import parallel
+import sonar
+import synthetic
+
+
+# --- ⏱️ BENCHMARK HELPERS ---
+
+def measure(func, repeat=5):
+
+    """
+    Τρέχει τη func `repeat` φορές και επιστρέφει τον καλύτερο χρόνο (σε ms).
+    """
+
+    best = float('inf')
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    return best * 1000
+
+
+def load_quiet(path='perfect_merge.csv'):
+
+    """
+    Φορτώνει το prepared dataset χωρίς τα print του load_and_prep_data.
+    """
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return sonar.load_and_prep_data(path)
+
+
+def scale_frame(df, scale, jitter=0.0, seed=0):
+
+    """
+    Πολλαπλασιάζει τις γραμμές του df (x scale) για μετρήσεις σε μεγαλύτερο όγκο.
+    Με jitter > 0 τα αριθμητικά stats παίρνουν ±jitter θόρυβο, ώστε τα αντίγραφα να μην είναι ίδια.
+    """
+
+    if scale > 1:
+        df = pd.concat([df] * scale, ignore_index=True)
+
+    if jitter > 0:
+        rng = np.random.default_rng(seed)
+        numeric = df.select_dtypes('number').columns.difference(['Age', 'Born', 'Rk'])
+        df = df.copy()
+        df[numeric] = df[numeric] * rng.uniform(1 - jitter, 1 + jitter, (len(df), len(numeric)))
+
+    return df
+
+
+# --- 🧠 ROLE CLASSIFICATION ---
+
+def bench_classification(df, repeat=5):
+
+    """
+    Row-wise classify_player_role (df.apply) vs vectorized classify_player_roles.
+    """
+
+    rowwise_ms = measure(lambda: df.apply(sonar.classify_player_role, axis=1), repeat)
+    vectorized_ms = measure(lambda: sonar.classify_player_roles(df), repeat)
+
+    identical = bool((df.apply(sonar.classify_player_role, axis=1) == sonar.classify_player_roles(df)).all())
+
+    return {
+        'benchmark': 'classification',
+        'rows': len(df),
+        'rowwise_ms': round(rowwise_ms, 3),
+        'vectorized_ms': round(vectorized_ms, 3),
+        'speedup': round(rowwise_ms / vectorized_ms, 1) if vectorized_ms > 0 else None,
+        'identical': identical,
+    }
+
+
+# --- 💾 COLD START (PREPARED CACHE) ---
+
+STARTUP_SCRIPTS = {
+    'sonar.py': "import sonar; sonar.load_and_prep_data('perfect_merge.csv')",
+    'app.py': "import app; app.load_cached_data()",
+}
+
+
+def bench_startup(path='perfect_merge.csv', repeat=3):
+
+    """
+    Χρόνος εκκίνησης (νέο process: import + φόρτωση δεδομένων) για sonar.py και app.py,
+    χωρίς cache (CSV + prep) και με έτοιμο prepared cache.
+    Τρέχει σε προσωρινό φάκελο με αντίγραφο του CSV, ώστε να μην πειράζει το δικό σας cache.
+    """
+
+    results = []
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    work_dir = tempfile.mkdtemp(prefix='trident_bench_')
+    cache_dir = os.path.join(work_dir, sonar.CACHE_DIR_NAME)
+
+    shutil.copy(path, os.path.join(work_dir, 'perfect_merge.csv'))
+    env = dict(os.environ, PYTHONPATH=repo_dir)
+
+    try:
+        for entry, script in STARTUP_SCRIPTS.items():
+            run = lambda: subprocess.run(
+                [sys.executable, '-c', script], cwd=work_dir, env=env,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True
+            )
+
+            def cold():
+                shutil.rmtree(cache_dir, ignore_errors=True)
+                run()
+
+            cold_ms = measure(cold, repeat)
+            run()  # ζέσταμα του cache
+            warm_ms = measure(run, repeat)
+
+            results.append({
+                'benchmark': 'startup',
+                'entry': entry,
+                'cold_ms': round(cold_ms, 1),
+                'cached_ms': round(warm_ms, 1),
+            })
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+
+# --- 📦 IMPORT TIME ---
+
+IMPORT_MODULES = ('cli', 'sonar', 'server', 'app')
+
+
+def parse_importtime(stderr):
+
+    """
+    Οι γραμμές του `python -X importtime`: [(module, depth, self_us, cumulative_us)].
+    """
+
+    rows = []
+
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+
+    return rows
+
+
+def bench_imports(modules=IMPORT_MODULES, repeat=3, top=5):
+
+    """
+    Χρόνος import ανά module σε νέο process (`python -X importtime`), με τα
+    πιο βαριά direct imports του. Για regressions στο startup (π.χ. ένα νέο
+    top-level import του sklearn ή του plotly).
+    """
+
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    results = []
+
+    for module in modules:
+        best = None
+
+        for _ in range(repeat):
+            completed = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                cwd=repo_dir, capture_output=True, text=True
+            )
+            if completed.returncode != 0:
+                break
+
+            # Τα children τυπώνονται πριν από τον parent: direct imports = depth 1 μετά το προηγούμενο depth 0
+            children = []
+            for name, depth, _, cumulative in parse_importtime(completed.stderr):
+                if depth == 0 and name == module:
+                    if best is None or cumulative < best[0]:
+                        best = (cumulative, children)
+                    break
+                if depth == 0:
+                    children = []
+                elif depth == 1:
+                    children.append((name, cumulative))
+
+        if best is None:
+            results.append({'benchmark': 'import', 'module': module, 'import_ms': None, 'heaviest': []})
+            continue
+
+        total, children = best
+        heaviest = sorted(children, key=lambda child: -child[1])[:top]
+
+        results.append({
+            'benchmark': 'import',
+            'module': module,
+            'import_ms': round(total / 1000, 1),
+            'heaviest': [(name, round(cumulative / 1000, 1)) for name, cumulative in heaviest],
+        })
+
+    return results
+
+
+# --- 🗜️ MEMORY FOOTPRINT (COMPACT MODE) ---
+
+def bench_memory(path='perfect_merge.csv'):
+
+    """
+    Μνήμη του raw CSV (όπως διαβάζεται) και του prepared πίνακα ανά στήλη,
+    κανονικά και σε compact mode (βλ. sonar.compact_frame).
+
+    Returns:
+        dict: raw/prepared σύνολα σε bytes και 'columns' (μία γραμμή ανά στήλη)
+    """
+
+    raw = pd.read_csv(path).memory_usage(deep=True).sum()
+    raw_compact = sonar.read_compact_csv(path).memory_usage(deep=True).sum()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        standard = sonar.memory_report(sonar.load_and_prep_data(path, use_cache=False, compact=False))
+        compact = sonar.memory_report(sonar.load_and_prep_data(path, use_cache=False, compact=True))
+
+    columns = standard.merge(compact, on='Column', how='left', suffixes=('', '_compact'))
+
+    return {
+        'raw_bytes': int(raw),
+        'raw_compact_bytes': int(raw_compact),
+        'prepared_bytes': int(standard['Bytes'].sum()),
+        'prepared_compact_bytes': int(compact['Bytes'].sum()),
+        'columns': columns,
+    }
+
+
+# --- 🧭 APPROXIMATE NEAREST NEIGHBORS ---
+
+def bench_ann(df, k=10, n_probes=(1, 2, 4, 8, 16), n_lists=None, queries=200, role='⚽ Striker', seed=0):
+
+    """
+    IVF backend vs exact: build time, query latency και recall@k ανά n_probe,
+    για cosine και euclidean (στο weighted feature space του `role`).
+    """
+
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(df), min(queries, len(df)), replace=False)
+    results = []
+
+    exact = sonar.SimilarityEngine(df, roles=[role])
+
+    for algorithm in sonar.SimilarityEngine.METRICS:
+        truth = {row: set(exact.kneighbors(row, algorithm, k, role)[0]) for row in rows}
+        exact_ms = measure(lambda: [exact.kneighbors(row, algorithm, k, role) for row in rows], 1) / len(rows)
+
+        for n_probe in n_probes:
+            engine = sonar.SimilarityEngine(df, roles=[role], backend='ivf', n_lists=n_lists, n_probe=n_probe)
+
+            start = time.perf_counter()
+            index = engine.ann_index(role, algorithm)
+            build_ms = (time.perf_counter() - start) * 1000
+
+            found = {row: engine.kneighbors(row, algorithm, k, role)[0] for row in rows}
+            query_ms = measure(lambda: [engine.kneighbors(row, algorithm, k, role) for row in rows], 1) / len(rows)
+            recall = np.mean([len(truth[row].intersection(found[row])) / max(len(truth[row]), 1) for row in rows])
+
+            results.append({
+                'benchmark': 'ann',
+                'rows': len(df),
+                'algorithm': algorithm,
+                'n_lists': index.n_lists,
+                'n_probe': n_probe,
+                'build_ms': round(build_ms, 1),
+                'query_ms': round(query_ms, 3),
+                'exact_query_ms': round(exact_ms, 3),
+                f'recall@{k}': round(float(recall), 4),
+            })
+
+    return results
+
+
+# --- 🧵 PARALLEL BUILDS ---
+
+def worker_counts(max_workers=None):
+
+    """
+    1, 2, 4, ... μέχρι τους πυρήνες του μηχανήματος (και ακριβώς αυτούς).
+    """
+
+    max_workers = max_workers or os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+
+    return counts + ([max_workers] if counts[-1] != max_workers else [])
+
+
+def bench_parallel(df, workers=None, k=10, algorithm='cosine', repeat=3):
+
+    """
+    Speedup των builds ανά αριθμό workers: πίνακες όλων των ρόλων (threads), IVF indexes
+    (threads) και neighbor table κάθε παίκτη με τα βάρη του ρόλου του (διεργασίες
+    πάνω σε shared memory). Ελέγχει και ότι τα αποτελέσματα ταυτίζονται με το σειριακό build.
+    """
+
+    engine = sonar.SimilarityEngine(df, workers=1)
+    ivf = sonar.SimilarityEngine(df, backend='ivf', workers=1)
+    roles = list(sonar.ROLES)
+    serial = engine.own_role_neighbors(k, algorithm, workers=1)
+
+    def build_ann(count):
+        ivf._ann.clear()
+        ivf.build_ann(roles, count)
+
+    steps = {
+        'profiles': lambda count: parallel.thread_map(lambda role: engine._role_matrices(role, engine.scaled), roles, count),
+        'ann': build_ann,
+        'neighbors': lambda count: engine.own_role_neighbors(k, algorithm, workers=count),
+    }
+
+    results = []
+
+    for step, build in steps.items():
+        base_ms = None
+
+        for count in worker_counts(workers):
+            build_ms = measure(lambda: build(count), 1 if step != 'profiles' else repeat)
+            base_ms = base_ms or build_ms
+
+            results.append({
+                'benchmark': 'parallel',
+                'rows': len(df),
+                'step': step,
+                'workers': count,
+                'build_ms': round(build_ms, 1),
+                'speedup': round(base_ms / build_ms, 2),
+                'efficiency': round(base_ms / build_ms / count, 2),
+            })
+
+    # Τουλάχιστον 2 workers, ώστε να ελέγχεται πάντα το process pool (και σε 1 πυρήνα)
+    identical = all(
+        np.array_equal(a, b)
+        for a, b in zip(serial, engine.own_role_neighbors(k, algorithm, workers=max(2, *worker_counts(workers))))
+    )
+
+    return results, identical
+
+
+# --- 🧪 BENCHMARK SUITE (SYNTHETIC DATA) ---
+
+SUITE_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+# Πάνω από αυτό το μέγεθος το row-wise classification (df.apply) παραλείπεται
+ROWWISE_LIMIT = 200_000
+
+# Targets του shortlist benchmark (batched query vs ένα query ανά target)
+SHORTLIST = 25
+
+
+def run_metadata():
+
+    """
+    Πληροφορίες του run (commit, εκδόσεις) για σύγκριση αποτελεσμάτων ανάμεσα σε commits.
+    """
+
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=repo_dir,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def streamlit_search(df, engine, name_index, query, algorithm='cosine', k=10):
+
+    """
+    Το data path του app.py για μία αναζήτηση (χωρίς το streamlit):
+    NameIndex -> find_similar_players_gui -> μορφοποίηση πίνακα -> CSV export.
+    """
+
+    hits = name_index.search(query)
+    if not hits:
+        return None
+
+    target = df.iloc[hits[0][0]]
+    results = sonar.find_similar_players_gui(df, target, algorithm, k, engine=engine)
+
+    display_df = results[['Player', 'Squad', 'Role', 'Gls', 'Ast', 'G/Sh', 'SoT%', 'Similarity_Score']].copy()
+    display_df['G/Sh'] = display_df['G/Sh'].apply(lambda x: f"{x:.2f}")
+    display_df['SoT%'] = display_df['SoT%'].apply(lambda x: f"{x:.1f}%")
+    display_df['Similarity'] = display_df['Similarity_Score'].apply(lambda x: f"{x:.1f}%")
+
+    return display_df, results.to_csv(index=False)
+
+
+def bench_suite_size(rows, repeat=3, queries=100, k=10, reference='perfect_merge.csv', seed=0):
+
+    """
+    Όλα τα benchmarks για ένα συνθετικό dataset `rows` γραμμών:
+    load (CSV + prep / prepared cache), classification, engine build,
+    single query, batch, diversify, shortlist (batched / blend) και το data path του Streamlit.
+
+    Returns:
+        list: Ένα dict ανά μέτρηση (χρόνοι σε ms)
+    """
+
+    results = []
+    work_dir = tempfile.mkdtemp(prefix='trident_suite_')
+    csv_path = os.path.join(work_dir, f"synthetic_{rows}.csv")
+
+    def record(benchmark, **values):
+        results.append({'benchmark': benchmark, 'rows': rows, **values})
+
+    try:
+        synthetic.generate_players(rows, reference, seed).to_csv(csv_path, index=False)
+
+        # 1️⃣ Load: CSV + prep και prepared cache
+        with contextlib.redirect_stdout(io.StringIO()):
+            cold_ms = measure(lambda: sonar.load_and_prep_data(csv_path, use_cache=False), repeat)
+            sonar.load_and_prep_data(csv_path)
+            cached_ms = measure(lambda: sonar.load_and_prep_data(csv_path), repeat)
+            df = sonar.load_and_prep_data(csv_path)
+
+        record('load', cold_ms=round(cold_ms, 2), cached_ms=round(cached_ms, 2))
+
+        # 2️⃣ Classification
+        vectorized_ms = measure(lambda: sonar.classify_player_roles(df), repeat)
+        rowwise_ms = None
+        if rows <= ROWWISE_LIMIT:
+            rowwise_ms = round(measure(lambda: df.apply(sonar.classify_player_role, axis=1), 1), 2)
+        record('classification', vectorized_ms=round(vectorized_ms, 2), rowwise_ms=rowwise_ms)
+
+        # 3️⃣ Engine build (scaling + weighted matrices όλων των ρόλων)
+        def build():
+            engine = sonar.SimilarityEngine(df)
+            for role in sonar.ROLES:
+                engine.profile(role)
+            return engine
+
+        record('engine_build', build_ms=round(measure(build, repeat), 2))
+        engine = build()
+
+        rng = np.random.default_rng(seed)
+        sample = rng.choice(len(df), min(queries, len(df)), replace=False)
+        names = df['Player'].to_numpy()
+        name_index = sonar.NameIndex(df['Player'])
+
+        for algorithm in sonar.SimilarityEngine.METRICS:
+
+            # 4️⃣ Single query (find_similar_players_gui)
+            query_ms = measure(lambda: [
+                sonar.find_similar_players_gui(df, df.iloc[row], algorithm, k, engine=engine) for row in sample
+            ], 1) / len(sample)
+            record('single_query', algorithm=algorithm, query_ms=round(query_ms, 3))
+
+            # 5️⃣ Batch: neighbor table για το δείγμα (ανά ρόλο)
+            batch_ms = measure(lambda: engine.neighbor_table(k, algorithm, roles=['⚽ Striker'], rows=sample), 1)
+            record('batch', algorithm=algorithm, per_player_ms=round(batch_ms / len(sample), 3))
+
+            # 6️⃣ Diversify: μέσα στο top-k (max 4 ανά λίγκα, όπως CLI / Streamlit)
+            diversify_ms = measure(lambda: [
+                engine.kneighbors(int(row), algorithm, k, diversity=sonar.DEFAULT_DIVERSITY) for row in sample
+            ], 1) / len(sample)
+            record('diversify', algorithm=algorithm, per_query_ms=round(diversify_ms, 3))
+
+            # 7️⃣ Shortlist: SHORTLIST targets σε ένα batched query vs ένα query ανά target
+            shortlist = sample[:SHORTLIST]
+            singles_ms = measure(lambda: [engine.kneighbors(int(row), algorithm, k) for row in shortlist], repeat)
+            shortlist_ms = measure(lambda: engine.kneighbors_batch(shortlist, algorithm, k), repeat)
+            blend_ms = measure(lambda: engine.kneighbors_blend(shortlist[:3], None, algorithm, k), repeat)
+            record('shortlist', algorithm=algorithm, targets=len(shortlist), singles_ms=round(singles_ms, 3),
+                   batch_ms=round(shortlist_ms, 3), blend_ms=round(blend_ms, 3))
+
+            # 8️⃣ Streamlit data path (search -> similar -> table)
+            app_ms = measure(lambda: [
+                streamlit_search(df, engine, name_index, names[row], algorithm, k) for row in sample
+            ], 1) / len(sample)
+            record('streamlit_path', algorithm=algorithm, per_search_ms=round(app_ms, 3))
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+
+def run_suite(sizes=SUITE_SIZES, repeat=3, queries=100, reference='perfect_merge.csv'):
+
+    """
+    Τρέχει το suite (import time + όλα τα benchmarks για κάθε μέγεθος). Το αποτέλεσμα είναι JSON-serializable
+    ({'meta': ..., 'results': [...]}) ώστε να συγκρίνεται ανάμεσα σε commits (--compare).
+    """
+
+    # Import time (χωρίς το breakdown, ώστε οι μετρήσεις να συγκρίνονται με --compare)
+    results = [
+        {name: value for name, value in result.items() if name != 'heaviest'}
+        for result in bench_imports(repeat=repeat)
+    ]
+
+    for rows in sizes:
+        print(f"🧪 {rows} rows...", file=sys.stderr)
+        results.extend(bench_suite_size(rows, repeat, queries, reference=reference))
+
+    return {'meta': run_metadata(), 'results': results}
+
+
+def result_key(result):
+
+    """
+    Ταυτότητα μιας μέτρησης: όλα τα πεδία εκτός από τους χρόνους (benchmark, rows, algorithm...).
+    """
+
+    return tuple(sorted((name, value) for name, value in result.items() if not name.endswith('_ms')))
+
+
+def compare_runs(old, new):
+
+    """
+    Σύγκριση δύο runs του suite: για κάθε κοινή μέτρηση, ο λόγος new/old ανά πεδίο *_ms.
+
+    Returns:
+        list: (benchmark, rows, details, field, old_ms, new_ms, ratio)
+    """
+
+    previous = {result_key(result): result for result in old['results']}
+    rows = []
+
+    for result in new['results']:
+        before = previous.get(result_key(result))
+        if before is None:
+            continue
+
+        details = ' '.join(
+            str(value) for name, value in result.items()
+            if name not in ('benchmark', 'rows') and not name.endswith('_ms')
+        )
+
+        for field, value in result.items():
+            if not field.endswith('_ms') or value is None or before.get(field) in (None, 0):
+                continue
+            rows.append((result['benchmark'], result['rows'], details, field, before[field], value, value / before[field]))
+
+    return rows
+
+
+# --- 🚀 MAIN ---
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="🔱 Project Trident benchmarks")
+    parser.add_argument('--data', default='perfect_merge.csv', help="Prepared dataset (CSV)")
+    parser.add_argument('--scale', type=int, default=1, help="Πολλαπλασιασμός γραμμών")
+    parser.add_argument('--repeat', type=int, default=5, help="Επαναλήψεις ανά μέτρηση")
+    parser.add_argument('--startup', action='store_true', help="Μέτρηση cold start (sonar.py / app.py)")
+    parser.add_argument('--ann', action='store_true', help="IVF backend: recall@10, latency, build time")
+    parser.add_argument('--imports', action='store_true', help="Import time ανά module (python -X importtime)")
+    parser.add_argument('--memory', action='store_true', help="Μνήμη ανά στήλη, κανονικά και σε compact mode")
+    parser.add_argument('--parallel', action='store_true', help="Speedup των builds ανά αριθμό workers (--workers)")
+    parser.add_argument('--workers', type=int, help="Μέγιστοι workers του --parallel (default: όλοι οι πυρήνες)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Θόρυβος στα stats των αντιγράφων (--scale)")
+    parser.add_argument('--suite', action='store_true', help="Πλήρες suite σε συνθετικά δεδομένα (--sizes)")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SUITE_SIZES), help="Μεγέθη του suite")
+    parser.add_argument('--queries', type=int, default=100, help="Queries ανά μέτρηση του suite")
+    parser.add_argument('-o', '--output', help="Αποθήκευση των αποτελεσμάτων του suite σε JSON")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="Σύγκριση δύο JSON του suite")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding='utf-8') as f:
+            old = json.load(f)
+        with open(args.compare[1], encoding='utf-8') as f:
+            new = json.load(f)
+
+        print(f"📊 {old['meta'].get('commit')} -> {new['meta'].get('commit')}")
+        for benchmark, rows, details, field, before, after, ratio in compare_runs(old, new):
+            print(f"   {benchmark:<15} {rows:>8} {details:<10} {field:<14} {before:>10.3f} -> {after:>10.3f} ms  ({ratio:.2f}x)")
+        sys.exit(0)
+
+    if args.imports:
+        print("📦 Import time (new process, python -X importtime)")
+        for row in bench_imports(repeat=min(args.repeat, 3)):
+            heaviest = ', '.join(f"{name} {ms:.0f}" for name, ms in row['heaviest'])
+            total = 'failed' if row['import_ms'] is None else f"{row['import_ms']:.0f} ms"
+            print(f"   {row['module']:<8} {total:>9} | {heaviest}")
+        sys.exit(0)
+
+    if args.memory:
+        report = bench_memory(args.data)
+        mb = 1 / 1e6
+
+        print(f"🗜️ Memory footprint ({args.data})")
+        print(f"   Raw CSV:   {report['raw_bytes'] * mb:8.2f} MB -> compact {report['raw_compact_bytes'] * mb:8.2f} MB")
+        print(f"   Prepared:  {report['prepared_bytes'] * mb:8.2f} MB -> compact {report['prepared_compact_bytes'] * mb:8.2f} MB\n")
+        for row in report['columns'].itertuples(index=False):
+            compact = 'dropped' if pd.isna(row.Bytes_compact) else f"{row.Dtype_compact:<9} {row.Bytes_compact * mb:8.3f} MB"
+            print(f"   {row.Column:<22} {row.Dtype:<8} {row.Bytes * mb:8.3f} MB ({row.Share:4.1f}%) -> {compact}")
+        sys.exit(0)
+
+    if args.parallel:
+        df = scale_frame(load_quiet(args.data), args.scale, args.jitter)
+        results, identical = bench_parallel(df, args.workers, repeat=args.repeat)
+
+        print(f"🧵 Parallel builds ({len(df)} rows, {os.cpu_count()} cores) | Identical to serial: {identical}")
+        for row in results:
+            print(f"   {row['step']:<10} workers={row['workers']:<3} {row['build_ms']:>10.1f} ms | "
+                  f"speedup {row['speedup']:.2f}x | efficiency {row['efficiency']:.2f}")
+        sys.exit(0)
+
+    if args.suite:
+        report = run_suite(args.sizes, min(args.repeat, 3), args.queries, args.data)
+
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"✅ Results -> {args.output}", file=sys.stderr)
+        else:
+            print(json.dumps(report, ensure_ascii=False, indent=2))
+        sys.exit(0)
+
+    df = scale_frame(load_quiet(args.data), args.scale, args.jitter)
+
+    result = bench_classification(df, args.repeat)
+
+    print(f"🧠 Role classification ({result['rows']} rows)")
+    print(f"   Row-wise (df.apply):  {result['rowwise_ms']:.2f} ms")
+    print(f"   Vectorized:           {result['vectorized_ms']:.2f} ms")
+    print(f"   Speedup:              {result['speedup']}x | Identical: {result['identical']}")
+
+    if args.startup:
+        print("\n💾 Cold start (new process: imports + data load)")
+        for row in bench_startup(args.data, repeat=min(args.repeat, 3)):
+            print(f"   {row['entry']:<10} CSV + prep: {row['cold_ms']:.0f} ms | prepared cache: {row['cached_ms']:.0f} ms")
+
+    if args.ann:
+        print(f"\n🧭 Approximate kNN (IVF) vs exact ({len(df)} rows)")
+        for row in bench_ann(df):
+            print(f"   {row['algorithm']:<9} lists={row['n_lists']:<4} probe={row['n_probe']:<3} "
+                  f"recall@10={row['recall@10']:.3f} | query {row['query_ms']:.3f} ms "
+                  f"(exact {row['exact_query_ms']:.3f} ms) | build {row['build_ms']:.0f} ms")
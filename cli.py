@@ -0,0 +1,81 @@
+import argparse
+import sys
+
+
+# --- 🚀 LIGHTWEIGHT CLI ENTRY POINT ---
+
+# Μόνο stdlib στο top level: το --help και τα λάθη στα arguments απαντούν αμέσως
+# και κάθε mode φορτώνει μόνο τα modules που χρειάζεται (sklearn μόνο όταν χτίζεται engine).
+#
+#   python cli.py Haaland -k 10            # batch
+#   python cli.py Kane Haaland --blend     # παίκτες σαν τον μέσο όρο των targets
+#   python cli.py Pedri --age-max 22 --exclude-league "Premier League"
+#   python cli.py                          # interactive
+#   python cli.py serve --port 8765        # local query server
+
+
+def build_arg_parser():
+
+    """
+    Τα arguments του sonar.py / cli.py. Χωρίς targets τρέχει το interactive mode.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="🔱 Project Trident - Player similarity search",
+        epilog="Χωρίς targets (ή --file) ξεκινάει το interactive mode."
+    )
+    parser.add_argument('targets', nargs='*', help="Παίκτες (π.χ. 'Haaland', 'Erling Haaland|Manchester City' ή Player_ID)")
+    parser.add_argument('-f', '--file', help="Αρχείο με έναν παίκτη ανά γραμμή ('-' για stdin)")
+    parser.add_argument('-a', '--algorithm', choices=['cosine', 'euclidean'], default='cosine')
+    parser.add_argument('-k', type=int, default=10, help="Πόσους παρόμοιους ανά παίκτη")
+    parser.add_argument('--diversify', action='store_true', help="Diversity (max --max-per-league ανά λίγκα)")
+    parser.add_argument('--max-per-league', type=int, default=4)
+    parser.add_argument('--max-per-squad', type=int, help="Max παίκτες ανά ομάδα (ενεργοποιεί diversity)")
+    parser.add_argument('--max-per-age-band', type=int, help="Max παίκτες ανά ηλικιακή ομάδα (ενεργοποιεί diversity)")
+    parser.add_argument('--age-min', type=float, help="Φίλτρο: μόνο παρόμοιοι με ηλικία >= AGE_MIN")
+    parser.add_argument('--age-max', type=float, help="Φίλτρο: μόνο παρόμοιοι με ηλικία <= AGE_MAX")
+    parser.add_argument('--min-minutes', type=float, help="Φίλτρο: μόνο παρόμοιοι με τουλάχιστον τόσα λεπτά")
+    parser.add_argument('--league', nargs='+', help="Φίλτρο: μόνο από αυτές τις λίγκες")
+    parser.add_argument('--exclude-league', nargs='+', help="Φίλτρο: όχι από αυτές τις λίγκες")
+    parser.add_argument('--role', nargs='+', help="Φίλτρο: μόνο αυτοί οι ρόλοι")
+    parser.add_argument('--exclude-role', nargs='+', help="Φίλτρο: όχι αυτοί οι ρόλοι")
+    parser.add_argument('--squad', nargs='+', help="Φίλτρο: μόνο από αυτές τις ομάδες")
+    parser.add_argument('--exclude-squad', nargs='+', help="Φίλτρο: όχι από αυτές τις ομάδες")
+    parser.add_argument('--profile', help="Προφίλ βαρών (όνομα ρόλου ή custom προφίλ, default: ο ρόλος κάθε target)")
+    parser.add_argument('--profiles', help="JSON με custom προφίλ βαρών (format του weight_profiles.json)")
+    parser.add_argument('--blend', action='store_true', help="Ένας συνθετικός παίκτης: ο μέσος όρος όλων των targets")
+    parser.add_argument('--weights', type=float, nargs='+', help="Βάρος ανά target για το --blend (π.χ. 2 1 1)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+    parser.add_argument('-o', '--output', help="Αρχείο εξόδου (default: stdout)")
+    parser.add_argument('--backend', choices=['exact', 'ivf'], default='exact', help="Exact ή approximate (IVF) kNN")
+    parser.add_argument('--n-probe', type=int, default=8, help="IVF: lists που ψάχνονται ανά query")
+    parser.add_argument('--data', default='perfect_merge.csv', help="Το CSV της βάσης")
+    parser.add_argument('--compact', action='store_true', default=None,
+                        help="Compact πίνακας (category strings, float32, μόνο οι απαραίτητες στήλες)")
+
+    return parser
+
+
+
+def main(argv=None):
+
+    argv = sys.argv[1:] if argv is None else list(argv)
+
+    # 🛰️ `python cli.py serve ...` -> τοπικός HTTP/JSON server
+    if argv[:1] == ['serve']:
+        import server
+        return server.main(argv[1:])
+
+    args = build_arg_parser().parse_args(argv)
+
+    import sonar
+
+    # 📦 Batch mode όταν δίνονται targets (αλλιώς interactive)
+    if args.targets or args.file:
+        return sonar.run_batch(args)
+
+    return sonar.run_interactive(args.data, args.compact)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+import argparse
+import glob
+import json
+import os
+import re
+
+import pandas as pd
+
+import sonar
+
+
+# --- 📥 MULTI-SEASON INGESTION ---
+
+# Υποστηρίζει ονόματα αρχείων όπως 2024-2025, 2024_25, 2024-25
+SEASON_PATTERN = re.compile(r'(\d{4})\s*[-_–]\s*(\d{2,4})')
+
+MANIFEST_NAME = '_manifest.json'
+
+
+def season_from_name(path):
+
+    """
+    Βρίσκει τη σεζόν από το όνομα του αρχείου (π.χ. 'fbref_2024-25.csv.gz' -> '2024-2025').
+    """
+
+    match = SEASON_PATTERN.search(os.path.basename(path))
+    if match is None:
+        return 'unknown'
+
+    start, end = match.groups()
+    if len(end) == 2:
+        end = start[:2] + end
+
+    return f"{start}-{end}"
+
+
+def season_start(season):
+
+    """
+    Το έτος έναρξης της σεζόν ('2024-2025' -> 2024), ή None.
+    """
+
+    match = re.match(r'(\d{4})', str(season))
+    return int(match.group(1)) if match else None
+
+
+def clean_league(comp):
+
+    """
+    'eng Premier League' -> 'Premier League' (ίδια λογική με το League_Clean του prep).
+    """
+
+    return comp.astype(str).str.replace(r'^[a-z]{2,3}\s+', '', regex=True)
+
+
+def partition_dir(dataset_dir, season, league):
+
+    """
+    Φάκελος του partition (season=.../league=...).
+    """
+
+    safe_league = re.sub(r'[^\w\- ]', '_', str(league))
+    return os.path.join(dataset_dir, f"season={season}", f"league={safe_league}")
+
+
+def find_source_files(source):
+
+    """
+    Επιστρέφει τα αρχεία σεζόν από φάκελο ή glob (.csv και .csv.gz).
+    """
+
+    if os.path.isdir(source):
+        files = glob.glob(os.path.join(source, '*.csv')) + glob.glob(os.path.join(source, '*.csv.gz'))
+    else:
+        files = glob.glob(source)
+
+    return sorted(files)
+
+
+def read_manifest(dataset_dir):
+
+    """
+    Το manifest του dataset: partition -> {season, league, path, rows, parts}.
+    """
+
+    manifest_file = os.path.join(dataset_dir, MANIFEST_NAME)
+
+    if not os.path.isfile(manifest_file):
+        return {}
+
+    with open(manifest_file, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def ingest_seasons(source, dataset_dir, chunksize=50_000):
+
+    """
+    Διαβάζει αρχεία σεζόν (απλά ή gzip) σε chunks και τα γράφει σε partitioned
+    dataset ανά σεζόν και λίγκα. Η μνήμη εξαρτάται από το chunksize, όχι από το μέγεθος του archive.
+
+    Args:
+        source (str): Φάκελος ή glob με αρχεία σεζόν (μορφή perfect_merge.csv)
+        dataset_dir (str): Φάκελος του partitioned dataset
+        chunksize (int): Γραμμές ανά chunk
+
+    Returns:
+        dict: Το manifest του dataset
+    """
+
+    files = find_source_files(source)
+    if not files:
+        print(f"❌ Error: Δεν βρέθηκαν αρχεία σεζόν στο '{source}'.")
+        return {}
+
+    manifest = read_manifest(dataset_dir)
+    written = set()
+
+    for path in files:
+        file_season = season_from_name(path)
+        print(f"📥 Ingesting {os.path.basename(path)} ({file_season})...")
+
+        # compression='infer' -> διαβάζει και .csv.gz
+        for chunk in pd.read_csv(path, chunksize=chunksize, compression='infer', low_memory=False):
+
+            # Τα exports του FBref επαναλαμβάνουν τη γραμμή επικεφαλίδων
+            if 'Rk' in chunk.columns:
+                chunk = chunk[chunk['Rk'].astype(str) != 'Rk']
+
+            if 'Season' not in chunk.columns:
+                chunk = chunk.assign(Season=file_season)
+
+            leagues = clean_league(chunk['Comp']) if 'Comp' in chunk.columns else 'Unknown'
+            chunk = chunk.assign(Season=chunk['Season'].astype(str), League_Partition=leagues)
+
+            for (season, league), part in chunk.groupby(['Season', 'League_Partition'], sort=False):
+                key = f"{season}/{league}"
+                target_dir = partition_dir(dataset_dir, season, league)
+
+                # Σε νέο ingest ενός partition τα παλιά parts αντικαθίστανται
+                if key not in written:
+                    os.makedirs(target_dir, exist_ok=True)
+                    for name in os.listdir(target_dir):
+                        os.remove(os.path.join(target_dir, name))
+                    manifest[key] = {
+                        'season': season,
+                        'league': league,
+                        'path': os.path.relpath(target_dir, dataset_dir),
+                        'rows': 0,
+                        'parts': 0,
+                    }
+                    written.add(key)
+
+                entry = manifest[key]
+                part_file = os.path.join(target_dir, f"part-{entry['parts']:05d}.pkl")
+                part.drop(columns='League_Partition').to_pickle(part_file)
+
+                entry['rows'] += len(part)
+                entry['parts'] += 1
+
+    with open(os.path.join(dataset_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    print(f"✅ {len(written)} partitions written ({sum(manifest[k]['rows'] for k in written)} rows)")
+
+    return manifest
+
+
+# --- 📦 PARTITION LOADING ---
+
+def select_partitions(manifest, seasons=None, leagues=None):
+
+    """
+    Επιλέγει partitions από το manifest.
+
+    Args:
+        seasons: Λίστα από labels ('2024-2025') ή tuple (από, έως) με έτη έναρξης, π.χ. (2023, 2025)
+        leagues: Λίστα από λίγκες ('Premier League', 'Serie A')
+    """
+
+    selected = []
+
+    for entry in manifest.values():
+        if leagues is not None and entry['league'] not in leagues:
+            continue
+
+        if isinstance(seasons, tuple):
+            start = season_start(entry['season'])
+            if start is None or not (seasons[0] <= start <= seasons[1]):
+                continue
+        elif seasons is not None and entry['season'] not in seasons:
+            continue
+
+        selected.append(entry)
+
+    return selected
+
+
+def load_partitions(dataset_dir, seasons=None, leagues=None):
+
+    """
+    Φορτώνει μόνο τα partitions που ζητήθηκαν (raw γραμμές, μορφή perfect_merge.csv).
+    """
+
+    frames = []
+
+    for entry in select_partitions(read_manifest(dataset_dir), seasons, leagues):
+        part_dir = os.path.join(dataset_dir, entry['path'])
+        for name in sorted(os.listdir(part_dir)):
+            frames.append(pd.read_pickle(os.path.join(part_dir, name)))
+
+    if not frames:
+        return None
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_and_prep_partitions(dataset_dir, seasons=None, leagues=None):
+
+    """
+    Φορτώνει τα επιλεγμένα partitions και τρέχει το prep (ίδια βήματα με το load_and_prep_data).
+    """
+
+    print("⏳ Loading partitions...")
+    df = load_partitions(dataset_dir, seasons, leagues)
+
+    if df is None:
+        print("❌ Error: Κανένα partition δεν ταιριάζει με τα φίλτρα.")
+        return None
+
+    print(f"📦 Loaded {len(df)} players")
+
+    return sonar.prep_player_data(df)
+
+
+# --- 🚀 MAIN ---
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="🔱 Project Trident - multi-season ingestion")
+    parser.add_argument('source', help="Φάκελος ή glob με αρχεία σεζόν (.csv / .csv.gz)")
+    parser.add_argument('dataset_dir', help="Φάκελος εξόδου (partitioned dataset)")
+    parser.add_argument('--chunksize', type=int, default=50_000, help="Γραμμές ανά chunk")
+    args = parser.parse_args()
+
+    ingest_seasons(args.source, args.dataset_dir, args.chunksize)
@@ -0,0 +1,144 @@
+import argparse
+
+import pandas as pd
+
+
+# --- 🔗 FBREF MERGE (standard_stats.csv + shooting.csv -> perfect_merge.csv) ---
+
+# Σταθερό κλειδί του join (ίδιος παίκτης σε δύο ομάδες = δύο γραμμές)
+KEYS = ['Player', 'Squad']
+
+# Οι στήλες που κρατάμε από το shooting export (με αυτή τη σειρά μπαίνουν στο τέλος)
+SHOOTING_COLUMNS = ['Sh', 'SoT', 'SoT%', 'Sh/90', 'SoT/90', 'G/Sh', 'G/SoT']
+
+# Τύπος κάθε στήλης των raw exports:
+#   'int'   -> ακέραιος, με διαχωριστικό χιλιάδων ("1,418")
+#   'float' -> δεκαδικός, κενό = NaN (π.χ. SoT% χωρίς σουτ)
+#   'age'   -> τα χρόνια από το "έτη-ημέρες" του FBref ("25-098" -> 25)
+# Οι στήλες που δεν αναφέρονται μένουν κείμενο
+STANDARD_TYPES = {
+    'Rk': 'int', 'Age': 'age', 'Born': 'int', 'MP': 'int', 'Starts': 'int', 'Min': 'float', '90s': 'float',
+    'Gls': 'int', 'Ast': 'int', 'G+A': 'int', 'G-PK': 'int', 'PK': 'int', 'PKatt': 'int', 'CrdY': 'int', 'CrdR': 'int',
+    'Gls.1': 'float', 'Ast.1': 'float', 'G+A.1': 'float', 'G-PK.1': 'float', 'G+A-PK': 'float',
+}
+
+SHOOTING_TYPES = {
+    'Rk': 'int', 'Sh': 'int', 'SoT': 'int', 'SoT%': 'float',
+    'Sh/90': 'float', 'SoT/90': 'float', 'G/Sh': 'float', 'G/SoT': 'float',
+}
+
+# Κενά που γίνονται 0 (ίδια συμπεριφορά με το merge του notebook)
+FILL_ZERO = ['Age', 'Gls', 'Ast', 'G-PK', 'PK', 'PKatt'] + SHOOTING_COLUMNS
+
+
+def parse_column(values, kind):
+
+    """
+    Μετατρέπει μια στήλη κειμένου στον τύπο της (βλ. STANDARD_TYPES).
+    Μη έγκυρες ή κενές τιμές γίνονται NaN / <NA>.
+    """
+
+    if kind == 'age':
+        values = values.str.split('-', n=1).str[0]
+    else:
+        values = values.str.replace(',', '', regex=False)
+
+    numbers = pd.to_numeric(values, errors='coerce')
+
+    return numbers.astype('Int64') if kind in ('int', 'age') else numbers.astype(float)
+
+
+def read_fbref(path, types, usecols=None):
+
+    """
+    Διαβάζει ένα FBref export σε ένα πέρασμα: όλα ως κείμενο, χωρίς τις
+    επαναλαμβανόμενες γραμμές επικεφαλίδων (Rk == 'Rk'), και μετά typed
+    μετατροπή κάθε στήλης.
+
+    Args:
+        path (str): Το CSV (ή .csv.gz)
+        types (dict): Στήλη -> τύπος ('int' / 'float' / 'age')
+        usecols (list): Μόνο αυτές οι στήλες (None = όλες)
+
+    Returns:
+        DataFrame: Οι γραμμές των παικτών με typed στήλες
+    """
+
+    df = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[''], usecols=usecols, compression='infer')
+
+    if 'Rk' in df.columns:
+        df = df[df['Rk'] != 'Rk']
+
+    typed = {col: parse_column(df[col], kind) for col, kind in types.items() if col in df.columns}
+
+    return df.assign(**typed).reset_index(drop=True)
+
+
+def hash_join(left, right, keys=KEYS):
+
+    """
+    Left join 1:1 με hash index πάνω στο κλειδί: κάθε γραμμή του left παίρνει
+    την (πρώτη) γραμμή του right με το ίδιο κλειδί, ή NaN αν δεν υπάρχει.
+    Σε αντίθεση με το pd.merge, διπλά κλειδιά στο right δεν πολλαπλασιάζουν γραμμές.
+    """
+
+    right = right.drop_duplicates(keys).set_index(keys)
+    matched = right.reindex(pd.MultiIndex.from_frame(left[keys]))
+
+    return pd.concat([left, matched.reset_index(drop=True)], axis=1)
+
+
+def merge_fbref(standard='standard_stats.csv', shooting='shooting.csv', output=None, season=None):
+
+    """
+    Το merge των δύο raw exports του FBref στη μορφή του perfect_merge.csv.
+
+    Args:
+        standard (str): Το "Standard Stats" export
+        shooting (str): Το "Shooting" export
+        output (str): Αρχείο εξόδου (None = δεν γράφεται)
+        season (str): Προαιρετικό label σεζόν (π.χ. '2025-2026') ως στήλη Season
+
+    Returns:
+        DataFrame: Το merged dataset
+    """
+
+    std = read_fbref(standard, STANDARD_TYPES)
+    shoot = read_fbref(shooting, SHOOTING_TYPES, usecols=['Rk'] + KEYS + SHOOTING_COLUMNS)
+
+    duplicates = int(shoot.duplicated(KEYS).sum())
+    if duplicates:
+        print(f"⚠️ {duplicates} διπλά κλειδιά (Player, Squad) στο {shooting}: κρατήθηκε η πρώτη γραμμή")
+
+    df = hash_join(std, shoot[KEYS + SHOOTING_COLUMNS])
+    unmatched = int(df['Sh'].isna().sum())
+
+    # Κενά -> 0 και ακέραιες στήλες χωρίς κενά πίσω σε απλό int64
+    df = df.fillna({col: 0 for col in FILL_ZERO if col in df.columns})
+    for col in df.columns:
+        if df[col].dtype == 'Int64' and not df[col].hasnans:
+            df[col] = df[col].astype('int64')
+
+    if season is not None:
+        df['Season'] = season
+
+    if output is not None:
+        df.to_csv(output, index=False)
+
+    print(f"✅ Merged {len(df)} players ({unmatched} χωρίς shooting stats)" + (f" -> {output}" if output else ""))
+
+    return df
+
+
+# --- 🚀 MAIN ---
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="🔱 Project Trident - FBref merge (standard + shooting)")
+    parser.add_argument('standard', nargs='?', default='standard_stats.csv', help="Standard Stats export")
+    parser.add_argument('shooting', nargs='?', default='shooting.csv', help="Shooting export")
+    parser.add_argument('-o', '--output', default='perfect_merge.csv', help="Αρχείο εξόδου (default: perfect_merge.csv)")
+    parser.add_argument('--season', help="Label σεζόν ως στήλη Season (π.χ. 2025-2026)")
+    args = parser.parse_args()
+
+    merge_fbref(args.standard, args.shooting, args.output, args.season)
@@ -0,0 +1,290 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+# --- 📈 HOT-PATH METRICS ---
+
+# Ενεργά by default, TRIDENT_METRICS=0 για πλήρη απενεργοποίηση
+ENABLED = os.environ.get('TRIDENT_METRICS', '1') != '0'
+
+# Τα percentiles βγαίνουν από τις τελευταίες WINDOW μετρήσεις κάθε metric
+WINDOW = 2048
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+PROMETHEUS_PREFIX = 'trident_'
+
+
+class Summary:
+
+    """
+    Χρόνοι ενός metric: σύνολα (count/sum/max) από την αρχή και
+    rolling window για p50/p95/p99.
+    """
+
+    __slots__ = ('count', 'total', 'max', 'window')
+
+    def __init__(self, window=WINDOW):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.window = deque(maxlen=window)
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        self.window.append(value)
+
+    def quantiles(self):
+        values = sorted(self.window)
+        if not values:
+            return {q: 0.0 for q in QUANTILES}
+
+        return {q: values[min(len(values) - 1, int(q * len(values)))] for q in QUANTILES}
+
+
+class MetricsRegistry:
+
+    """
+    Timers (Summary) και counters, με κλειδί (όνομα, labels). Thread-safe
+    (ο server και το Streamlit τρέχουν requests σε πολλά threads).
+    """
+
+    def __init__(self, enabled=ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._timers = {}
+        self._counters = {}
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            summary = self._timers.get(key)
+            if summary is None:
+                summary = self._timers[key] = Summary()
+            summary.observe(seconds)
+
+    def count(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+
+        """
+        Όλα τα metrics ως απλό dict (χρόνοι σε ms).
+        """
+
+        with self._lock:
+            timers = [(key, summary.count, summary.total, summary.max, summary.quantiles())
+                      for key, summary in self._timers.items()]
+            counters = list(self._counters.items())
+
+        return {
+            'timers': [
+                {
+                    'name': name,
+                    'labels': dict(labels),
+                    'count': count,
+                    'total_ms': round(total * 1000, 3),
+                    'mean_ms': round(total / count * 1000, 3) if count else 0.0,
+                    'p50_ms': round(quantiles[0.5] * 1000, 3),
+                    'p95_ms': round(quantiles[0.95] * 1000, 3),
+                    'p99_ms': round(quantiles[0.99] * 1000, 3),
+                    'max_ms': round(peak * 1000, 3),
+                }
+                for (name, labels), count, total, peak, quantiles in sorted(timers, key=lambda item: item[0])
+            ],
+            'counters': [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(counters, key=lambda item: item[0])
+            ],
+        }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=indent)
+
+    def to_prometheus(self):
+
+        """
+        Prometheus text format: κάθε timer ως summary (seconds), κάθε counter ως counter.
+        """
+
+        with self._lock:
+            timers = [(key, summary.count, summary.total, summary.quantiles()) for key, summary in self._timers.items()]
+            counters = list(self._counters.items())
+
+        lines = []
+        declared = set()
+
+        for (name, labels), count, total, quantiles in sorted(timers, key=lambda item: item[0]):
+            metric = prometheus_name(name) + '_seconds'
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} summary")
+                declared.add(metric)
+
+            for q, value in quantiles.items():
+                lines.append(f"{metric}{prometheus_labels(labels + (('quantile', q),))} {value:.9f}")
+            lines.append(f"{metric}_sum{prometheus_labels(labels)} {total:.9f}")
+            lines.append(f"{metric}_count{prometheus_labels(labels)} {count}")
+
+        for (name, labels), value in sorted(counters, key=lambda item: item[0]):
+            metric = prometheus_name(name) + '_total'
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            lines.append(f"{metric}{prometheus_labels(labels)} {value}")
+
+        return '\n'.join(lines) + '\n'
+
+
+def prometheus_name(name):
+    return PROMETHEUS_PREFIX + ''.join(ch if ch.isalnum() else '_' for ch in name)
+
+
+def prometheus_labels(labels):
+    if not labels:
+        return ''
+
+    escaped = (
+        f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for key, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+REGISTRY = MetricsRegistry()
+
+
+# --- ⏱️ INSTRUMENTATION API ---
+
+@contextmanager
+def _timer(name, labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.observe(name, time.perf_counter() - start, **labels)
+
+
+class _NullTimer:
+
+    """
+    Το timer όταν τα metrics είναι κλειστά (κανένα κόστος πέρα από το with).
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name, **labels):
+
+    """
+    with metrics.timer('similarity.query', algorithm='cosine'): ...
+    """
+
+    if not REGISTRY.enabled:
+        return _NULL_TIMER
+    return _timer(name, labels)
+
+
+def timed(name, **labels):
+
+    """
+    Decorator: χρονομετρεί κάθε κλήση της συνάρτησης (χρήσιμο όταν έχει πολλά return).
+    """
+
+    def decorate(func):
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not REGISTRY.enabled:
+                return func(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                REGISTRY.observe(name, time.perf_counter() - start, **labels)
+
+        return wrapper
+
+    return decorate
+
+
+def count(name, value=1, **labels):
+    REGISTRY.count(name, value, **labels)
+
+
+def no_lap(stage):
+
+    """
+    Lap timer που δεν κάνει τίποτα (default όταν ένα στάδιο δεν χρονομετρείται).
+    """
+
+
+def laps(name, **labels):
+
+    """
+    Lap timer για διαδοχικά στάδια: κάθε κλήση lap('stage') καταγράφει τον χρόνο
+    από την προηγούμενη κλήση ως `name` με label stage.
+
+        lap = metrics.laps('prep.stage')
+        ...
+        lap('positions')
+    """
+
+    if not REGISTRY.enabled:
+        return no_lap
+
+    last = [time.perf_counter()]
+
+    def lap(stage):
+        now = time.perf_counter()
+        REGISTRY.observe(name, now - last[0], stage=stage, **labels)
+        last[0] = now
+
+    return lap
+
+
+def enable(enabled=True):
+    REGISTRY.enabled = enabled
+
+
+def snapshot():
+    return REGISTRY.snapshot()
+
+
+def to_json(indent=2):
+    return REGISTRY.to_json(indent)
+
+
+def to_prometheus():
+    return REGISTRY.to_prometheus()
+
+
+def reset():
+    REGISTRY.reset()
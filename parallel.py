@@ -0,0 +1,182 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# --- 🧵 PARALLEL BUILDS (SHARED MEMORY) ---
+
+# Default workers των builds (profiles, IVF, neighbor tables). 1 = σειριακά όπως πριν,
+# TRIDENT_WORKERS=0 -> όσοι οι πυρήνες του μηχανήματος
+WORKERS = int(os.environ.get('TRIDENT_WORKERS', '1')) or os.cpu_count() or 1
+
+# Blocks ανά worker στο default split του neighbor table (load balancing ανάμεσα
+# σε jobs / ρόλους διαφορετικού μεγέθους)
+BLOCKS_PER_WORKER = 4
+
+
+def resolve_workers(workers=None):
+
+    """
+    Πόσοι workers: None -> WORKERS, 0 -> όλοι οι πυρήνες.
+    """
+
+    if workers is None:
+        return WORKERS
+
+    return max(1, workers or os.cpu_count() or 1)
+
+
+def thread_map(func, items, workers=None):
+
+    """
+    list(map(func, items)) σε thread pool. Για builds που είναι κυρίως numpy
+    (το GIL ελευθερώνεται) και δουλεύουν πάνω σε πίνακες της ίδιας διεργασίας.
+    """
+
+    items = list(items)
+    workers = min(resolve_workers(workers), len(items))
+
+    if workers <= 1:
+        return [func(item) for item in items]
+
+    with ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(func, items))
+
+
+class SharedArray:
+
+    """
+    ndarray πάνω σε multiprocessing.shared_memory. Οι workers κάνουν attach με το
+    όνομα του segment (βλ. spec), οπότε ο πίνακας δεν γίνεται pickle ούτε αντιγράφεται.
+    Το segment το σβήνει (unlink) μόνο όποιος το δημιούργησε.
+    """
+
+    def __init__(self, shape, dtype, name=None):
+        dtype = np.dtype(dtype)
+        self.owner = name is None
+
+        if self.owner:
+            size = max(1, int(np.prod(shape)) * dtype.itemsize)
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            # Οι workers του pool μοιράζονται τον resource tracker του parent,
+            # οπότε το attach δεν χρειάζεται (ούτε πρέπει) να κάνει unregister
+            self._shm = shared_memory.SharedMemory(name=name)
+
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf)
+
+    @classmethod
+    def copy_of(cls, array):
+        shared = cls(array.shape, array.dtype)
+        shared.array[...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, spec):
+        name, shape, dtype = spec
+        return cls(shape, dtype, name)
+
+    @property
+    def spec(self):
+        return self._shm.name, self.array.shape, self.array.dtype.str
+
+    def close(self):
+        self.array = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+# Η κατάσταση κάθε worker διεργασίας (βλ. _init_worker)
+_worker = {}
+
+
+def _init_worker(scaled_spec, features, profiles, rows_spec, indices_spec, distances_spec):
+
+    """
+    Initializer του process pool: attach στα shared segments μία φορά ανά worker
+    και ένα engine χωρίς df πάνω στον κοινό scaled πίνακα, με τα ίδια προφίλ
+    βαρών με τον parent (και όσα προστέθηκαν με register, π.χ. με spawn).
+    """
+
+    import sonar
+
+    sonar.WEIGHT_PROFILES.update(profiles)
+
+    shared = [SharedArray.attach(spec) for spec in (scaled_spec, rows_spec, indices_spec, distances_spec)]
+
+    _worker['shared'] = shared
+    _worker['engine'] = sonar.SimilarityEngine.from_scaled(shared[0].array, features)
+    _worker['rows'], _worker['indices'], _worker['distances'] = (item.array for item in shared[1:])
+
+
+def _neighbor_block(task):
+
+    """
+    Ένα block του neighbor table: γράφει τους γείτονες των γραμμών [start, stop)
+    κατευθείαν στους shared πίνακες εξόδου.
+    """
+
+    role, algorithm, k, start, stop = task
+
+    _worker['engine'].fill_neighbors(
+        role, algorithm, k, _worker['rows'][start:stop],
+        _worker['indices'][start:stop], _worker['distances'][start:stop]
+    )
+
+
+def neighbor_tables(engine, jobs, k, algorithm, block_size, workers=None):
+
+    """
+    Τα neighbor tables πολλών (ρόλος, γραμμές) σε process pool. Ο scaled πίνακας,
+    οι γραμμές και οι πίνακες εξόδου είναι σε shared memory: κάθε task είναι μόνο
+    (ρόλος, θέσεις) και τα αποτελέσματα γράφονται στη θέση τους. Ίδιος kernel με
+    το SimilarityEngine.fill_neighbors, άρα ίδια αποτελέσματα με το σειριακό build.
+
+    Args:
+        engine (SimilarityEngine): Το engine (μόνο ο scaled πίνακας και τα features του)
+        jobs (list): [(role, rows), ...]
+        block_size (int): Γραμμές ανά task
+        workers (int): Διεργασίες (βλ. resolve_workers)
+
+    Returns:
+        list: [(indices, distances), ...] ένα ανά job (πίνακες len(rows) x k)
+    """
+
+    from sonar import WEIGHT_PROFILES
+
+    offsets = np.cumsum([0] + [len(rows) for _, rows in jobs])
+    total = int(offsets[-1])
+
+    tasks = [
+        (role, algorithm, k, int(offset + start), int(offset + min(start + block_size, len(rows))))
+        for (role, rows), offset in zip(jobs, offsets)
+        for start in range(0, len(rows), block_size)
+    ]
+
+    rows = np.concatenate([np.asarray(rows, dtype=np.int64) for _, rows in jobs]) if jobs else np.empty(0, dtype=np.int64)
+
+    with SharedArray.copy_of(engine.scaled) as scaled, \
+            SharedArray.copy_of(rows) as shared_rows, \
+            SharedArray((total, k), np.int32) as indices, \
+            SharedArray((total, k), float) as distances:
+
+        initargs = (scaled.spec, engine.features, WEIGHT_PROFILES.spec(), shared_rows.spec, indices.spec, distances.spec)
+        with ProcessPoolExecutor(min(resolve_workers(workers), max(len(tasks), 1)),
+                                 initializer=_init_worker, initargs=initargs) as pool:
+            for _ in pool.map(_neighbor_block, tasks):
+                pass
+
+        return [
+            (indices.array[start:stop].copy(), distances.array[start:stop].copy())
+            for start, stop in zip(offsets[:-1], offsets[1:])
+        ]
@@ -0,0 +1,471 @@
+import argparse
+import contextlib
+import json
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import metrics
+import sonar
+
+
+# --- 🛰️ SIMILARITY QUERY SERVER ---
+
+PLAYER_FIELDS = ['Player_ID', 'Player', 'Squad', 'League_Clean', 'Pos', 'Role', 'Age', 'Min', 'Gls', 'Ast', 'G/Sh', 'SoT%', 'Sh/90']
+
+BROWSE_SORTS = sonar.BROWSE_SORTS
+
+# Query param -> predicate του kNN (το squad μένει για τους ομώνυμους του /similar)
+LIST_FILTERS = {
+    'league': 'league', 'exclude_league': 'exclude_league',
+    'role': 'role', 'exclude_role': 'exclude_role',
+    'squads': 'squad', 'exclude_squad': 'exclude_squad',
+}
+
+
+class PlayerNotFound(LookupError):
+
+    """
+    404 με τις fuzzy προτάσεις του NameIndex (βλ. sonar.target_suggestions).
+    """
+
+    def __init__(self, message, suggestions=()):
+        super().__init__(message)
+        self.suggestions = list(suggestions)
+
+
+def to_json_value(value):
+
+    """
+    numpy scalars -> απλοί Python τύποι για το json.
+    """
+
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class TridentService:
+
+    """
+    Η κατάσταση του server: τα δεδομένα, το SimilarityEngine, το NameIndex και το BrowseIndex
+    φορτώνονται μία φορά και μοιράζονται (read-only) ανάμεσα σε όλα τα requests.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.engine = sonar.get_engine(df)
+        self.names = sonar.NameIndex(df['Player'])
+        self.browse_index = sonar.BrowseIndex(df)
+        self.fields = [field for field in PLAYER_FIELDS if field in df.columns]
+
+        # Οι στήλες εξόδου ως Python lists (γρήγορο serialization χωρίς pandas ανά request)
+        self._columns = {field: df[field].tolist() for field in self.fields}
+
+    def player(self, row):
+        row = int(row)
+        return {'row': row, **{field: to_json_value(self._columns[field][row]) for field in self.fields}}
+
+    def search(self, params):
+
+        """
+        GET /search?q=haaland&limit=10
+        """
+
+        query = params.get('q', '')
+        limit = int(params.get('limit', 10))
+
+        return {
+            'query': query,
+            'results': [
+                {**self.player(row), 'match_score': round(score, 3)}
+                for row, score in self.names.search(query, limit=limit)
+            ],
+        }
+
+    def similar(self, params):
+
+        """
+        GET /similar?player=Haaland[&squad=...|&row=12|&id=<Player_ID>]&algorithm=cosine&k=10
+                     [&max_per_league=4&max_per_squad=2&max_per_age_band=3]
+                     [&age_max=22&exclude_league=Premier League&squads=Milan,Inter...][&profile=<name>]
+                     [&explain=1]
+        (ίδια σημασιολογία με το find_similar_players_gui, βλ. query_filters).
+        Αν το όνομα ταιριάζει μόνο fuzzy, 404 με 'suggestions' (όχι απάντηση για άλλον).
+        Με explain=1 κάθε αποτέλεσμα έχει και 'contributions': το μερίδιο κάθε
+        feature στο score (βλ. SimilarityEngine.contributions)
+        """
+
+        algorithm, k, diversity, filters, profile = self.query_options(params)
+
+        if 'id' in params:
+            row = self.engine.locate(params['id'])
+        elif 'row' in params:
+            row = int(params['row'])
+        else:
+            query = params.get('player', '')
+            if params.get('squad'):
+                query = f"{query}|{params['squad']}"
+            row = sonar.resolve_target(self.df, self.names, query)
+            if row is None:
+                raise PlayerNotFound("player not found", sonar.target_suggestions(self.df, self.names, query))
+
+        if row is None or not 0 <= row < len(self.df):
+            raise LookupError("player not found")
+
+        indices, distances = self.engine.kneighbors(row, algorithm, k, profile, diversity, filters)
+        results = self.scored(indices, distances, algorithm)
+
+        if params.get('explain') not in (None, '', '0') and results:
+            shares = self.engine.contributions(row, indices, algorithm, profile)
+            for result, (_, share) in zip(results, shares.iterrows()):
+                result['contributions'] = {feat: round(float(value), 4) for feat, value in share.items()}
+
+        return {
+            'target': self.player(row),
+            'algorithm': algorithm,
+            'results': results,
+        }
+
+    def shortlist(self, params):
+
+        """
+        GET /shortlist?ids=<id>,<id>,...&algorithm=cosine&k=10[&max_per_league=4...]
+        Οι παρόμοιοι για κάθε Player_ID του shortlist, σε ένα batched query.
+        """
+
+        algorithm, k, diversity, filters, profile = self.query_options(params)
+        rows = self.locate_ids(params)
+
+        neighbors = self.engine.kneighbors_batch(rows, algorithm, k, profile, diversity, filters)
+
+        return {
+            'algorithm': algorithm,
+            'results': [
+                {'target': self.player(row), 'results': self.scored(indices, distances, algorithm)}
+                for row, (indices, distances) in zip(rows, neighbors)
+            ],
+        }
+
+    def blend(self, params):
+
+        """
+        GET /blend?ids=<id>,<id>,...[&weights=2,1,...]&algorithm=cosine&k=10[&max_per_league=4...]
+        Οι παρόμοιοι με τον weighted μέσο όρο των παικτών (συνθετικό query vector).
+        """
+
+        algorithm, k, diversity, filters, profile = self.query_options(params)
+        rows = self.locate_ids(params)
+
+        weights = None
+        if params.get('weights'):
+            weights = [float(weight) for weight in params['weights'].split(',')]
+
+        indices, distances = self.engine.kneighbors_blend(rows, weights, algorithm, k, profile, diversity, filters)
+
+        return {
+            'targets': [self.player(row) for row in rows],
+            'weights': weights,
+            'algorithm': algorithm,
+            'results': self.scored(indices, distances, algorithm),
+        }
+
+    def query_options(self, params):
+
+        """
+        (algorithm, k, diversity, filters, profile) από τα κοινά params των similarity endpoints.
+        Το profile (βλ. /profiles) αντικαθιστά τα βάρη του ρόλου του target.
+        """
+
+        algorithm = params.get('algorithm', 'cosine')
+        if algorithm not in sonar.SimilarityEngine.METRICS:
+            raise ValueError(f"algorithm must be one of {list(sonar.SimilarityEngine.METRICS)}")
+
+        diversity = {
+            rule: int(params[f'max_per_{rule}'])
+            for rule in sonar.DIVERSITY_COLUMNS if params.get(f'max_per_{rule}')
+        }
+
+        profile = params.get('profile') or None
+        sonar.check_profile(profile)
+
+        return algorithm, int(params.get('k', 10)), diversity, self.query_filters(params), profile
+
+    def query_filters(self, params):
+
+        """
+        Τα predicates του kNN (βλ. sonar.FILTER_KEYS): age_min / age_max / min_minutes
+        και λίστες με κόμμα για τα LIST_FILTERS.
+        """
+
+        filters = {}
+
+        if params.get('age_min') or params.get('age_max'):
+            filters['age'] = tuple(
+                float(params[bound]) if params.get(bound) else None for bound in ('age_min', 'age_max')
+            )
+        if params.get('min_minutes'):
+            filters['min_minutes'] = float(params['min_minutes'])
+
+        for param, key in LIST_FILTERS.items():
+            if params.get(param):
+                filters[key] = [value for value in params[param].split(',') if value]
+
+        return filters
+
+    def locate_ids(self, params):
+        ids = [player_id for player_id in params.get('ids', '').split(',') if player_id]
+        if not ids:
+            raise ValueError("ids must list at least one Player_ID")
+
+        rows = [self.engine.locate(player_id) for player_id in ids]
+        missing = [player_id for player_id, row in zip(ids, rows) if row is None]
+        if missing:
+            raise LookupError(f"players not found: {missing}")
+
+        return rows
+
+    def scored(self, indices, distances, algorithm):
+        if indices is None:
+            return []
+
+        scores = sonar.similarity_scores(distances, algorithm)
+        return [
+            {**self.player(pos), 'Similarity_Score': round(float(score), 2)}
+            for pos, score in zip(indices, scores)
+        ]
+
+    def browse(self, params):
+
+        """
+        GET /browse?role=...&league=...&age_min=18&age_max=35&min_minutes=450&sort=Gls&limit=50
+        """
+
+        sort = params.get('sort', 'Gls')
+        if sort not in BROWSE_SORTS:
+            raise ValueError(f"sort must be one of {BROWSE_SORTS}")
+
+        league = params.get('league') if 'League_Clean' in self.df.columns else None
+
+        rows = self.browse_index.rows(
+            role=params.get('role') or None,
+            league=league or None,
+            age_range=(float(params.get('age_min', 0)), float(params.get('age_max', 100))),
+            min_minutes=float(params.get('min_minutes', 0)),
+            sort=sort
+        )
+        limit = int(params.get('limit', 50))
+
+        return {'total': len(rows), 'results': [self.player(row) for row in rows[:limit]]}
+
+    def roles(self, params):
+
+        """
+        GET /roles
+        """
+
+        counts = self.df['Role'].value_counts()
+        return {'roles': [{'role': role, 'players': int(counts.get(role, 0))} for role in sonar.ROLES]}
+
+    def profiles(self, params):
+
+        """
+        GET /profiles: τα προφίλ βαρών (built-in και custom) για το profile= των similarity endpoints
+        """
+
+        return {
+            'profiles': [
+                {'name': name, 'weights': sonar.WEIGHT_PROFILES.weights(name)} for name in sonar.WEIGHT_PROFILES.names
+            ],
+        }
+
+
+class TridentHandler(BaseHTTPRequestHandler):
+
+    """
+    HTTP/JSON handler. Κάθε request τρέχει στο δικό του thread (ThreadingHTTPServer).
+    """
+
+    service = None
+    quiet = False
+
+    routes = {
+        '/search': 'search',
+        '/similar': 'similar',
+        '/shortlist': 'shortlist',
+        '/blend': 'blend',
+        '/browse': 'browse',
+        '/roles': 'roles',
+        '/profiles': 'profiles',
+    }
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+
+        if url.path == '/health':
+            return self.send_json(200, {'status': 'ok', 'players': len(self.service.df)})
+
+        # GET /metrics (Prometheus text) ή /metrics?format=json
+        if url.path == '/metrics':
+            if params.get('format') == 'json':
+                return self.send_json(200, metrics.snapshot())
+            return self.send_body(200, metrics.to_prometheus().encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8')
+
+        method = self.routes.get(url.path)
+        if method is None:
+            return self.send_json(404, {'error': f"unknown endpoint '{url.path}'"})
+
+        with metrics.timer('server.request', endpoint=method):
+            try:
+                self.send_json(200, getattr(self.service, method)(params))
+            except PlayerNotFound as e:
+                self.send_json(404, {'error': str(e), 'suggestions': e.suggestions})
+            except LookupError as e:
+                self.send_json(404, {'error': str(e)})
+            except ValueError as e:
+                self.send_json(400, {'error': str(e)})
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_body(status, body, 'application/json; charset=utf-8')
+
+    def send_body(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(df, host='127.0.0.1', port=8765, quiet=False):
+
+    """
+    Φτιάχνει τον HTTP server (χωρίς να τον ξεκινάει).
+    """
+
+    handler = type('BoundTridentHandler', (TridentHandler,), {
+        'service': TridentService(df),
+        'quiet': quiet,
+    })
+
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+
+    return server
+
+
+# --- 📊 LATENCY / THROUGHPUT REPORT ---
+
+def run_report(df, requests=2000, concurrency=8):
+
+    """
+    Ξεκινάει τον server σε τυχαίο port και στέλνει μικτό φορτίο
+    (search / similar / browse) από `concurrency` threads.
+
+    Returns:
+        dict: Latency (p50/p95/p99 ms) ανά endpoint και συνολικό throughput (req/s)
+    """
+
+    server = make_server(df, port=0, quiet=True)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    rng = np.random.default_rng(0)
+    names = df['Player'].to_numpy()
+    roles = df['Role'].unique()
+
+    paths = []
+    for i in range(requests):
+        kind = ('search', 'similar', 'similar', 'browse')[i % 4]
+        if kind == 'search':
+            name = str(names[rng.integers(len(names))]).split()[-1][:5]
+            paths.append((kind, '/search?' + urllib.parse.urlencode({'q': name})))
+        elif kind == 'similar':
+            paths.append((kind, '/similar?' + urllib.parse.urlencode({
+                'row': int(rng.integers(len(df))),
+                'algorithm': ('cosine', 'euclidean')[i % 2],
+            })))
+        else:
+            paths.append((kind, '/browse?' + urllib.parse.urlencode({'role': roles[rng.integers(len(roles))]})))
+
+    def call(item):
+        kind, path = item
+        start = time.perf_counter()
+        with urllib.request.urlopen(base + path) as response:
+            response.read()
+        return kind, (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        timings = list(pool.map(call, paths))
+    elapsed = time.perf_counter() - start
+
+    server.shutdown()
+    server.server_close()
+
+    report = {'requests': requests, 'concurrency': concurrency, 'throughput_rps': round(requests / elapsed, 1), 'endpoints': {}}
+
+    for kind in ('search', 'similar', 'browse'):
+        latencies = np.array([ms for name, ms in timings if name == kind])
+        if len(latencies):
+            report['endpoints'][kind] = {
+                'count': len(latencies),
+                'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+                'p95_ms': round(float(np.percentile(latencies, 95)), 2),
+                'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+            }
+
+    return report
+
+
+# --- 🚀 MAIN ---
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='sonar.py serve', description="🔱 Project Trident - local similarity server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--data', default='perfect_merge.csv', help="Το CSV της βάσης")
+    parser.add_argument('--compact', action='store_true', default=None, help="Compact πίνακας (βλ. sonar.compact_frame)")
+    parser.add_argument('--report', action='store_true', help="Latency/throughput report αντί για serving")
+    parser.add_argument('--requests', type=int, default=2000, help="Requests για το report")
+    parser.add_argument('--concurrency', type=int, default=8, help="Παράλληλοι clients για το report")
+    parser.add_argument('--quiet', action='store_true', help="Χωρίς access log")
+    args = parser.parse_args(argv)
+
+    with contextlib.redirect_stdout(sys.stderr):
+        df = sonar.load_and_prep_data(args.data, compact=args.compact)
+
+    if df is None:
+        return 1
+
+    if args.report:
+        print(json.dumps(run_report(df, args.requests, args.concurrency), indent=2))
+        return 0
+
+    server = make_server(df, args.host, args.port, args.quiet)
+    print(f"🛰️ Serving {len(df)} players on http://{args.host}:{server.server_address[1]} (Ctrl+C to stop)", file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("👋 Shutting down.", file=sys.stderr)
+    finally:
+        server.server_close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
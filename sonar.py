@@ -1,11 +1,20 @@
+import bisect
+import contextlib
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+import unicodedata
+from collections import OrderedDict
+
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.neighbors import NearestNeighbors
-try:
-    from tabulate import tabulate
-except ImportError:
-    tabulate = None
+
+import metrics
+import parallel
+from ann import IVFIndex
 
 
 
@@ -23,6 +32,18 @@ league_weights = {
 
 # --- 🧠 ROLE LOGIC ---
 
+# Οι 8 ρόλοι που μπορεί να επιστρέψει το classify_player_role
+ROLES = [
+    '💀 Killer Striker',
+    '🎯 Elite Striker',
+    '⚽ Striker',
+    '🔗 Support Striker',
+    '🚀 Winger / Inside Forward',
+    '⚡ Winger (Attacking)',
+    '👻 Shadow Striker / Creator',
+    '🏹 Supporting Winger'
+]
+
 def classify_player_role(row):
     
     """
@@ -66,193 +87,2354 @@ def classify_player_role(row):
         
 
 
-# --- ⚖️ FEATURE WEIGHTS (Η ΚΑΡΔΙΑ ΤΟΥ ΣΥΣΤΗΜΑΤΟΣ) ---
+def parse_position_flags(pos):
+
+    """
+    Διαβάζει τη στήλη Pos μία φορά και επιστρέφει boolean flags (Is_FW, Is_MF).
+    """
+
+    pos = pos.astype(str)
+    return pos.str.contains('FW', regex=False), pos.str.contains('MF', regex=False)
+
+
+def classify_player_roles(df):
+
+    """
+    Vectorized έκδοση του classify_player_role για ολόκληρο το DataFrame.
+    Ίδιο δέντρο αποφάσεων (MF branch / FW branch), αλλά πάνω σε ολόκληρες στήλες.
+    Χρησιμοποιεί τη στήλη Is_MF αν υπάρχει, αλλιώς την υπολογίζει από το Pos.
+
+    Returns:
+        Series: Ο ρόλος κάθε παίκτη (ίδιο index με το df)
+    """
+
+    if 'Is_MF' in df.columns:
+        is_mf = df['Is_MF'].to_numpy(dtype=bool)
+    else:
+        is_mf = parse_position_flags(df['Pos'])[1].to_numpy(dtype=bool)
+
+    shots = df['Sh/90'].to_numpy(dtype=float)
+    efficiency = df['G/Sh'].to_numpy(dtype=float)
+    shot_accuracy = df['SoT%'].to_numpy(dtype=float)
+    assists = df['Ast_per_90'].to_numpy(dtype=float)
+    goals = df['Gls'].to_numpy(dtype=float)
+
+    is_fw = ~is_mf
+
+    conditions = [
+        # ΚΑΤΗΓΟΡΙΑ 1: ΕΞΤΡΕΜ + ΔΗΜΙΟΥΡΓΟΙ (FW + MF)
+        is_mf & (assists >= 0.25) & (shot_accuracy >= 30),
+        is_mf & (shots >= 2.8) & (shot_accuracy >= 35),
+        is_mf & (shots > 2.5),
+        is_mf,
+        # ΚΑΤΗΓΟΡΙΑ 2: FORWARDS
+        is_fw & (efficiency >= 0.15) & (shot_accuracy > 35),
+        is_fw & (shots >= 3.0) & (goals >= 5),
+        is_fw & (shots >= 2.2),
+    ]
+    choices = [
+        '👻 Shadow Striker / Creator',
+        '🚀 Winger / Inside Forward',
+        '⚡ Winger (Attacking)',
+        '🏹 Supporting Winger',
+        '💀 Killer Striker',
+        '🎯 Elite Striker',
+        '⚽ Striker',
+    ]
+
+    roles = np.select(conditions, choices, default='🔗 Support Striker')
+    return pd.Series(roles, index=df.index)
+
+
+
+# --- ⚖️ FEATURE WEIGHTS (Η ΚΑΡΔΙΑ ΤΟΥ ΣΥΣΤΗΜΑΤΟΣ) ---
+
+# Τα built-in προφίλ βαρών (ένα ανά ρόλο + fallback) και, προαιρετικά, ένα αρχείο
+# με custom scouting profiles στο ίδιο format (ίδιο name = override του built-in)
+WEIGHT_PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'weight_profiles.json')
+CUSTOM_PROFILES_PATH = os.environ.get('TRIDENT_PROFILES')
+
+
+class WeightProfiles:
+
+    """
+    Registry των προφίλ βαρών. Κάθε προφίλ είναι base + τα δικά του weights και
+    ένας ρόλος παίρνει το πρώτο προφίλ με ίδιο name ή με κάποιο από τα `match`
+    μέσα στο όνομά του (αλλιώς το fallback). Τα προφίλ μεταφράζονται μία φορά σε
+    NumPy vectors πάνω σε σταθερή σειρά features και κάθε ορισμός έχει signature,
+    ώστε οι πίνακες του engine να ξαναχτίζονται μόνο όταν αλλάξει ο ορισμός τους.
+    """
+
+    FALLBACK = ''
+
+    def __init__(self, base=None, fallback=None):
+        self.base = dict(base or {})
+        self._profiles = {}
+        self._match = {}
+        self._resolved = {}
+        self._vectors = {}
+        self._define(self.FALLBACK, fallback or {})
+
+    @classmethod
+    def from_files(cls, *paths):
+
+        """
+        Registry από ένα ή περισσότερα JSON αρχεία ({'base', 'profiles', 'fallback'}).
+        Τα επόμενα αρχεία προσθέτουν ή αντικαθιστούν προφίλ των προηγούμενων.
+        """
+
+        registry = cls()
+        for path in paths:
+            if path:
+                registry.load(path)
+
+        return registry
+
+    def load(self, path):
+        with open(path, encoding='utf-8') as f:
+            self.update(json.load(f))
+
+    def update(self, spec):
+
+        """
+        Προσθέτει / αντικαθιστά προφίλ από ένα spec στο format του weight_profiles.json.
+        """
+
+        if 'base' in spec:
+            self.base = dict(spec['base'])
+            for name in list(self._profiles):
+                self._define(name, self._profiles[name]['own'])
+        if 'fallback' in spec:
+            self._define(self.FALLBACK, spec['fallback'])
+
+        for profile in spec.get('profiles', []):
+            self.register(profile['name'], profile['weights'], profile.get('match', ()))
+
+    def spec(self):
+
+        """
+        Όλος ο registry ως spec (π.χ. για τους workers του parallel build, βλ. update).
+        """
+
+        return {
+            'base': dict(self.base),
+            'profiles': [
+                {'name': name, 'match': list(self._match[name]), 'weights': dict(self._profiles[name]['own'])}
+                for name in self.names
+            ],
+            'fallback': dict(self._profiles[self.FALLBACK]['own']),
+        }
+
+    def register(self, name, weights, match=()):
+
+        """
+        Προσθέτει (ή αντικαθιστά) ένα προφίλ, π.χ. ένα custom scouting profile:
+
+            WEIGHT_PROFILES.register('🧪 Poacher', {'Gls_Adj': 2.5, 'G/SoT': 2.0})
+            engine.query(player, profile='🧪 Poacher')
+        """
+
+        if not name:
+            raise ValueError("Profile name must be a non-empty string.")
+
+        self._match[name] = tuple(match)
+        self._define(name, weights)
+
+    def _define(self, name, weights):
+        weights = dict(weights)
+        compiled = {**self.base, **weights}
+        signature = hashlib.blake2b(
+            json.dumps(compiled, sort_keys=True, ensure_ascii=False).encode('utf-8'), digest_size=8
+        ).hexdigest()
+
+        self._profiles[name] = {'own': weights, 'weights': compiled, 'signature': signature}
+        self._resolved = {}
+
+    @property
+    def names(self):
+        return [name for name in self._profiles if name != self.FALLBACK]
+
+    @property
+    def features(self):
+
+        """
+        Η σταθερή σειρά features: όπως εμφανίζονται στα προφίλ (fallback τελευταίο).
+        """
+
+        features = {}
+        for name in self.names + [self.FALLBACK]:
+            features.update(dict.fromkeys(self._profiles[name]['weights']))
+
+        return list(features)
+
+    def resolve(self, role):
+
+        """
+        Το όνομα του προφίλ που ισχύει για τον ρόλο (FALLBACK αν δεν ταιριάζει κανένα).
+        """
+
+        name = self._resolved.get(role)
+        if name is None:
+            name = next(
+                (name for name in self.names if role == name or any(part in role for part in self._match[name])),
+                self.FALLBACK
+            )
+            self._resolved[role] = name
+
+        return name
+
+    def weights(self, role):
+        return self._profiles[self.resolve(role)]['weights']
+
+    def signature(self, role):
+        return self._profiles[self.resolve(role)]['signature']
+
+    def vector(self, role, features):
+
+        """
+        Τα βάρη του ρόλου ως vector στη σειρά των features (0 για όσα δεν έχει).
+        Χτίζεται μία φορά ανά (ορισμό προφίλ, features).
+        """
+
+        profile = self._profiles[self.resolve(role)]
+        key = (profile['signature'], tuple(features))
+
+        vector = self._vectors.get(key)
+        if vector is None:
+            vector = np.array([profile['weights'].get(feat, 0.0) for feat in features])
+            vector.flags.writeable = False
+            self._vectors[key] = vector
+
+        return vector
+
+
+WEIGHT_PROFILES = WeightProfiles.from_files(WEIGHT_PROFILES_PATH, CUSTOM_PROFILES_PATH)
+
+
+def get_weights_by_role(role):
+
+    """
+    Επιστρέφει τα βάρη (weights) ανάλογα με τον ρόλο (βλ. weight_profiles.json).
+    Προσαρμοσμένο στις στήλες που έχουμε (χωρίς xG/xA).
+    """
+
+    return dict(WEIGHT_PROFILES.weights(role))
+
+
+def check_profile(profile):
+
+    """
+    ValueError αν το profile (όταν δίνεται) δεν είναι ένα από τα WEIGHT_PROFILES.names.
+    """
+
+    if profile is not None and profile not in WEIGHT_PROFILES.names:
+        raise ValueError(f"Unknown weight profile '{profile}'. Use one of {WEIGHT_PROFILES.names}.")
+
+
+
+# --- 🧹 DATA PREPARATION & FEATURE ENGINEERING ---
+
+# Τα πεδία του Player_ID (βλ. player_ids)
+PLAYER_ID_COLUMNS = ['Player', 'Born', 'Nation', 'Squad']
+
+
+def load_and_prep_data(df, use_cache=True, cache_dir=None, compact=None):
+
+    """
+    Φορτώνει το CSV και τρέχει όλα τα βήματα προετοιμασίας (prep_player_data).
+    Αν υπάρχει έγκυρο prepared cache (ίδιο source hash, league_weights και
+    PREP_VERSION), ο έτοιμος πίνακας φορτώνεται κατευθείαν από εκεί.
+
+    Args:
+        df (str): Path του CSV
+        use_cache (bool): Χρήση/ενημέρωση του prepared cache
+        cache_dir (str): Φάκελος του cache (default: .trident_cache δίπλα στο CSV)
+        compact (bool): Compact πίνακας (βλ. compact_frame). None = TRIDENT_COMPACT
+    """
+
+    print("⏳ Loading Database...")
+    lap = metrics.laps('load.stage')
+    compact = COMPACT if compact is None else compact
+
+    cache_file = None
+    if use_cache and isinstance(df, (str, os.PathLike)) and os.path.isfile(df):
+        cache_file = prep_cache_path(df, cache_dir, compact)
+        cached = read_prep_cache(cache_file)
+        lap('cache_read')
+
+        if cached is not None:
+            metrics.count('load.cache', result='hit')
+            print(f"⚡ Loaded {len(cached)} prepared players from cache ({os.path.basename(cache_file)})")
+            return cached
+
+        metrics.count('load.cache', result='miss')
+
+    try:
+        df = read_compact_csv(df) if compact else pd.read_csv(df)
+    except FileNotFoundError:
+        print("❌ Error: Το αρχείο csv δεν βρέθηκε.")
+        return None
+    
+    print(f"📦 Loaded {len(df)} players")
+    lap('read_csv')
+
+    df_final = prep_player_data(df)
+    lap('prep')
+
+    if compact:
+        df_final = compact_frame(df_final)
+        lap('compact')
+
+    if cache_file is not None:
+        write_prep_cache(df_final, cache_file)
+        lap('cache_write')
+
+    return df_final
+
+
+def prep_player_data(df):
+
+    """
+    Τα βήματα 1-10 της προετοιμασίας πάνω σε ένα raw DataFrame (μορφή perfect_merge.csv).
+    """
+
+    lap = metrics.laps('prep.stage')
+
+    # 1️⃣-4️⃣ Row-local βήματα (θέσεις, αριθμοί, Ast_per_90, αμυντικοί μέσοι)
+    print("🎯 Filtering positions (FW/MF only)...")
+    print("🚫 Excluding defensive midfielders(DF)...")
+    df = prep_rows(df, lap)
+    
+    # 5️⃣ TEAM GOAL SHARE (ανά σεζόν, αν το dataset έχει πολλές σεζόν)
+    df['Team_Goal_Share'], df['Team_Goal_Share_NoPK'] = team_goal_shares(df)
+    lap('5_team_share')
+    
+    # 6️⃣-8️⃣ League adjustment, adjusted stats, ρόλοι
+    print("🌍 Applying league difficulty factors...")
+    adjust_rows(df, lap)
+    
+    # 9️⃣ MINUTES FILTERING
+    df_final = df[df['Min'] > 450].copy()
+    df_final = df_final.reset_index(drop=True)
+    lap('9_minutes')
+    
+    # 🔟 QUALITY CHECK
+    print("\n" + "="*50)
+    print(f"✅ Data Ready: {len(df_final)} players")
+    print(f"📊 Roles Distribution:")
+    print(df_final['Role'].value_counts())
+    if 'League_Clean' in df_final.columns:
+        print(f"🌍 Leagues: {df_final['League_Clean'].nunique()}")
+    print("="*50 + "\n")
+    lap('10_quality')
+    
+    return df_final
+
+
+def prep_rows(df, lap=metrics.no_lap):
+
+    """
+    Βήματα 1-4: εξαρτώνται μόνο από τη γραμμή του κάθε παίκτη, άρα τρέχουν και
+    μόνο για όσους άλλαξαν (βλ. LiveDataset). Δεν πειράζει το df εισόδου.
+
+    Returns:
+        DataFrame: Οι FW/MF (χωρίς αμυντικούς μέσους), με το index του df εισόδου
+    """
+
+    # 1️⃣ ΦΙΛΤΡΑΡΙΣΜΑ ΘΕΣΕΩΝ (τα position flags υπολογίζονται μία φορά)
+    is_fw, is_mf = parse_position_flags(df['Pos'])
+    df = df.assign(Is_FW=is_fw, Is_MF=is_mf)
+    df = df[df['Is_FW'] | df['Is_MF']].copy()
+    lap('1_positions')
+    
+    # 2️⃣ ΚΑΘΑΡΙΣΜΟΣ & ΜΕΤΑΤΡΟΠΗ ΣΕ ΑΡΙΘΜΟΥΣ
+    cols_to_fix = ['Gls', 'Ast', 'Sh', 'SoT', 'SoT%', 'Sh/90', 'G/Sh', 
+                   'G/SoT', 'G-PK', 'PK', 'PKatt', 'Min']
+    
+    for col in cols_to_fix:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    lap('2_numeric')
+    
+    # 3️⃣ ΥΠΟΛΟΓΙΣΜΟΣ Ast_per_90
+    df['Ast_per_90'] = ((df['Ast'] / df['Min']) * 90).fillna(0)
+    lap('3_ast_per_90')
+    
+    # 4️⃣ ΑΠΟΚΛΕΙΣΜΟΣ ΑΜΥΝΤΙΚΩΝ ΜΕΣΩΝ
+    df = df[df['Is_FW'] | (df['Is_MF'] & (df['Sh/90'] >= 1))].copy()
+    lap('4_exclude_dm')
+
+    # 🆔 ΣΤΑΘΕΡΟ ID ΠΑΙΚΤΗ
+    df['Player_ID'] = player_ids(df)
+    lap('player_id')
+
+    return df
+
+
+def player_ids(df):
+
+    """
+    Σταθερό ID ανά γραμμή από όνομα, έτος γέννησης, εθνικότητα και ομάδα (και Season
+    αν υπάρχει): hash 16 hex χαρακτήρων. Ίδιο σε κάθε load (και σε compact mode),
+    ενώ ο ίδιος παίκτης σε δύο ομάδες ή ομώνυμοι παίρνουν διαφορετικά IDs.
+    """
+
+    parts = []
+    for col in PLAYER_ID_COLUMNS + (['Season'] if 'Season' in df.columns else []):
+        if col not in df.columns:
+            continue
+
+        values = df[col]
+        if pd.api.types.is_numeric_dtype(values):
+            values = values.astype('Int64')
+        parts.append(values.astype(str).where(values.notna(), ''))
+
+    return pd.Series(
+        [hashlib.blake2b('|'.join(key).encode(), digest_size=8).hexdigest() for key in zip(*parts)],
+        index=df.index, dtype=object
+    )
+
+
+def team_keys(df):
+
+    """
+    Τα κλειδιά της ομάδας για το Team_Goal_Share (ανά σεζόν αν υπάρχει Season).
+    """
+
+    return ['Season', 'Squad'] if 'Season' in df.columns else 'Squad'
+
+
+def team_goal_shares(df):
+
+    """
+    Βήμα 5: μερίδιο του παίκτη στα γκολ της ομάδας του (με και χωρίς πέναλτι).
+    Τα σύνολα της ομάδας μετράνε όλους τους FW/MF, και όσους έχουν <= 450 λεπτά.
+
+    Returns:
+        (Series, Series): Team_Goal_Share, Team_Goal_Share_NoPK
+    """
+
+    team_goals = df.groupby(team_keys(df))['Gls'].transform('sum')
+
+    return (df['Gls'] / team_goals).fillna(0), ((df['Gls'] - df['PK']) / team_goals).fillna(0)
+
+
+def adjust_rows(df, lap=metrics.no_lap):
+
+    """
+    Βήματα 6-8 (in place): league adjustment, adjusted stats και ρόλος. Row-local.
+    """
+
+    # 6️⃣ LEAGUE ADJUSTMENT
+    if 'Comp' in df.columns:
+        df['League_Clean'] = df['Comp'].str.replace(r'^[a-z]{2,3}\s+', '', regex=True)
+        df['League_Factor'] = df['League_Clean'].map(league_weights).fillna(0.75)
+    else:
+        df['League_Factor'] = 1.0
+    lap('6_league')
+    
+    # 7️⃣ ADJUSTED STATS
+    df['Gls_Adj'] = df['Gls'] * df['League_Factor']
+    df['Ast_Adj'] = df['Ast'] * df['League_Factor']
+    df['G+A_Adj'] = (df['Gls'] + df['Ast']) * df['League_Factor']
+    df['Gls_NoPK_Adj'] = (df['Gls'] - df['PK']) * df['League_Factor']
+    df['Sh_per90_Adj'] = (df['Sh'] / df['Min'] * 90) * df['League_Factor']
+    lap('7_adjusted')
+    
+    # 8️⃣ ROLE CLASSIFICATION (vectorized - ίδιο αποτέλεσμα με το classify_player_role)
+    df['Role'] = classify_player_roles(df)
+    lap('8_roles')
+
+    return df
+
+
+
+# --- 💾 PREPARED DATA CACHE ---
+
+# Αλλάζει όποτε αλλάζει η λογική του prep, του classifier ή των βαρών,
+# ώστε να ακυρώνονται αυτόματα τα παλιά cache αρχεία:
+#   2 -> Player_ID και Born στις compact στήλες
+#   3 -> Team_Goal_Share ανά (Season, Squad) όταν υπάρχει στήλη Season
+PREP_VERSION = 3
+
+CACHE_DIR_NAME = '.trident_cache'
+
+
+def file_fingerprint(path, chunk_size=1 << 20):
+
+    """
+    SHA-256 του περιεχομένου ενός αρχείου (διαβάζεται σε chunks).
+    """
+
+    digest = hashlib.sha256()
+
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def prep_cache_key(path):
+
+    """
+    Κλειδί του prepared cache: hash του source αρχείου + league_weights + PREP_VERSION
+    (+ έκδοση pandas, γιατί το cache είναι pickled DataFrame).
+    """
+
+    digest = hashlib.sha256()
+    digest.update(file_fingerprint(path).encode())
+    digest.update(json.dumps(league_weights, sort_keys=True).encode())
+    digest.update(str(PREP_VERSION).encode())
+    digest.update(pd.__version__.encode())
+
+    return digest.hexdigest()[:16]
+
+
+def prep_cache_path(path, cache_dir=None, compact=False):
+
+    """
+    Path του cache αρχείου για το συγκεκριμένο source (ξεχωριστό αρχείο για τον compact πίνακα).
+    """
+
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME)
+
+    stem = os.path.splitext(os.path.basename(path))[0] + ('-compact' if compact else '')
+
+    return os.path.join(cache_dir, f"{stem}-{prep_cache_key(path)}.pkl")
+
+
+def read_prep_cache(cache_file):
+
+    """
+    Διαβάζει το prepared DataFrame από το cache (ή None αν δεν υπάρχει / είναι χαλασμένο).
+    """
+
+    if not os.path.isfile(cache_file):
+        return None
+
+    try:
+        return pd.read_pickle(cache_file)
+    except Exception:
+        return None
+
+
+def write_prep_cache(df, cache_file):
+
+    """
+    Γράφει το prepared DataFrame στο cache και σβήνει παλιά αρχεία του ίδιου source.
+    """
+
+    cache_dir = os.path.dirname(cache_file)
+    stem = os.path.basename(cache_file).rsplit('-', 1)[0]
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Ατομικό γράψιμο: πρώτα σε temp αρχείο και μετά rename
+        tmp_file = cache_file + '.tmp'
+        df.to_pickle(tmp_file)
+        os.replace(tmp_file, cache_file)
+
+        for name in os.listdir(cache_dir):
+            old_file = os.path.join(cache_dir, name)
+            if name.rsplit('-', 1)[0] == stem and old_file != cache_file:
+                os.remove(old_file)
+
+    except OSError as e:
+        print(f"⚠️ Could not write prepared cache: {e}")
+
+
+
+# --- 🗜️ COMPACT MODE ---
+
+# Ενεργό με TRIDENT_COMPACT=1 (ή compact=True / --compact)
+COMPACT = os.environ.get('TRIDENT_COMPACT', '0') == '1'
+
+# Οι raw στήλες που χρειάζονται prep, search και display (οι υπόλοιπες δεν διαβάζονται καν)
+COMPACT_COLUMNS = [
+    'Player', 'Nation', 'Pos', 'Squad', 'Comp', 'Age', 'Born', 'Min', 'Gls', 'Ast', 'G-PK', 'PK', 'PKatt',
+    'Sh', 'SoT', 'SoT%', 'Sh/90', 'G/Sh', 'G/SoT', 'Season',
+]
+
+# Strings με λίγες διαφορετικές τιμές: διαβάζονται κατευθείαν ως category
+COMPACT_CATEGORIES = ['Nation', 'Pos', 'Squad', 'Comp', 'Season']
+
+# Οι υπόλοιπες string στήλες γίνονται category μόνο αν οι διαφορετικές τιμές
+# είναι το πολύ αυτό το ποσοστό των γραμμών (π.χ. Role ναι, Player μόνο σε πολλές σεζόν)
+CATEGORY_MAX_RATIO = 0.5
+
+
+def read_compact_csv(path):
+
+    """
+    Διαβάζει μόνο τις COMPACT_COLUMNS του CSV, με τα low-cardinality strings ως category.
+    """
+
+    return pd.read_csv(
+        path,
+        usecols=lambda col: col in COMPACT_COLUMNS,
+        dtype={col: 'category' for col in COMPACT_CATEGORIES},
+    )
+
+
+def compact_frame(df):
+
+    """
+    Compact εκδοχή του prepared πίνακα: δεκαδικά σε float32, ακέραιοι σε int32 και
+    strings με λίγες διαφορετικές τιμές σε category. Η στήλη Role υπολογίζεται στο
+    prep πριν από το downcast σε float32 (πάνω στα float64 stats), οπότε το
+    role classification δεν επηρεάζεται.
+    """
+
+    columns = {}
+    int32 = np.iinfo(np.int32)
+
+    for col in df.columns:
+        values = df[col]
+
+        if pd.api.types.is_float_dtype(values):
+            columns[col] = values.astype(np.float32)
+        elif pd.api.types.is_integer_dtype(values):
+            if len(values) == 0 or (int32.min <= values.min() and values.max() <= int32.max):
+                columns[col] = values.astype(np.int32)
+        elif isinstance(values.dtype, pd.CategoricalDtype):
+            columns[col] = values.cat.remove_unused_categories()
+        elif pd.api.types.is_string_dtype(values) and values.nunique() <= CATEGORY_MAX_RATIO * len(values):
+            columns[col] = values.astype('category')
+
+    return df.assign(**columns)
+
+
+def memory_report(df):
+
+    """
+    Μνήμη ανά στήλη (deep: μαζί με τα strings), από τη μεγαλύτερη στη μικρότερη.
+
+    Returns:
+        DataFrame: Column, Dtype, Bytes, Share (%)
+    """
+
+    usage = df.memory_usage(deep=True, index=False)
+
+    report = pd.DataFrame({
+        'Column': usage.index,
+        'Dtype': [str(df[col].dtype) for col in usage.index],
+        'Bytes': usage.to_numpy(),
+    })
+    report['Share'] = (report['Bytes'] / max(report['Bytes'].sum(), 1) * 100).round(1)
+
+    return report.sort_values('Bytes', ascending=False, ignore_index=True)
+
+
+# --- 🧠 SIMILARITY ENGINE (FIT ONCE / QUERY MANY) ---
+
+# Ακρίβεια αποστάσεων (αρκετή για ranking, σταθερή ανάμεσα σε single και batch queries)
+DISTANCE_DECIMALS = 10
+
+# Αποστάσεις ανά block του kneighbors_batch (targets x N): αρκετά μικρό για την cache,
+# αφού το κόστος είναι τα element-wise περάσματα και όχι το matrix product
+BATCH_BLOCK = 1 << 18
+
+# Filtered / IVF αποστάσεις: κάτω από αυτό το ποσοστό υποψηφίων υπολογίζονται μόνο οι
+# γραμμές τους, πάνω από αυτό όλες (η αντιγραφή γραμμών κοστίζει όσο ο ίδιος ο υπολογισμός)
+# και οι υπόλοιποι απλώς αποκλείονται με inf
+GATHER_RATIO = 0.3
+
+# Πόσα σετ φίλτρων (και οι υποψήφιοί τους) κρατιούνται ανά engine
+FILTER_CACHE_SIZE = 32
+
+
+def similarity_scores(distances, metric):
+
+    """
+    Μετατρέπει τις αποστάσεις του kNN σε Similarity_Score (0-100).
+    Δουλεύει και για πίνακα (ένα query ανά γραμμή): το median του euclidean
+    υπολογίζεται ανά γραμμή.
+    """
+
+    distances = np.asarray(distances, dtype=float)
+
+    if metric == 'cosine':
+        scores = (1 - distances) * 100
+    else:  # euclidean
+        if distances.shape[-1] == 0:
+            return distances.copy()
+
+        median_distance = np.median(distances, axis=-1, keepdims=True)
+        safe_median = np.where(median_distance > 0, median_distance, 1.0)
+
+        scores = np.where(
+            median_distance > 0,
+            100 * np.exp(-distances / (safe_median * 1.5)),
+            100.0
+        )
+
+    return np.clip(scores, 0, 100)
+
+
+def top_k_neighbors(distances, k):
+
+    """
+    Επιλέγει τους k κοντινότερους ανά γραμμή ενός πίνακα αποστάσεων.
+    Ισοπαλίες σπάνε με τον μικρότερο index, ώστε το αποτέλεσμα να είναι ντετερμινιστικό.
+
+    Returns:
+        (indices, distances): Πίνακες (γραμμές x k) ταξινομημένοι από τον πιο κοντινό
+    """
+
+    k = min(k, distances.shape[1])
+    if k <= 0:
+        empty = np.empty((distances.shape[0], 0))
+        return empty.astype(int), empty
+
+    if k < distances.shape[1]:
+        candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(distances.shape[1]), distances.shape)
+
+    candidate_distances = np.take_along_axis(distances, candidates, axis=1)
+    order = np.lexsort((candidates, candidate_distances), axis=1)
+
+    indices = np.take_along_axis(candidates, order, axis=1)
+    return indices, np.take_along_axis(candidate_distances, order, axis=1)
+
+
+def member_positions(sorted_rows, rows):
+
+    """
+    Για κάθε γραμμή του rows: αν ανήκει στο (ταξινομημένο) sorted_rows και σε ποια θέση του.
+    """
+
+    rows = np.asarray(rows)
+    if len(sorted_rows) == 0:
+        return np.zeros(len(rows), dtype=bool), np.zeros(len(rows), dtype=int)
+
+    positions = np.minimum(np.searchsorted(sorted_rows, rows), len(sorted_rows) - 1)
+    return sorted_rows[positions] == rows, positions
+
+
+def exact_nearest(distances, candidates=None):
+
+    """
+    nearest(fetch) για μία γραμμή έτοιμων αποστάσεων (brute-force): οι fetch
+    πιο κοντινοί ως (indices, distances). Αν οι αποστάσεις είναι μόνο προς τους
+    `candidates` (filtered kNN), τα indices μεταφράζονται σε θέσεις γραμμών του df.
+    """
+
+    distances = distances[None, :]
+
+    def nearest(fetch):
+        indices, nearest_distances = top_k_neighbors(distances, fetch)
+        indices = indices[0] if candidates is None else candidates[indices[0]]
+        return indices, nearest_distances[0]
+
+    return nearest
+
+
+
+# --- 🌍 DIVERSITY CONSTRAINTS ---
+
+# Κανόνες διαφορετικότητας -> στήλη του df (το age band είναι ομάδες των AGE_BAND_YEARS ετών)
+DIVERSITY_COLUMNS = {
+    'league': 'League_Clean',
+    'squad': 'Squad',
+    'age_band': 'Age',
+}
+
+AGE_BAND_YEARS = 3
+
+# Η διαφορετικότητα του CLI και του Streamlit: max 4 παίκτες ανά λίγκα
+DEFAULT_DIVERSITY = {'league': 4}
+
+
+def diversity_codes(values, rule):
+
+    """
+    Ακέραιοι κωδικοί ομάδας (0..G) για έναν κανόνα διαφορετικότητας.
+    Οι άγνωστες τιμές (NaN) μπαίνουν όλες σε μία δική τους ομάδα.
+    """
+
+    if rule not in DIVERSITY_COLUMNS:
+        raise ValueError(f"Unknown diversity rule '{rule}'. Use one of {list(DIVERSITY_COLUMNS)}.")
+
+    if rule == 'age_band':
+        values = np.floor(pd.to_numeric(pd.Series(values), errors='coerce') / AGE_BAND_YEARS)
+
+    codes, uniques = pd.factorize(values)
+    codes[codes < 0] = len(uniques)
+
+    return codes
+
+
+def _group_ranks(codes):
+
+    """
+    Η σειρά κάθε στοιχείου μέσα στην ομάδα του (0 = το πρώτο της ομάδας).
+    """
+
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    first = np.repeat(starts, np.diff(np.r_[starts, len(codes)]))
+
+    ranks = np.empty(len(codes), dtype=np.int64)
+    ranks[order] = np.arange(len(codes)) - first
+
+    return ranks
+
+
+def select_diverse(groups, caps, k):
+
+    """
+    Greedy επιλογή με όρια ανά ομάδα πάνω σε υποψήφιους ταξινομημένους από τον
+    πιο κοντινό: ένας υποψήφιος κρατιέται αν καμία ομάδα του (λίγκα, ομάδα,
+    age band...) δεν έχει ήδη γεμίσει από όσους κρατήθηκαν πριν από αυτόν.
+
+    Χωρίς loop ανά υποψήφιο: σε κάθε γύρο απορρίπτονται μαζί όλοι όσοι είναι
+    σίγουρα εκτός (η ομάδα τους έχει γεμίσει από υποψήφιους που σίγουρα κρατιούνται).
+    Όποιος δεν παραβιάζει κανένα όριο κρατιέται οπωσδήποτε, αφού οι απορρίψεις
+    μόνο μειώνουν τις μετρήσεις. Συνήθως αρκούν 1-2 γύροι.
+
+    Args:
+        groups (array): Κωδικοί ομάδας, σχήμα (κανόνες x υποψήφιοι)
+        caps (array): Το όριο κάθε κανόνα
+        k (int): Πόσους να κρατήσει
+
+    Returns:
+        array: Θέσεις (στη λίστα των υποψηφίων) των επιλεγμένων, μέχρι k
+    """
+
+    groups = np.asarray(groups, dtype=np.int64)
+    caps = np.asarray(caps, dtype=np.int64)[:, None]
+    alive = np.arange(groups.shape[1])
+
+    if len(caps) == 0:
+        return alive[:k]
+
+    while len(alive):
+        codes = groups[:, alive]
+        ranks = np.stack([_group_ranks(rule_codes) for rule_codes in codes])
+        violating = ranks >= caps
+        unsafe = violating.any(axis=0)
+
+        # Μετά τον k-οστό σίγουρο υποψήφιο τίποτα δεν μπορεί να μπει στο top-k
+        safe = np.flatnonzero(~unsafe)
+        if len(safe) >= k:
+            limit = safe[k - 1] + 1 if k > 0 else 0
+            alive, codes, ranks, violating, unsafe = (
+                alive[:limit], codes[:, :limit], ranks[:, :limit], violating[:, :limit], unsafe[:limit]
+            )
+
+        if not unsafe.any():
+            break
+
+        # Ομάδες που μέσα στο όριό τους έχουν υποψήφιο που ίσως απορριφθεί (αβέβαιες)
+        reject = np.zeros(len(alive), dtype=bool)
+        for rule_codes, rule_ranks, rule_violating, cap in zip(codes, ranks, violating, caps[:, 0]):
+            uncertain = np.zeros(rule_codes.max() + 1, dtype=bool)
+            uncertain[rule_codes[unsafe & (rule_ranks < cap)]] = True
+            reject |= rule_violating & ~uncertain[rule_codes]
+
+        alive = alive[~reject]
+
+    return alive[:k]
+
+
+def _patch_rows(old, source_rows, changed, fresh):
+
+    """
+    Νέος πίνακας με τις γραμμές του old στις θέσεις source_rows (-1 = νέα γραμμή)
+    και τις fresh στις γραμμές changed (οι οποίες πρέπει να καλύπτουν όλες τις νέες).
+    source_rows=None: ίδιες γραμμές με την ίδια σειρά (απλό copy αντί για gather).
+    """
+
+    if source_rows is None:
+        patched = old.copy()
+    else:
+        known = source_rows >= 0
+        patched = np.empty((len(source_rows),) + old.shape[1:], dtype=old.dtype)
+        patched[known] = old[source_rows[known]]
+    if fresh is not None:
+        patched[changed] = fresh
+
+    return patched
+
+
+class SimilarityEngine:
+
+    """
+    Fit-once / query-many μηχανή ομοιότητας.
+
+    Το scaling γίνεται μία φορά στο __init__ και για κάθε ρόλο κρατάμε έτοιμους
+    τους weighted πίνακες και για τα δύο metrics (normalized γραμμές για cosine,
+    squared norms για euclidean). Κάθε query είναι μόνο ένα matrix-vector product.
+    """
+
+    METRICS = ('cosine', 'euclidean')
+    BACKENDS = ('exact', 'ivf')
+
+    def __init__(self, df, roles=ROLES, backend='exact', n_lists=None, n_probe=8, workers=None):
+
+        """
+        Args:
+            df (DataFrame): Το prepared dataframe
+            roles (list): Ρόλοι που προϋπολογίζονται
+            backend (str): 'exact' (brute-force) ή 'ivf' (approximate, βλ. ann.IVFIndex)
+            n_lists, n_probe: Knobs ακρίβειας / ταχύτητας του IVF backend
+            workers (int): Threads για τους πίνακες των ρόλων (default: parallel.WORKERS)
+        """
+
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Use one of {self.BACKENDS}.")
+
+        self.df = df
+        self.backend = backend
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self._ann = {}
+        self._diversity_codes = {}
+        self._filter_index = None
+        self._filter_cache = OrderedDict()
+        lap = metrics.laps('engine.build', backend=backend)
+
+        # Όλα τα features που εμφανίζονται σε κάποιο προφίλ βαρών (σταθερή σειρά του registry)
+        self.features = [feat for feat in WEIGHT_PROFILES.features if feat in df.columns]
+
+        # Normalization (μία φορά για όλους τους ρόλους). Οι raw τιμές και ο scaler
+        # κρατιούνται για τα incremental updates (βλ. apply_update). C-order ώστε οι
+        # πράξεις ανά γραμμή να δίνουν ίδιο αποτέλεσμα σε όλο τον πίνακα και σε υποσύνολο
+        self._values = np.ascontiguousarray(df[self.features].to_numpy(dtype=float))
+        if self.features:
+            # Lazy import: το sklearn (~1.5s) φορτώνεται μόνο όταν χτίζεται engine
+            from sklearn.preprocessing import MinMaxScaler
+            self._scaler = MinMaxScaler().fit(self._values)
+            self.scaled = self._scaler.transform(self._values)
+        else:
+            self._scaler = None
+            self.scaled = np.empty((len(df), 0))
+        lap('scaling')
+
+        self._build_lookup()
+        lap('lookup')
+
+        # Οι πίνακες των προφίλ είναι ανεξάρτητοι μεταξύ τους (ίδιος scaled πίνακας)
+        names = list(dict.fromkeys(WEIGHT_PROFILES.resolve(role) for role in roles))
+        built = parallel.thread_map(lambda name: self._role_matrices(name, self.scaled), names, workers)
+        self._profiles = dict(zip(names, built))
+        self._signatures = {name: WEIGHT_PROFILES.signature(name) for name in names}
+        lap('profiles')
+
+    @classmethod
+    def from_scaled(cls, scaled, features):
+
+        """
+        Engine μόνο για αποστάσεις πάνω σε έτοιμο scaled πίνακα (π.χ. σε worker του
+        parallel build, βλ. parallel.neighbor_tables): χωρίς df, lookup και queries.
+        """
+
+        engine = cls.__new__(cls)
+        engine.df = None
+        engine.backend = 'exact'
+        engine.features = list(features)
+        engine.scaled = scaled
+        engine._profiles = {}
+        engine._signatures = {}
+        engine._ann = {}
+
+        return engine
+
+    def role_features(self, role):
+
+        """
+        Τα features (με τη σειρά του προφίλ του) που χρησιμοποιεί ο ρόλος.
+        """
+
+        return [feat for feat in WEIGHT_PROFILES.weights(role) if feat in self.features]
+
+    def profile(self, role):
+
+        """
+        Επιστρέφει τους προϋπολογισμένους πίνακες του προφίλ του ρόλου ανά metric.
+        Προφίλ εκτός ROLES (fallback, custom) χτίζονται την πρώτη φορά και κρατιούνται,
+        μέχρι να αλλάξει ο ορισμός τους στο WEIGHT_PROFILES (τότε ξαναχτίζεται μόνο αυτό).
+        Features που δεν είχε το engine στο build προστίθενται (βλ. _add_features).
+        """
+
+        name = WEIGHT_PROFILES.resolve(role)
+        signature = WEIGHT_PROFILES.signature(name)
+
+        if self._signatures.get(name) != signature:
+            missing = [feat for feat in WEIGHT_PROFILES.weights(name) if feat not in self.features]
+            if missing and self.df is not None:
+                self._add_features(name, missing)
+            self._profiles[name] = self._role_matrices(name, self.scaled)
+            self._signatures[name] = signature
+            for algorithm in self.METRICS:
+                self._ann.pop((name, algorithm), None)
+
+        return self._profiles[name]
+
+    def _add_features(self, name, features):
+
+        """
+        Επεκτείνει τον scaled πίνακα με features που χρησιμοποιεί ένα προφίλ
+        (π.χ. custom, με register μετά το build) αλλά δεν είχε κανένα προφίλ στο build.
+        Το MinMax scaling είναι ανά στήλη, οπότε οι παλιές στήλες μένουν ίδιες· οι
+        πίνακες των προφίλ και τα IVF indexes ξαναχτίζονται lazily στο επόμενο query.
+        ValueError αν κάποιο feature δεν είναι στήλη του df (δεν γίνεται σιωπηλά 0).
+        """
+
+        unknown = [feat for feat in features if feat not in self.df.columns]
+        if unknown:
+            raise ValueError(f"Weight profile '{name}' uses unknown features {unknown}.")
+
+        from sklearn.preprocessing import MinMaxScaler
+
+        self.features = self.features + list(features)
+        self._values = np.ascontiguousarray(self.df[self.features].to_numpy(dtype=float))
+        self._scaler = MinMaxScaler().fit(self._values)
+        self.scaled = self._scaler.transform(self._values)
+
+        self._profiles = {}
+        self._signatures = {}
+        self._ann = {}
+
+    def _role_matrices(self, role, scaled):
+
+        """
+        Οι πίνακες του ρόλου ανά metric για τις γραμμές του scaled (None αν ο ρόλος
+        δεν έχει βάρη). Row-local: ίδιο αποτέλεσμα για όλο τον πίνακα ή για υποσύνολο.
+        """
+
+        weight_vector = WEIGHT_PROFILES.vector(role, self.features)
+
+        if not weight_vector.any():
+            return None
+
+        weighted = scaled * weight_vector
+
+        norms = np.linalg.norm(weighted, axis=1)
+        norms[norms == 0] = 1.0
+
+        return {
+            'cosine': (weighted / norms[:, None], None),
+            'euclidean': (weighted, np.einsum('ij,ij->i', weighted, weighted)),
+        }
+
+    def _build_lookup(self):
+
+        """
+        Hash index Player_ID -> θέση γραμμής, και (για γραμμές χωρίς ID)
+        lookup (Player, Squad) -> θέση με fallback μόνο με όνομα.
+        """
+
+        self._by_id = {}
+        if 'Player_ID' in self.df.columns:
+            for pos, player_id in enumerate(self.df['Player_ID']):
+                self._by_id.setdefault(player_id, pos)
+
+        self._by_key = {}
+        self._by_name = {}
+        for pos, key in enumerate(zip(self.df['Player'], self.df['Squad'])):
+            self._by_key.setdefault(key, pos)
+            self._by_name.setdefault(key[0], pos)
+
+    def apply_update(self, df, source_rows):
+
+        """
+        Περνάει ένα νέο prepared df στον engine χωρίς rebuild: ξαναϋπολογίζονται
+        μόνο οι γραμμές που άλλαξαν, οι υπόλοιπες μεταφέρονται από τους παλιούς πίνακες.
+        Αν αλλάξει το min/max κάποιου feature, το scaling ξαναγίνεται για όλες τις γραμμές
+        (αλλιώς δεν θα ήταν ίδιο με έναν καινούριο engine).
+
+        Args:
+            df (DataFrame): Το νέο prepared dataframe
+            source_rows (array): Για κάθε γραμμή του df, η θέση της στο παλιό df (-1 για νέες)
+
+        Returns:
+            int: Πόσες γραμμές ξαναϋπολογίστηκαν
+        """
+
+        lap = metrics.laps('engine.update', backend=self.backend)
+        source_rows = np.asarray(source_rows, dtype=np.intp)
+        old_df = self.df
+        same_rows = len(df) == len(old_df) and np.array_equal(source_rows, np.arange(len(df)))
+        gather = None if same_rows else source_rows
+
+        # 1️⃣ Ποιες γραμμές άλλαξαν (νέες ή με διαφορετικές τιμές σε κάποιο feature)
+        values = np.ascontiguousarray(df[self.features].to_numpy(dtype=float))
+        known = source_rows >= 0
+        changed = ~known
+        changed[known] = (values[known] != self._values[source_rows[known]]).any(axis=1)
+
+        # 2️⃣ Scaling: μόνο οι γραμμές που άλλαξαν, εκτός αν άλλαξε το εύρος κάποιου feature
+        if self._scaler is None:
+            scaled = np.empty((len(df), 0))
+        elif (np.array_equal(np.nanmin(values, axis=0), self._scaler.data_min_)
+              and np.array_equal(np.nanmax(values, axis=0), self._scaler.data_max_)):
+            scaled = _patch_rows(self.scaled, gather, changed, None)
+            if changed.any():
+                scaled[changed] = self._scaler.transform(values[changed])
+        else:
+            from sklearn.preprocessing import MinMaxScaler
+            self._scaler = MinMaxScaler().fit(values)
+            scaled = self._scaler.transform(values)
+            changed = np.ones(len(df), dtype=bool)
+        lap('scaling')
+
+        # 3️⃣ Πίνακες ρόλων: gather των παλιών γραμμών + υπολογισμός μόνο των αλλαγμένων
+        # (όσα προφίλ άλλαξαν ορισμό στο μεταξύ ξαναχτίζονται ολόκληρα στο επόμενο query)
+        for role in [name for name in self._profiles if self._signatures[name] != WEIGHT_PROFILES.signature(name)]:
+            del self._profiles[role], self._signatures[role]
+
+        for role, profile in self._profiles.items():
+            if profile is None:
+                continue
+
+            fresh = self._role_matrices(role, scaled[changed])
+            self._profiles[role] = {
+                metric: (
+                    _patch_rows(matrix, gather, changed, fresh[metric][0]),
+                    None if sq_norms is None else _patch_rows(sq_norms, gather, changed, fresh[metric][1]),
+                )
+                for metric, (matrix, sq_norms) in profile.items()
+            }
+        lap('profiles')
+
+        # 4️⃣ Lookup: ξαναχτίζεται μόνο αν άλλαξε η αντιστοίχιση γραμμών -> παικτών
+        self.df = df
+        self._values = values
+        self.scaled = scaled
+
+        key_columns = [col for col in ('Player', 'Squad', 'Player_ID') if col in df.columns]
+        same_keys = same_rows and all(
+            np.array_equal(df[col][changed].to_numpy(), old_df[col][changed].to_numpy()) for col in key_columns
+        )
+        if not same_keys:
+            self._build_lookup()
+        lap('lookup')
+
+        # Τα IVF indexes, τα diversity codes και τα filter masks ξαναχτίζονται lazily στο επόμενο query
+        self._ann = {}
+        self._diversity_codes = {}
+        self._filter_index = None
+        self._filter_cache = OrderedDict()
+
+        return int(changed.sum())
+
+    def locate(self, player):
+
+        """
+        Βρίσκει τη θέση (iloc) του παίκτη στο df του engine σε O(1).
+        Δέχεται θέση γραμμής (int), Player_ID (str) ή γραμμή παίκτη (Series/dict
+        με Player_ID, ή με Player, Squad για δεδομένα χωρίς ID).
+        """
+
+        if isinstance(player, (int, np.integer)):
+            return int(player) if 0 <= player < len(self.df) else None
+
+        if isinstance(player, str):
+            return self._by_id.get(player)
+
+        if self._by_id and 'Player_ID' in player:
+            return self._by_id.get(player['Player_ID'])
+
+        pos = self._by_key.get((player['Player'], player['Squad']))
+        if pos is None:
+            pos = self._by_name.get(player['Player'])
+
+        return pos
+
+    def ann_index(self, role, algorithm):
+
+        """
+        Το IVF index του (ρόλου, metric). Χτίζεται την πρώτη φορά που χρειάζεται.
+        """
+
+        matrix = self.profile(role)[algorithm][0]
+        key = (WEIGHT_PROFILES.resolve(role), algorithm)
+
+        if key not in self._ann:
+            with metrics.timer('engine.ann_build', algorithm=algorithm):
+                self._ann[key] = IVFIndex(matrix, algorithm, self.n_lists, self.n_probe)
+
+        return self._ann[key]
+
+    def build_ann(self, roles=ROLES, workers=None):
+
+        """
+        Χτίζει από πριν όλα τα IVF indexes (αλλιώς χτίζονται lazily στο πρώτο query),
+        ένα ανά (ρόλο, metric) σε `workers` threads (default: parallel.WORKERS).
+        """
+
+        keys = [(role, algorithm) for role in roles if self.profile(role) is not None for algorithm in self.METRICS]
+        parallel.thread_map(lambda key: self.ann_index(*key), keys, workers)
+
+    def distances(self, rows, algorithm='cosine', role=None, candidates=None):
+
+        """
+        Αποστάσεις των γραμμών `rows` από όλους τους παίκτες (πίνακας len(rows) x N),
+        ή μόνο από τις γραμμές `candidates` (πίνακας len(rows) x len(candidates)).
+        Αν δεν δοθεί role, χρησιμοποιούνται τα βάρη του ρόλου της πρώτης γραμμής.
+        """
+
+        rows = np.atleast_1d(rows)
+        if role is None:
+            role = self.df['Role'].iloc[rows[0]]
+
+        profile = self.profile(role)
+        if profile is None:
+            return None
+
+        matrix, sq_norms = profile[algorithm]
+
+        return self._block_distances(matrix[rows], None if sq_norms is None else sq_norms[rows],
+                                     algorithm, role, candidates)
+
+    def _block_distances(self, block, block_sq_norms, algorithm, role, candidates=None):
+
+        """
+        Αποστάσεις γραμμών ήδη στον χώρο του ρόλου (weighted, normalized για cosine)
+        από όλους τους παίκτες ή μόνο από τους `candidates`. Κοινός kernel για
+        γραμμές του df και για συνθετικά query vectors (βλ. kneighbors_blend).
+        """
+
+        matrix, sq_norms = self.profile(role)[algorithm]
+
+        # Πολλοί υποψήφιοι: φθηνότερο να υπολογιστούν όλες οι αποστάσεις και να κρατηθούν
+        # οι στήλες τους, παρά να αντιγραφούν οι γραμμές τους (βλ. GATHER_RATIO)
+        if candidates is not None and len(candidates) > GATHER_RATIO * len(matrix):
+            return self._block_distances(block, block_sq_norms, algorithm, role)[:, candidates]
+
+        others = matrix if candidates is None else matrix.take(candidates, axis=0)
+
+        # In-place πράξεις (ίδια αριθμητική, χωρίς ενδιάμεσους πίνακες block x N)
+        products = block @ others.T
+
+        if algorithm == 'cosine':
+            distances = np.subtract(1, products, out=products)
+            np.clip(distances, 0, 2, out=distances)
+        else:
+            # euclidean: ||a-b||² = ||a||² + ||b||² - 2a·b
+            other_norms = sq_norms if candidates is None else sq_norms.take(candidates)
+            distances = np.add(block_sq_norms[:, None], other_norms[None, :])
+            products *= 2
+            distances -= products
+            np.maximum(distances, 0, out=distances)
+            np.sqrt(distances, out=distances)
+
+        # Στρογγυλοποίηση ώστε ισοπαλίες να μην εξαρτώνται από το μέγεθος του block (BLAS rounding)
+        return np.round(distances, DISTANCE_DECIMALS, out=distances)
+
+    def diversity_groups(self, diversity):
+
+        """
+        Κωδικοί ομάδας (κανόνες x N) και όρια για ένα dict κανόνων
+        (π.χ. {'league': 4, 'squad': 2}). Οι κωδικοί κάθε κανόνα υπολογίζονται μία φορά.
+        """
+
+        rules = [(rule, cap) for rule, cap in diversity.items() if cap is not None]
+
+        for rule, _ in rules:
+            if rule not in self._diversity_codes:
+                column = DIVERSITY_COLUMNS.get(rule)
+                values = self.df[column] if column in self.df.columns else np.zeros(len(self.df))
+                self._diversity_codes[rule] = diversity_codes(values, rule)
+
+        groups = np.array([self._diversity_codes[rule] for rule, _ in rules]).reshape(len(rules), len(self.df))
+        return groups, np.array([cap for _, cap in rules], dtype=np.int64)
+
+    @metrics.timed('similarity.query')
+    def kneighbors(self, row, algorithm='cosine', k=10, role=None, diversity=None, filters=None):
+
+        """
+        Οι k πιο κοντινοί παίκτες της γραμμής `row` (χωρίς τον ίδιο).
+
+        Με `diversity` (π.χ. {'league': 4, 'squad': 2, 'age_band': 3}) τα όρια
+        εφαρμόζονται μέσα στην επιλογή του top-k: αν οι υποψήφιοι δεν φτάνουν για
+        k παίκτες, ζητούνται περισσότεροι (x4 κάθε φορά) μέχρι να γεμίσει η λίστα.
+
+        Με `filters` (π.χ. {'age': (None, 22), 'exclude_league': 'Premier League'},
+        βλ. FILTER_KEYS) οι αποστάσεις υπολογίζονται μόνο προς όσους περνούν τα
+        predicates, άρα επιστρέφονται k παίκτες όποτε υπάρχουν k που πληρούν τα φίλτρα.
+
+        Returns:
+            (indices, distances): Θέσεις γραμμών (iloc) και αποστάσεις, ή (None, None)
+        """
+
+        if algorithm not in self.METRICS:
+            raise ValueError(f"Unknown algorithm '{algorithm}'. Use 'cosine' or 'euclidean'.")
+
+        metrics.count('similarity.queries', algorithm=algorithm, backend=self.backend)
+
+        if role is None:
+            role = self.df['Role'].iloc[row]
+
+        if self.profile(role) is None:
+            return None, None
+
+        candidates, excluded = self.filter_candidates(filters)
+        n_others = len(self.df) - 1
+
+        if candidates is not None:
+            # Predicate pushdown (exact και στο IVF backend): λίγοι υποψήφιοι -> αποστάσεις μόνο
+            # προς αυτούς, πολλοί -> όλες οι αποστάσεις με inf για όσους αποκλείονται
+            sparse = excluded is None
+            distances = self.distances([row], algorithm, role, candidates if sparse else None)[0]
+            is_member, positions = member_positions(candidates, [row])
+
+            if sparse:
+                distances[positions[is_member]] = np.inf
+            else:
+                distances[excluded] = np.inf
+                distances[row] = np.inf
+
+            nearest = exact_nearest(distances, candidates if sparse else None)
+            n_others = len(candidates) - int(is_member[0])
+        elif self.backend == 'ivf':
+            # Approximate: exact αποστάσεις μόνο για τους υποψήφιους των κοντινότερων lists
+            index = self.ann_index(role, algorithm)
+
+            def nearest(fetch):
+                candidates = index.candidates(index.matrix[row], min_candidates=fetch + 1)
+                candidates = candidates[candidates != row]
+
+                distances = self.distances([row], algorithm, role, candidates)
+                positions, distances = top_k_neighbors(distances, fetch)
+
+                return candidates[positions[0]], distances[0]
+        else:
+            all_distances = self.distances([row], algorithm, role)
+            all_distances[0, row] = np.inf
+            nearest = exact_nearest(all_distances[0])
+
+        return self._select_nearest(nearest, k, n_others, diversity)
+
+    def filter_candidates(self, filters):
+
+        """
+        Οι γραμμές που περνούν τα predicates (βλ. FILTER_KEYS), από τα προϋπολογισμένα
+        masks του BrowseIndex (χτίζεται την πρώτη φορά που χρειάζεται). Τα τελευταία
+        FILTER_CACHE_SIZE σετ φίλτρων κρατιούνται έτοιμα.
+
+        Returns:
+            (candidates, excluded): Οι ταξινομημένες γραμμές που περνούν, και (μόνο όταν
+            είναι πάνω από GATHER_RATIO) όσες αποκλείονται. (None, None) χωρίς φίλτρα
+            ή όταν τα περνούν όλοι.
+        """
+
+        filters = {key: value for key, value in (filters or {}).items() if value is not None}
+        if not filters:
+            return None, None
+
+        unknown = set(filters) - set(FILTER_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown filters {sorted(unknown)}. Use any of {list(FILTER_KEYS)}.")
+
+        key = tuple(sorted(
+            (name, value if isinstance(value, str) or not np.iterable(value) else tuple(value))
+            for name, value in filters.items()
+        ))
+
+        cached = self._filter_cache.get(key)
+        if cached is not None:
+            self._filter_cache.move_to_end(key)
+            return cached
+
+        if self._filter_index is None:
+            self._filter_index = BrowseIndex(self.df)
+
+        mask = self._filter_index.mask(**filters)
+
+        if mask.all():
+            cached = (None, None)
+        else:
+            candidates = np.flatnonzero(mask)
+            excluded = np.flatnonzero(~mask) if len(candidates) > GATHER_RATIO * len(mask) else None
+            cached = (candidates, excluded)
+
+        self._filter_cache[key] = cached
+        while len(self._filter_cache) > FILTER_CACHE_SIZE:
+            self._filter_cache.popitem(last=False)
+
+        return cached
+
+    def _select_nearest(self, nearest, k, n_others, diversity=None):
+
+        """
+        Οι k πρώτοι από το nearest(fetch) (τους fetch πιο κοντινούς υποψήφιους).
+        Με diversity, τα όρια εφαρμόζονται μέσα στην επιλογή και ζητούνται
+        περισσότεροι υποψήφιοι (x4 κάθε φορά) μέχρι να γεμίσει η λίστα.
+        """
+
+        k = min(k, n_others)
+
+        if not diversity:
+            return nearest(k)
+
+        groups, caps = self.diversity_groups(diversity)
+        fetch = min(n_others, 2 * k)
+
+        while True:
+            indices, distances = nearest(fetch)
+            with metrics.timer('similarity.diversify'):
+                keep = select_diverse(groups[:, indices], caps, k)
+
+            if len(keep) >= k or fetch >= n_others:
+                return indices[keep], distances[keep]
+
+            metrics.count('similarity.diversify_refetch')
+            fetch = min(n_others, fetch * 4)
+
+    @metrics.timed('similarity.batch_query')
+    def kneighbors_batch(self, rows, algorithm='cosine', k=10, role=None, diversity=None, filters=None, block_size=None):
+
+        """
+        Οι k γείτονες για πολλά targets μαζί (π.χ. ένα shortlist): ένα matrix product
+        (targets x N) ανά ρόλο αντί για ένα query ανά target. Κάθε target χρησιμοποιεί
+        τα βάρη του δικού του ρόλου (ή του `role`), με αποτέλεσμα ίδιο με το kneighbors.
+
+        Args:
+            rows (array): Οι θέσεις γραμμών των targets
+            filters (dict): Predicates για όλα τα targets (βλ. kneighbors / FILTER_KEYS)
+            block_size (int): Targets ανά block (default: ~256K αποστάσεις, ώστε το block να μένει στην cache)
+
+        Returns:
+            list: [(indices, distances), ...] ένα ανά target, με τη σειρά των rows
+        """
+
+        if algorithm not in self.METRICS:
+            raise ValueError(f"Unknown algorithm '{algorithm}'. Use 'cosine' or 'euclidean'.")
+
+        rows = np.asarray(rows, dtype=int)
+
+        # Το IVF ψάχνει διαφορετικούς υποψήφιους ανά query, δεν έχει κοινό block
+        if self.backend == 'ivf':
+            return [self.kneighbors(int(row), algorithm, k, role, diversity, filters) for row in rows]
+
+        metrics.count('similarity.queries', len(rows), algorithm=algorithm, backend=self.backend)
+
+        # Οι ίδιοι υποψήφιοι (predicate pushdown) για όλα τα targets
+        candidates, excluded = self.filter_candidates(filters)
+        sparse = candidates is not None and excluded is None
+        n = len(self.df) if candidates is None else len(candidates)
+        if block_size is None:
+            block_size = max(1, BATCH_BLOCK // max(n if sparse else len(self.df), 1))
+
+        roles = self.df['Role'].iloc[rows].to_numpy() if role is None else np.full(len(rows), role, dtype=object)
+        results = [(None, None)] * len(rows)
+
+        for group_role in pd.unique(roles):
+            if self.profile(group_role) is None:
+                continue
+
+            positions = np.flatnonzero(roles == group_role)
+
+            for start in range(0, len(positions), block_size):
+                block_positions = positions[start:start + block_size]
+                block_rows = rows[block_positions]
+
+                block = self.distances(block_rows, algorithm, group_role, candidates if sparse else None)
+
+                # Χωρίς τον ίδιο (τη στήλη του, αν περνάει τα φίλτρα) και χωρίς όσους αποκλείονται
+                if candidates is None:
+                    is_member, columns = np.ones(len(block_rows), dtype=bool), block_rows
+                else:
+                    is_member, member_columns = member_positions(candidates, block_rows)
+                    columns = member_columns if sparse else block_rows
+                    if not sparse:
+                        block[:, excluded] = np.inf
+                block[np.flatnonzero(is_member), columns[is_member]] = np.inf
+
+                index_map = candidates if sparse else None
+
+                if not diversity:
+                    # Top-k χωρίς τον ίδιο: αν μπήκε (λίγοι υποψήφιοι), είναι μετά από όλους τους άλλους
+                    indices, distances = top_k_neighbors(block, min(k, n))
+                    if index_map is not None:
+                        indices = index_map[indices]
+                    for i, pos in enumerate(block_positions):
+                        keep = min(k, n - is_member[i])
+                        results[pos] = (indices[i, :keep], distances[i, :keep])
+                    continue
+
+                for i, pos in enumerate(block_positions):
+                    nearest = exact_nearest(block[i], index_map)
+                    results[pos] = self._select_nearest(nearest, k, n - is_member[i], diversity)
+
+        return results
+
+    @metrics.timed('similarity.blend_query')
+    def kneighbors_blend(self, rows, weights=None, algorithm='cosine', k=10, role=None, diversity=None, filters=None):
+
+        """
+        Οι k πιο κοντινοί σε έναν συνθετικό παίκτη: τον weighted μέσο όρο των γραμμών
+        `rows` στον scaled feature space ("ποιος παίζει σαν τον μέσο όρο των A, B, C;").
+        Οι παίκτες του blend δεν επιστρέφονται. Πάντα exact (brute-force), και για το IVF backend.
+
+        Args:
+            rows (array): Οι θέσεις γραμμών των παικτών του blend
+            weights (array): Βάρος ανά παίκτη (default: ίσα βάρη)
+            role (str): Τα βάρη features ποιου ρόλου (default: του ρόλου της πρώτης γραμμής)
+            filters (dict): Predicates πριν το top-k (βλ. kneighbors / FILTER_KEYS)
+
+        Returns:
+            (indices, distances): Θέσεις γραμμών (iloc) και αποστάσεις, ή (None, None)
+        """
+
+        if algorithm not in self.METRICS:
+            raise ValueError(f"Unknown algorithm '{algorithm}'. Use 'cosine' or 'euclidean'.")
+
+        rows = np.atleast_1d(np.asarray(rows, dtype=int))
+        weights = np.ones(len(rows)) if weights is None else np.asarray(weights, dtype=float)
+
+        if len(rows) == 0 or len(weights) != len(rows):
+            raise ValueError("blend needs at least one player and one weight per player")
+        if (weights < 0).any() or weights.sum() <= 0:
+            raise ValueError("blend weights must be non-negative with a positive sum")
+
+        metrics.count('similarity.queries', algorithm=algorithm, backend='blend')
+
+        if role is None:
+            role = self.df['Role'].iloc[rows[0]]
+
+        if self.profile(role) is None:
+            return None, None
+
+        # Ο συνθετικός παίκτης περνάει από τα ίδια βάρη / normalization με τις γραμμές του df
+        vector = (weights @ self.scaled[rows]) / weights.sum()
+        matrix, sq_norms = self._role_matrices(role, vector[None, :])[algorithm]
+
+        candidates, excluded = self.filter_candidates(filters)
+        sparse = candidates is not None and excluded is None
+        distances = self._block_distances(matrix, sq_norms, algorithm, role, candidates if sparse else None)[0]
+        members = np.unique(rows)
+
+        if candidates is None:
+            distances[members] = np.inf
+            n_others = len(self.df) - len(members)
+        else:
+            is_member, positions = member_positions(candidates, members)
+            if sparse:
+                distances[positions[is_member]] = np.inf
+            else:
+                distances[excluded] = np.inf
+                distances[members] = np.inf
+            n_others = len(candidates) - int(is_member.sum())
+
+        nearest = exact_nearest(distances, candidates if sparse else None)
+        return self._select_nearest(nearest, k, n_others, diversity)
+
+    def contributions(self, row, indices, algorithm='cosine', role=None):
+
+        """
+        Πόσο συνεισφέρει κάθε feature στην ομοιότητα του target με κάθε γείτονα, σε ένα
+        vectorized πέρασμα πάνω στους ίδιους πίνακες του query:
+            cosine:    a_f * b_f / (a · b)         (μερίδιο στο dot product)
+            euclidean: (a_f - b_f)² / ||a - b||²   (μερίδιο στην squared distance)
+
+        Args:
+            row (int): Η θέση του target
+            indices (array): Οι θέσεις των γειτόνων (π.χ. από το kneighbors)
+            role (str): Τα βάρη ποιου ρόλου / προφίλ (default: του ρόλου του target)
+
+        Returns:
+            DataFrame: len(indices) x features του ρόλου (index του df), με άθροισμα 1
+                       ανά γραμμή (0 όπου ο παρονομαστής είναι 0). None αν ο ρόλος δεν έχει βάρη
+        """
+
+        if algorithm not in self.METRICS:
+            raise ValueError(f"Unknown algorithm '{algorithm}'. Use 'cosine' or 'euclidean'.")
+
+        if role is None:
+            role = self.df['Role'].iloc[row]
+
+        profile = self.profile(role)
+        if profile is None:
+            return None
+
+        features = self.role_features(role)
+        columns = [self.features.index(feat) for feat in features]
+
+        matrix = profile[algorithm][0][:, columns]
+        indices = np.asarray(indices, dtype=int)
+        others = matrix[indices]
+
+        if algorithm == 'cosine':
+            terms = others * matrix[row]
+        else:
+            terms = np.square(others - matrix[row])
+
+        totals = terms.sum(axis=1, keepdims=True)
+        shares = np.divide(terms, totals, out=np.zeros_like(terms), where=totals > 0)
+
+        return pd.DataFrame(shares, index=self.df.index[indices], columns=features)
+
+    def query(self, player, algorithm='cosine', k=10, diversity=None, filters=None, profile=None, explain=False):
+
+        """
+        Βρίσκει τους k πιο παρόμοιους παίκτες χωρίς κανένα fit.
+
+        Args:
+            player (Series | int): Ο target παίκτης ή η θέση του στο df
+            algorithm (str): 'cosine' ή 'euclidean'
+            k (int): Πόσους παρόμοιους να βρει
+            diversity (dict): Όρια ανά λίγκα/ομάδα/age band (βλ. kneighbors)
+            filters (dict): Predicates πριν το top-k, π.χ. {'age': (None, 22)} (βλ. FILTER_KEYS)
+            profile (str): Προφίλ βαρών του WEIGHT_PROFILES (default: του ρόλου του target)
+            explain (bool): Επιστρέφει και τη συνεισφορά κάθε feature ανά γείτονα (βλ. contributions)
+
+        Returns:
+            DataFrame: Παρόμοιοι παίκτες με Similarity_Score στήλη (ή None).
+                       Με explain=True: (results, contributions)
+        """
+
+        check_profile(profile)
+
+        row = self.locate(player)
+        if row is None:
+            return (None, None) if explain else None
+
+        indices, distances = self.kneighbors(row, algorithm, k, profile, diversity, filters)
+        results = self._results(indices, distances, algorithm)
+
+        if not explain:
+            return results
+
+        return results, None if indices is None else self.contributions(row, indices, algorithm, profile)
+
+    def _locate_all(self, players):
+        rows = [self.locate(player) for player in players]
+
+        missing = [player if isinstance(player, (int, np.integer, str)) else player.get('Player')
+                   for player, row in zip(players, rows) if row is None]
+        if missing:
+            raise LookupError(f"players not found: {missing}")
+
+        return np.array(rows, dtype=int)
+
+    def _results(self, indices, distances, algorithm):
+        if indices is None:
+            return None
+
+        results = self.df.iloc[indices].copy()
+        results['Similarity_Score'] = similarity_scores(distances, algorithm)
+
+        return results
+
+    def query_many(self, players, algorithm='cosine', k=10, diversity=None, filters=None, profile=None):
+
+        """
+        Οι k πιο παρόμοιοι για κάθε target ενός shortlist, σε ένα batched query
+        (βλ. kneighbors_batch).
+
+        Args:
+            players (list): Targets (θέσεις γραμμών, Player_IDs ή γραμμές παικτών)
+
+        Returns:
+            dict: Player_ID (ή θέση γραμμής, αν δεν υπάρχουν IDs) -> DataFrame με
+                  Similarity_Score (ή None), με τη σειρά των players
+        """
+
+        check_profile(profile)
+
+        rows = self._locate_all(players)
+        neighbors = self.kneighbors_batch(rows, algorithm, k, profile, diversity, filters)
+        keys = self.df['Player_ID'].to_numpy()[rows] if 'Player_ID' in self.df.columns else rows
+
+        return {
+            key: self._results(indices, distances, algorithm)
+            for key, (indices, distances) in zip(keys.tolist(), neighbors)
+        }
+
+    def query_blend(self, players, weights=None, algorithm='cosine', k=10, role=None, diversity=None, filters=None):
+
+        """
+        Οι k πιο παρόμοιοι με τον weighted μέσο όρο των players (βλ. kneighbors_blend).
+
+        Returns:
+            DataFrame: Παρόμοιοι παίκτες με Similarity_Score στήλη (ή None)
+        """
+
+        rows = self._locate_all(players)
+        indices, distances = self.kneighbors_blend(rows, weights, algorithm, k, role, diversity, filters)
+
+        return self._results(indices, distances, algorithm)
+
+    @metrics.timed('similarity.neighbor_table')
+    def neighbor_table(self, k=10, algorithm='cosine', roles=None, rows=None, block_size=None, workers=None):
+
+        """
+        All-pairs top-k: οι k γείτονες για κάθε γραμμή, ανά προφίλ ρόλου.
+
+        Ο υπολογισμός γίνεται σε blocks γραμμών (block_size x N αποστάσεις τη φορά),
+        ώστε η μνήμη να μένει σταθερή όσο μεγαλώνει ο πίνακας. Χρησιμοποιεί τον ίδιο
+        kernel με το kneighbors, άρα τα αποτελέσματα ταυτίζονται με τα single queries.
+
+        Args:
+            k (int): Πόσους γείτονες ανά παίκτη
+            algorithm (str): 'cosine' ή 'euclidean'
+            roles (list): Ποια προφίλ βαρών (default: όλα τα ROLES)
+            rows (array): Για ποιες γραμμές (default: όλες)
+            block_size (int): Γραμμές ανά block (default: ~16M αποστάσεις ανά block,
+                μοιρασμένες σε parallel.BLOCKS_PER_WORKER blocks ανά worker)
+            workers (int): Διεργασίες για τα blocks (default: parallel.WORKERS, βλ. parallel.neighbor_tables)
+
+        Returns:
+            dict: role -> {'rows', 'indices', 'distances', 'scores'} (πίνακες len(rows) x k)
+        """
+
+        if algorithm not in self.METRICS:
+            raise ValueError(f"Unknown algorithm '{algorithm}'. Use 'cosine' or 'euclidean'.")
+
+        rows = np.arange(len(self.df)) if rows is None else np.asarray(rows, dtype=int)
+        roles = [role for role in (ROLES if roles is None else roles) if self.profile(role) is not None]
+
+        parts = self.neighbor_jobs([(role, rows) for role in roles], k, algorithm, block_size, workers)
+
+        return {
+            role: {
+                'rows': rows,
+                'indices': indices,
+                'distances': distances,
+                'scores': similarity_scores(distances, algorithm).astype(np.float32),
+            }
+            for role, (indices, distances) in zip(roles, parts)
+        }
+
+    def neighbor_jobs(self, jobs, k, algorithm='cosine', block_size=None, workers=None):
+
+        """
+        Οι k γείτονες για πολλά (ρόλος, γραμμές), σειριακά ή με `workers` διεργασίες
+        πάνω σε shared memory (ίδια αποτελέσματα και στις δύο περιπτώσεις).
+
+        Returns:
+            list: [(indices, distances), ...] ένα ανά job (πίνακες len(rows) x k)
+        """
+
+        n = len(self.scaled)
+        k = max(0, min(k, n - 1))
+        workers = parallel.resolve_workers(workers)
+        total = sum(len(rows) for _, rows in jobs)
+
+        if block_size is None:
+            # Το πολύ ~16M αποστάσεις ανά block και, με workers, ~BLOCKS_PER_WORKER
+            # blocks ανά worker, ώστε το process pool να τρέχει σε κάθε μέγεθος dataset
+            block_size = max(1, (1 << 24) // max(n, 1))
+            if workers > 1:
+                block_size = max(1, min(block_size, -(-total // (workers * parallel.BLOCKS_PER_WORKER))))
+
+        if workers > 1 and total > block_size:
+            # Τα προφίλ χτίζονται πρώτα εδώ, ώστε οι workers να πάρουν τον τελικό
+            # scaled πίνακα (με όσα features πρόσθεσε κάποιο custom προφίλ)
+            for role, _ in jobs:
+                self.profile(role)
+            return parallel.neighbor_tables(self, jobs, k, algorithm, block_size, workers)
+
+        parts = []
+        for role, rows in jobs:
+            indices = np.empty((len(rows), k), dtype=np.int32)
+            distances = np.empty((len(rows), k))
+
+            for start in range(0, len(rows), block_size):
+                stop = start + block_size
+                self.fill_neighbors(role, algorithm, k, rows[start:stop], indices[start:stop], distances[start:stop])
+
+            parts.append((indices, distances))
+
+        return parts
+
+    def fill_neighbors(self, role, algorithm, k, rows, indices, distances):
+
+        """
+        Ένα block του neighbor table: γράφει στα indices / distances (len(rows) x k)
+        τους k γείτονες κάθε γραμμής, χωρίς τον ίδιο.
+        """
+
+        block = self.distances(rows, algorithm, role)
+        block[np.arange(len(rows)), rows] = np.inf  # χωρίς τον ίδιο
+
+        indices[:], distances[:] = top_k_neighbors(block, k)
+
+    def own_role_neighbors(self, k=10, algorithm='cosine', block_size=None, workers=None):
+
+        """
+        Οι k γείτονες κάθε παίκτη με τα βάρη του δικού του ρόλου
+        (ό,τι θα έδινε το query για κάθε παίκτη ξεχωριστά).
+
+        Returns:
+            (indices, scores): Πίνακες N x k
+        """
+
+        n = len(self.df)
+        k = max(0, min(k, n - 1))
+
+        indices = np.zeros((n, k), dtype=np.int32)
+        scores = np.zeros((n, k), dtype=np.float32)
+
+        roles = self.df['Role'].to_numpy()
+        jobs = [
+            (role, np.flatnonzero(roles == role))
+            for role in pd.unique(roles) if self.profile(role) is not None
+        ]
+
+        for (role, rows), (part_indices, distances) in zip(jobs, self.neighbor_jobs(jobs, k, algorithm, block_size, workers)):
+            indices[rows] = part_indices
+            scores[rows] = similarity_scores(distances, algorithm)
+
+        return indices, scores
+
+
+# Μικρό cache ώστε οι κλήσεις με το ίδιο df να μοιράζονται το ίδιο engine
+_engine_cache = OrderedDict()
+
+
+def get_engine(df, max_cached=4):
+
+    """
+    Επιστρέφει το SimilarityEngine για το συγκεκριμένο DataFrame.
+    Χτίζεται μία φορά ανά df και επαναχρησιμοποιείται στις επόμενες κλήσεις.
+    """
+
+    entry = _engine_cache.get(id(df))
+    if entry is not None and entry[0] is df:
+        _engine_cache.move_to_end(id(df))
+        return entry[1]
+
+    engine = SimilarityEngine(df)
+    _engine_cache[id(df)] = (df, engine)
+
+    while len(_engine_cache) > max_cached:
+        _engine_cache.popitem(last=False)
+
+    return engine
+
+
+
+# --- 🔄 INCREMENTAL UPDATES ---
+
+def team_index(df):
+
+    """
+    Το κλειδί ομάδας (βλ. team_keys) κάθε γραμμής ως Index, για γρήγορο isin.
+    """
+
+    keys = team_keys(df)
+    return pd.MultiIndex.from_frame(df[keys]) if isinstance(keys, list) else pd.Index(df[keys])
+
+
+def overwrite_rows(frame, positions, rows):
+
+    """
+    Γράφει in place τις γραμμές rows στις θέσεις positions (iloc) του frame, μόνο
+    στις στήλες που πραγματικά αλλάζουν. Δεν αλλάζει τίποτα και επιστρέφει False αν
+    το rows έχει στήλη που λείπει από το frame ή άλλο dtype (τότε ο caller χτίζει νέο frame).
+    """
+
+    columns = frame.columns.get_indexer(rows.columns)
+    if (columns < 0).any() or not rows.dtypes.equals(frame.dtypes.iloc[columns].set_axis(rows.columns)):
+        return False
+
+    current = frame.iloc[positions]
+    for j, col in zip(columns, rows.columns):
+        values = rows[col].to_numpy()
+        if not np.array_equal(current[col].to_numpy(), values):
+            frame.iloc[positions, j] = values
+
+    return True
+
+
+class LiveDataset:
+
+    """
+    Prepared dataset + SimilarityEngine που δέχονται αλλαγές (νέοι ή ενημερωμένοι παίκτες)
+    χωρίς πλήρες reload: το prep ξανατρέχει μόνο για τις γραμμές που άλλαξαν, το
+    Team_Goal_Share μόνο για τις ομάδες τους και ο engine ενημερώνεται in place.
+    Το αποτέλεσμα είναι ίδιο με prep_player_data(raw) + SimilarityEngine από την αρχή.
+    """
+
+    def __init__(self, raw, **engine_options):
+
+        """
+        Args:
+            raw (DataFrame): Raw δεδομένα (μορφή perfect_merge.csv)
+            **engine_options: Παράμετροι του SimilarityEngine (backend, n_lists, n_probe)
+        """
+
+        self.raw = raw.reset_index(drop=True)
+        self.keys = ['Player', 'Squad'] + (['Season'] if 'Season' in raw.columns else [])
+        self._positions = {key: pos for pos, key in enumerate(self.raw[self.keys].itertuples(index=False, name=None))}
+
+        # Οι FW/MF πριν το φίλτρο λεπτών (τα σύνολα ομάδας μετράνε και όσους έχουν <= 450'),
+        # με index τη θέση της γραμμής στο raw
+        pool = prep_rows(self.raw)
+        pool['Team_Goal_Share'], pool['Team_Goal_Share_NoPK'] = team_goal_shares(pool)
+        self.pool = adjust_rows(pool)
+
+        self.df, self._rows = self._final()
+        self.engine = SimilarityEngine(self.df, **engine_options)
+
+    @classmethod
+    def from_csv(cls, path, **engine_options):
+        return cls(pd.read_csv(path), **engine_options)
+
+    def _final(self):
+
+        """
+        Βήμα 9 πάνω στο pool: το τελικό df και η θέση κάθε γραμμής του στο raw.
+        """
+
+        final = self.pool[self.pool['Min'] > 450]
+        return final.reset_index(drop=True), final.index.to_numpy()
+
+    def apply_update(self, delta_rows):
+
+        """
+        Upsert παικτών με κλειδί (Player, Squad[, Season]). Για παίκτες που υπάρχουν ήδη
+        αρκεί να δοθούν οι στήλες που αλλάζουν. Παίκτες που περνάνε (ή πέφτουν κάτω από)
+        το όριο των 450 λεπτών μπαίνουν (ή βγαίνουν) από το df και τον engine.
+
+        Args:
+            delta_rows (DataFrame | list[dict]): Οι νέες / ενημερωμένες γραμμές
+
+        Returns:
+            dict: Πλήθη (updated, inserted, entered, left, teams, rescored)
+        """
+
+        lap = metrics.laps('update.stage')
+        delta = pd.DataFrame(delta_rows)
+
+        missing = [key for key in self.keys if key not in delta.columns]
+        if missing:
+            raise ValueError(f"Update rows must include the key columns {self.keys} (missing: {missing}).")
+
+        delta = delta.drop_duplicates(self.keys, keep='last').reset_index(drop=True)
+
+        # 1️⃣ UPSERT στο raw (οι ενημερώσεις μένουν στη θέση τους, οι νέοι μπαίνουν στο τέλος)
+        found = [self._positions.get(key) for key in delta[self.keys].itertuples(index=False, name=None)]
+        is_update = np.array([pos is not None for pos in found], dtype=bool)
+        update_pos = np.array([pos for pos in found if pos is not None], dtype=np.intp)
+
+        updates = self.raw.iloc[update_pos].copy()
+        for col in delta.columns:
+            updates[col] = delta.loc[is_update, col].to_numpy()
+        inserts = delta[~is_update]
+
+        old_teams = team_index(self.raw.iloc[update_pos])
+        n_raw = len(self.raw)
+        take = np.arange(n_raw + len(inserts))
+        take[update_pos] = n_raw + np.arange(len(updates))
+        take[n_raw:] = n_raw + len(updates) + np.arange(len(inserts))
+
+        dtypes = self.raw.dtypes
+        if len(inserts) or not overwrite_rows(self.raw, update_pos, updates[delta.columns]):
+            parts = [self.raw] + [part for part in (updates, inserts) if len(part)]
+            self.raw = pd.concat(parts, ignore_index=True).take(take).reset_index(drop=True)
+
+        # Αν άλλαξε το dtype κάποιας στήλης (π.χ. νέα στήλη ή αριθμοί ως strings) ξαναγίνεται
+        # το prep σε όλες τις γραμμές, ώστε τα dtypes να βγαίνουν ίδια με ένα πλήρες prep
+        if self.raw.dtypes.equals(dtypes):
+            changed = np.concatenate([update_pos, np.arange(n_raw, len(self.raw))])
+        else:
+            changed = np.arange(len(self.raw))
+        for pos, key in enumerate(inserts[self.keys].itertuples(index=False, name=None), start=n_raw):
+            self._positions[key] = pos
+        lap('upsert')
+
+        # 2️⃣ Βήματα 1-4 και 6-8 μόνο για τις γραμμές που άλλαξαν
+        rows = prep_rows(self.raw.iloc[changed])
+        rows['Team_Goal_Share'] = 0.0
+        rows['Team_Goal_Share_NoPK'] = 0.0
+        adjust_rows(rows)
+
+        # Συνήθης περίπτωση (κανείς δεν μπαίνει / βγαίνει από τους FW/MF): εγγραφή in place
+        in_pool = self.pool.index.get_indexer(changed)
+        stays = np.array_equal(rows.index.to_numpy(), changed[in_pool >= 0])
+        if not (stays and overwrite_rows(self.pool, in_pool[in_pool >= 0], rows)):
+            # Αν ξαναγίνεται το prep σε όλες τις γραμμές (π.χ. νέα στήλη στο raw), το pool
+            # είναι οι νέες γραμμές, με τη σειρά στηλών ενός πλήρους prep
+            kept = self.pool.drop(index=changed, errors='ignore')
+            if not len(kept):
+                self.pool = rows
+            elif len(rows):
+                self.pool = pd.concat([kept, rows]).sort_index()
+            else:
+                self.pool = kept
+        lap('rows')
+
+        # 3️⃣ Βήμα 5 μόνο για τις ομάδες που επηρεάζονται (παλιά και νέα ομάδα κάθε παίκτη)
+        teams = old_teams.append(team_index(self.raw.iloc[changed])).unique()
+        in_teams = team_index(self.pool).isin(teams)
+        share, share_no_pk = team_goal_shares(self.pool[in_teams])
+        self.pool.loc[in_teams, 'Team_Goal_Share'] = share
+        self.pool.loc[in_teams, 'Team_Goal_Share_NoPK'] = share_no_pk
+        lap('team_share')
+
+        # 4️⃣ Βήμα 9 + αντιστοίχιση των τελικών γραμμών με τις παλιές (-1 = νέα στο df)
+        old_rows = self._rows
+        self.df, self._rows = self._final()
+
+        source_rows = pd.Index(old_rows).get_indexer(self._rows)
+        lap('minutes')
+
+        # 5️⃣ Ο engine ενημερώνεται in place
+        rescored = self.engine.apply_update(self.df, source_rows)
+        lap('engine')
+
+        entered = int((source_rows < 0).sum())
+
+        return {
+            'updated': len(updates),
+            'inserted': len(inserts),
+            'entered': entered,
+            'left': len(old_rows) - (len(self._rows) - entered),
+            'teams': len(teams),
+            'rescored': rescored,
+        }
+
+
+# --- 🔎 NAME SEARCH INDEX ---
+
+# Γράμματα που το NFKD δεν "σπάει" σε βάση + τόνο
+_FOLD_TABLE = str.maketrans({
+    'ø': 'o', 'ł': 'l', 'ß': 'ss', 'ı': 'i', 'đ': 'd',
+    'æ': 'ae', 'œ': 'oe', 'þ': 'th', 'ð': 'd', '-': ' ', "'": ' ', '.': ' '
+})
+
+
+def fold_name(name):
+
+    """
+    Accent-insensitive μορφή ονόματος: 'Kylian Mbappé' -> 'kylian mbappe'.
+    """
+
+    name = unicodedata.normalize('NFKD', str(name).casefold())
+    name = ''.join(ch for ch in name if not unicodedata.combining(ch))
+
+    return ' '.join(name.translate(_FOLD_TABLE).split())
+
+
+def name_trigrams(token):
+
+    """
+    Padded trigrams ενός token ('haland' -> '  h', ' ha', 'hal', ..., 'nd ').
+    """
+
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+
+    """
+    Index ονομάτων παικτών που χτίζεται μία φορά στο load.
+
+    - Accent folding ('Mbappe' βρίσκει τον 'Mbappé')
+    - Token / prefix lookup ('haa' -> 'Erling Haaland')
+    - Trigram index για substrings και typos ('Haland' -> 'Haaland')
+
+    Το search επιστρέφει ranked (θέση γραμμής, score). Score >= SUBSTRING σημαίνει
+    κανονικό match, μικρότερο score σημαίνει fuzzy πρόταση.
+    """
+
+    EXACT = 1.0
+    TOKEN = 0.95
+    PREFIX = 0.9
+    SUBSTRING = 0.8
+    FUZZY = 0.7
+
+    @metrics.timed('search.index_build')
+    def __init__(self, names, min_similarity=0.45):
+        self.names = [str(name) for name in names]
+        self.folded = [fold_name(name) for name in self.names]
+        self.min_similarity = min_similarity
+
+        self._full = {}
+        token_rows = {}
+        for row, folded in enumerate(self.folded):
+            self._full.setdefault(folded, []).append(row)
+            for token in folded.split():
+                token_rows.setdefault(token, set()).add(row)
+
+        # Ταξινομημένα tokens για prefix lookup με bisect
+        self.tokens = sorted(token_rows)
+        self._token_rows = [sorted(token_rows[token]) for token in self.tokens]
+
+        # Trigram -> tokens (fuzzy) και trigram -> γραμμές (substring)
+        self._token_trigrams = {}
+        self._row_trigrams = {}
+        for token_id, token in enumerate(self.tokens):
+            for gram in name_trigrams(token):
+                self._token_trigrams.setdefault(gram, []).append(token_id)
+
+        for row, folded in enumerate(self.folded):
+            for i in range(len(folded) - 2):
+                self._row_trigrams.setdefault(folded[i:i + 3], set()).add(row)
+
+        self._token_sizes = [len(name_trigrams(token)) for token in self.tokens]
+
+    def _prefix_rows(self, prefix):
+
+        """
+        Γραμμές με κάποιο token που ξεκινάει από το prefix.
+        """
+
+        start = bisect.bisect_left(self.tokens, prefix)
+        end = bisect.bisect_right(self.tokens, prefix + '\uffff')
+
+        rows = set()
+        for token_id in range(start, end):
+            rows.update(self._token_rows[token_id])
+
+        return rows
+
+    def _substring_rows(self, query):
+
+        """
+        Γραμμές που περιέχουν το query (όπως το str.contains, αλλά μέσω trigrams).
+        """
+
+        if len(query) < 3:
+            return {row for row, folded in enumerate(self.folded) if query in folded}
+
+        grams = [query[i:i + 3] for i in range(len(query) - 2)]
+        postings = sorted((self._row_trigrams.get(gram, set()) for gram in grams), key=len)
+
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return {row for row in candidates if query in self.folded[row]}
+
+    def _fuzzy_rows(self, query_tokens):
+
+        """
+        Typo-tolerant ταίριασμα: Dice similarity των trigrams κάθε token του query
+        με τα tokens των ονομάτων. Score γραμμής = μέσος όρος του καλύτερου ταιριάσματος ανά token.
+        """
+
+        scores = {}
+
+        for query_token in query_tokens:
+            grams = name_trigrams(query_token)
+            shared = {}
+            for gram in grams:
+                for token_id in self._token_trigrams.get(gram, ()):
+                    shared[token_id] = shared.get(token_id, 0) + 1
+
+            best = {}
+            for token_id, count in shared.items():
+                dice = 2 * count / (len(grams) + self._token_sizes[token_id])
+                if dice >= self.min_similarity:
+                    for row in self._token_rows[token_id]:
+                        best[row] = max(best.get(row, 0), dice)
+
+            for row, dice in best.items():
+                scores[row] = scores.get(row, 0) + dice / len(query_tokens)
+
+        return {row: score for row, score in scores.items() if score >= self.min_similarity}
+
+    @metrics.timed('search.names')
+    def search(self, query, limit=None, fuzzy=True):
+
+        """
+        Ranked αναζήτηση ονόματος.
+
+        Args:
+            query (str): Όνομα ή κομμάτι ονόματος (χωρίς τόνους / με typos)
+            limit (int): Μέγιστος αριθμός αποτελεσμάτων (None = όλα τα κανονικά matches)
+            fuzzy (bool): Fuzzy προτάσεις όταν δεν υπάρχει κανονικό match
+
+        Returns:
+            list: [(θέση γραμμής, score), ...] με φθίνον score
+        """
+
+        query = fold_name(query)
+        if not query:
+            return []
+
+        query_tokens = query.split()
+        scores = {}
+
+        def add(rows, score):
+            for row in rows:
+                if scores.get(row, 0) < score:
+                    scores[row] = score
+
+        # 1️⃣ Ολόκληρο το όνομα
+        add(self._full.get(query, ()), self.EXACT)
+
+        # 2️⃣ Tokens / prefixes (κάθε token του query πρέπει να ταιριάζει)
+        prefix_rows = None
+        for token in query_tokens:
+            rows = self._prefix_rows(token)
+            prefix_rows = rows if prefix_rows is None else prefix_rows & rows
+
+        for row in prefix_rows:
+            exact_tokens = all(token in self.folded[row].split() for token in query_tokens)
+            add([row], self.TOKEN if exact_tokens else self.PREFIX)
+
+        # 3️⃣ Substring (ό,τι έβρισκε το str.contains)
+        add(self._substring_rows(query), self.SUBSTRING)
+
+        # 4️⃣ Fuzzy (μόνο αν δεν βρέθηκε τίποτα)
+        if not scores and fuzzy:
+            for row, similarity in self._fuzzy_rows(query_tokens).items():
+                add([row], self.FUZZY * similarity)
+            limit = limit or 10
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit else ranked
+
+
+# --- 🗂️ BROWSE INDEX ---
+
+# Οι στατιστικές ταξινόμησης του browse (φθίνουσα σειρά)
+BROWSE_SORTS = ['Gls', 'Ast', 'G/Sh', 'SoT%', 'Sh/90']
+
+# Οι αριθμητικές στήλες των φίλτρων εύρους (binary search)
+BROWSE_RANGES = ['Age', 'Min']
+
+# Τα predicates του BrowseIndex.mask (browse και filtered kNN):
+#   age=(min, max) inclusive (None = ανοιχτό άκρο), min_minutes=λεπτά,
+#   league / role / squad = τιμή ή λίστα τιμών, exclude_* = τιμές που αποκλείονται
+FILTER_KEYS = ('age', 'min_minutes', 'league', 'exclude_league', 'role', 'exclude_role', 'squad', 'exclude_squad')
+
+
+class BrowseIndex:
+
+    """
+    Index για το browse ανά ρόλο, χτισμένο μία φορά στο load.
+
+    - Bitmap (bool array) ανά ρόλο και ανά λίγκα, κωδικοί (factorize) για τις ομάδες
+    - Προταξινομημένη σειρά γραμμών (φθίνουσα, stable) για κάθε στατιστική του BROWSE_SORTS
+    - Age / Min ταξινομημένα, ώστε ένα εύρος να είναι δύο searchsorted
+
+    Φίλτρο + ταξινόμηση = τομή bitmaps και ένα πέρασμα πάνω στην έτοιμη σειρά,
+    με αποτέλεσμα ίδιο με mask + sort_values(ascending=False, kind='stable').
+    Τα ίδια masks (βλ. mask / FILTER_KEYS) φιλτράρουν και τα kNN queries πριν το top-k.
+    """
+
+    @metrics.timed('browse.index_build')
+    def __init__(self, df):
+        self.size = len(df)
+
+        league_column = 'League_Clean' if 'League_Clean' in df.columns else 'Comp'
+        self.roles = self._bitmaps(df['Role'])
+        self.leagues = self._bitmaps(df[league_column]) if league_column in df.columns else {}
+        self.role_counts = {role: int(bitmap.sum()) for role, bitmap in self.roles.items()}
+
+        # Οι ομάδες είναι πολλές για bitmap ανά ομάδα: κωδικός ανά γραμμή + lookup
+        squad_codes, squads = pd.factorize(df['Squad'])
+        self._squad_codes = squad_codes
+        self._squad_lookup = {squad: code for code, squad in enumerate(squads)}
+
+        # Σειρά γραμμών ανά στατιστική (τα NaN στο τέλος, όπως το sort_values)
+        self.orders = {}
+        for column in BROWSE_SORTS:
+            if column in df.columns:
+                values = df[column].to_numpy(dtype=float, na_value=np.nan)
+                self.orders[column] = np.argsort(-values, kind='stable')
+
+        # Για κάθε στήλη εύρους: οι ταξινομημένες τιμές και η θέση (rank) κάθε γραμμής σε αυτές
+        self._sorted = {}
+        self._ranks = {}
+        for column in BROWSE_RANGES:
+            values = df[column].to_numpy(dtype=float, na_value=np.nan)
+            order = np.argsort(values, kind='stable')
+            order = order[~np.isnan(values[order])]
 
-def get_weights_by_role(role):
+            ranks = np.full(self.size, self.size, dtype=np.int64)
+            ranks[order] = np.arange(len(order))
 
-    """
-    Επιστρέφει τα βάρη (weights) ανάλογα με τον ρόλο.
-    Προσαρμοσμένο στις στήλες που έχουμε (χωρίς xG/xA).
-    """
+            self._sorted[column] = values[order]
+            self._ranks[column] = ranks
 
-    # Βασικά βάρη που ισχύουν για όλους
-    weights = {
-        'Team_Goal_Share': 1.5, # Πόσο σημαντικός είναι για την ομάδα του
-    }
+    @staticmethod
+    def _bitmaps(values):
+        codes, uniques = pd.factorize(values)
+        return {value: codes == code for code, value in enumerate(uniques)}
 
-    # 💀 KILLER STRIKER
-    if 'Killer' in role:
-        weights.update({
-            'Gls_Adj': 2.0,
-            'G/Sh': 1.9,
-            'SoT%': 1.5,
-            'G/SoT': 1.8,
-            'Sh/90': 1.0,
-            'Ast_Adj': 0.3
-        })
-
-    # 🎯 ELITE STRIKER
-    elif 'Elite' in role:
-        weights.update({
-            'Gls_Adj': 1.9,
-            'Sh/90': 1.4,
-            'SoT%': 1.3,
-            'G/Sh': 1.6,
-            'G/SoT': 1.5,
-            'Ast_Adj': 0.5
-        })
-
-    # ⚽ STRIKER
-    elif role == '⚽ Striker':
-        weights.update({
-            'Gls_Adj': 1.7,
-            'Sh/90': 1.3,
-            'SoT%': 1.2,
-            'G/Sh': 1.4,
-            'G/SoT': 1.3,
-            'Ast_Adj': 0.6
-        })
-
-     # 🔗 SUPPORT STRIKER
-    elif 'Support Striker' in role:
-        weights.update({
-            'Gls_Adj': 1.2,
-            'Ast_Adj': 1.4,
-            'Sh/90': 0.9,
-            'SoT%': 1.0,
-            'G/Sh': 1.1,
-            'G/SoT': 1.0
-        })
-
-    # 👻 SHADOW STRIKER / CREATOR
-    elif 'Shadow Striker' in role or 'Creator' in role:
-        weights.update({
-            'Gls_Adj': 1.4,
-            'Ast_Adj': 1.8,
-            'SoT%': 1.3,
-            'G/Sh': 1.2,
-            'Sh/90': 1.1,
-            'G/SoT': 1.1
-        })
-
-    # 🚀 WINGER / INSIDE FORWARD
-    elif 'Inside Forward' in role:
-        weights.update({
-            'Gls_Adj': 1.6,
-            'Sh/90': 1.5,
-            'SoT%': 1.4,
-            'G/Sh': 1.5,
-            'Ast_Adj': 1.0,
-            'G/SoT': 1.3
-        })
-
-    # ⚡ WINGER (ATTACKING)
-    elif 'Winger (Attacking)' in role:
-        weights.update({
-            'Gls_Adj': 1.3,
-            'Ast_Adj': 1.3,
-            'Sh/90': 1.4,
-            'SoT%': 1.2,
-            'G/Sh': 1.2,
-            'G/SoT': 1.1
-        })
-
-     # 🏹 SUPPORTING WINGER
-    elif 'Supporting Winger' in role:
-        weights.update({
-            'Gls_Adj': 0.8,
-            'Ast_Adj': 1.6,
-            'Sh/90': 0.9,
-            'SoT%': 1.0,
-            'G/Sh': 0.9,
-            'G/SoT': 0.9
-        })
-
-    # Default (fallback)
-    else:
-        weights.update({
-            'Gls_Adj': 1.0,
-            'Ast_Adj': 1.0,
-            'Sh/90': 1.0,
-            'SoT%': 1.0,
-            'G/Sh': 1.0,
-            'G/SoT': 1.0
-        })
-    
-    return weights
+    def _in_range(self, column, low=None, high=None):
 
+        """
+        Bitmap των γραμμών με low <= τιμή <= high (τα NaN εκτός).
+        """
 
+        values = self._sorted[column]
+        start = 0 if low is None else np.searchsorted(values, low, side='left')
+        end = len(values) if high is None else np.searchsorted(values, high, side='right')
 
-# --- 🧹 DATA PREPARATION & FEATURE ENGINEERING ---
+        ranks = self._ranks[column]
+        return (ranks >= start) & (ranks < end)
 
-def load_and_prep_data(df):
+    @staticmethod
+    def _values(values):
+        return [values] if isinstance(values, str) or not np.iterable(values) else list(values)
 
-    print("⏳ Loading Database...")
-    try:
-        df = pd.read_csv(df)
-    except FileNotFoundError:
-        print("❌ Error: Το αρχείο csv δεν βρέθηκε.")
-        return None
-    
-    print(f"📦 Loaded {len(df)} players")
+    def _any_bitmap(self, bitmaps, values):
+        bitmap = np.zeros(self.size, dtype=bool)
+        for value in self._values(values):
+            if value in bitmaps:
+                bitmap |= bitmaps[value]
+        return bitmap
 
-    # 1️⃣ ΦΙΛΤΡΑΡΙΣΜΑ ΘΕΣΕΩΝ
-    print("🎯 Filtering positions (FW/MF only)...")
-    df = df[df['Pos'].str.contains('FW|MF', na=False)].copy()
-    
-    # 2️⃣ ΚΑΘΑΡΙΣΜΟΣ & ΜΕΤΑΤΡΟΠΗ ΣΕ ΑΡΙΘΜΟΥΣ
-    cols_to_fix = ['Gls', 'Ast', 'Sh', 'SoT', 'SoT%', 'Sh/90', 'G/Sh', 
-                   'G/SoT', 'G-PK', 'PK', 'PKatt', 'Min']
-    
-    for col in cols_to_fix:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-    
-    # 3️⃣ ΥΠΟΛΟΓΙΣΜΟΣ Ast_per_90
-    df['Ast_per_90'] = ((df['Ast'] / df['Min']) * 90).fillna(0)
-    
-    # 4️⃣ ΑΠΟΚΛΕΙΣΜΟΣ ΑΜΥΝΤΙΚΩΝ ΜΕΣΩΝ
-    print("🚫 Excluding defensive midfielders(DF)...")
-    df = df[(df['Pos'].str.contains('FW', na=False)) | 
-            ((df['Pos'].str.contains('MF', na=False)) & (df['Sh/90'] >= 1))].copy()
-    
-    # 5️⃣ TEAM GOAL SHARE
-    team_goals = df.groupby('Squad')['Gls'].transform('sum')
-    df['Team_Goal_Share'] = (df['Gls'] / team_goals).fillna(0)
-    df['Team_Goal_Share_NoPK'] = ((df['Gls'] - df['PK']) / team_goals).fillna(0)
-    
-    # 6️⃣ LEAGUE ADJUSTMENT
-    print("🌍 Applying league difficulty factors...")
-    if 'Comp' in df.columns:
-        df['League_Clean'] = df['Comp'].str.replace(r'^[a-z]{2,3}\s+', '', regex=True)
-        df['League_Factor'] = df['League_Clean'].map(league_weights).fillna(0.75)
-    else:
-        df['League_Factor'] = 1.0
-    
-    # 7️⃣ ADJUSTED STATS
-    df['Gls_Adj'] = df['Gls'] * df['League_Factor']
-    df['Ast_Adj'] = df['Ast'] * df['League_Factor']
-    df['G+A_Adj'] = (df['Gls'] + df['Ast']) * df['League_Factor']
-    df['Gls_NoPK_Adj'] = (df['Gls'] - df['PK']) * df['League_Factor']
-    df['Sh_per90_Adj'] = (df['Sh'] / df['Min'] * 90) * df['League_Factor']
-    
-    # 8️⃣ ROLE CLASSIFICATION
-    df['Role'] = df.apply(classify_player_role, axis=1)
-    
-    # 9️⃣ MINUTES FILTERING
-    df_final = df[df['Min'] > 450].copy()
-    df_final = df_final.reset_index(drop=True)
-    
-    # 🔟 QUALITY CHECK
-    print("\n" + "="*50)
-    print(f"✅ Data Ready: {len(df_final)} players")
-    print(f"📊 Roles Distribution:")
-    print(df_final['Role'].value_counts())
-    if 'League_Clean' in df_final.columns:
-        print(f"🌍 Leagues: {df_final['League_Clean'].nunique()}")
-    print("="*50 + "\n")
-    
-    return df_final
+    def _squad_bitmap(self, squads):
+        codes = [self._squad_lookup[squad] for squad in self._values(squads) if squad in self._squad_lookup]
+        return np.isin(self._squad_codes, codes)
+
+    def mask(self, age=None, min_minutes=None, league=None, exclude_league=None,
+             role=None, exclude_role=None, squad=None, exclude_squad=None):
+
+        """
+        Bitmap των γραμμών που περνούν τα predicates (βλ. FILTER_KEYS). None = χωρίς φίλτρο.
+        """
+
+        mask = np.ones(self.size, dtype=bool)
+
+        if role is not None:
+            mask &= self._any_bitmap(self.roles, role)
+        if exclude_role is not None:
+            mask &= ~self._any_bitmap(self.roles, exclude_role)
+        if league is not None:
+            mask &= self._any_bitmap(self.leagues, league)
+        if exclude_league is not None:
+            mask &= ~self._any_bitmap(self.leagues, exclude_league)
+        if squad is not None:
+            mask &= self._squad_bitmap(squad)
+        if exclude_squad is not None:
+            mask &= ~self._squad_bitmap(exclude_squad)
+        if age is not None:
+            mask &= self._in_range('Age', *age)
+        if min_minutes is not None:
+            mask &= self._in_range('Min', low=min_minutes)
+
+        return mask
+
+    @metrics.timed('browse.query')
+    def rows(self, role=None, league=None, age_range=None, min_minutes=None, sort='Gls'):
+
+        """
+        Οι θέσεις γραμμών που περνούν τα φίλτρα, ταξινομημένες κατά sort.
+
+        Args:
+            role (str): Ρόλος (None = όλοι)
+            league (str): League_Clean (ή Comp) (None = όλες)
+            age_range (tuple): (min, max) ηλικία, inclusive (None = χωρίς φίλτρο)
+            min_minutes (float): Ελάχιστα λεπτά (None = χωρίς φίλτρο)
+            sort (str): Μία από τις BROWSE_SORTS
+
+        Returns:
+            np.ndarray: Θέσεις γραμμών (για df.iloc) με φθίνουσα τιμή του sort
+        """
+
+        if sort not in self.orders:
+            raise ValueError(f"sort must be one of {list(self.orders)}")
+
+        mask = self.mask(age=age_range, min_minutes=min_minutes, league=league, role=role)
+
+        order = self.orders[sort]
+        return order[mask[order]]
 
 
 
@@ -297,6 +2479,9 @@ def find_similar_players(df, n_neighbors=10):
 
 
     # ========== ΜΕΡΟΣ 1: SEARCH ENGINE ==========
+    # Το index ονομάτων χτίζεται μία φορά (accent folding, prefixes, typos)
+    name_index = NameIndex(df['Player'])
+    
     while True:
         query = input("🔎 Ποιον παίκτη ψάχνεις; (Γράψε 'exit' για έξοδο): ").strip()
         
@@ -304,8 +2489,10 @@ def find_similar_players(df, n_neighbors=10):
             print("👋 Έξοδος από το πρόγραμμα.")
             return None, None
         
-        matches = df[df['Player'].str.contains(query, case=False, na=False)]
+        hits = name_index.search(query)
+        matches = df.iloc[[row for row, _ in hits]]
         count_matches = len(matches)
+        fuzzy = count_matches > 0 and hits[0][1] < NameIndex.SUBSTRING
         
         # ❌ ΠΕΡΙΠΤΩΣΗ 1: ΔΕΝ ΒΡΕΘΗΚΕ ΚΑΝΕΙΣ
         if count_matches == 0:
@@ -313,9 +2500,12 @@ def find_similar_players(df, n_neighbors=10):
             print("💡 Tip: Δοκίμασε μόνο το επίθετο (π.χ. 'Haaland')")
             continue
         
-        # 👥 ΠΕΡΙΠΤΩΣΗ 2: ΒΡΕΘΗΚΑΝ ΠΟΛΛΟΙ
-        elif count_matches > 1:
-            print(f"\n👥 Βρέθηκαν {count_matches} παίκτες με το όνομα '{query}':")
+        # 👥 ΠΕΡΙΠΤΩΣΗ 2: ΒΡΕΘΗΚΑΝ ΠΟΛΛΟΙ (ή μόνο fuzzy προτάσεις)
+        elif count_matches > 1 or fuzzy:
+            if fuzzy:
+                print(f"\n🤔 Δεν βρέθηκε ακριβές match για '{query}'. Μήπως εννοείς:")
+            else:
+                print(f"\n👥 Βρέθηκαν {count_matches} παίκτες με το όνομα '{query}':")
             print("=" * 80)
             
             matches = matches.reset_index(drop=True)
@@ -369,55 +2559,26 @@ def find_similar_players(df, n_neighbors=10):
     print(f"\n⚙️ Calculating similarities using {metric_name}...")
     
     role = target['Role']
-    weights = get_weights_by_role(role)
     print(f"📊 Using weights for role: {role}")
     
-    # Προετοιμασία Feature Data
-    feature_data = pd.DataFrame()
-    final_weights = {}
-    
-    for feat, w in weights.items():
-        if feat in df.columns:
-            feature_data[feat] = df[feat]
-            final_weights[feat] = w
+    # Το engine χτίζεται μία φορά ανά df (scaling + weights για όλους τους ρόλους)
+    engine = get_engine(df)
+    features = engine.role_features(role)
     
-    if feature_data.empty:
+    if not features:
         print("❌ Error: Δεν βρέθηκαν κοινές στήλες μεταξύ weights και data.")
         return None, None
     
-    print(f"✅ Using {len(final_weights)} features: {list(final_weights.keys())}")
-    
-    # Normalization
-    scaler = MinMaxScaler()
-    scaled_data = pd.DataFrame(
-        scaler.fit_transform(feature_data), 
-        columns=feature_data.columns,
-        index=df.index
-    )
-    
-    # Apply Weights
-    for col, w in final_weights.items():
-        scaled_data[col] = scaled_data[col] * w
-    
-    # ✅ K-Nearest Neighbors με επιλεγμένο metric
-    model = NearestNeighbors(n_neighbors=n_neighbors+1, metric=metric)
-    model.fit(scaled_data)
-    
-    # Βρίσκουμε το index του target
-    target_matches = df[(df['Player'] == target['Player']) & 
-                        (df['Squad'] == target['Squad'])]
-    
-    if len(target_matches) == 0:
-        target_matches = df[df['Player'] == target['Player']]
+    print(f"✅ Using {len(features)} features: {features}")
     
-    target_idx = target_matches.index[0]
+    # ✅ K-Nearest Neighbors με επιλεγμένο metric (μόνο search, χωρίς fit)
+    # Η διαφορετικότητα (max 4 ανά λίγκα) εφαρμόζεται μέσα στην αναζήτηση, άρα έρχονται πάντα n_neighbors
+    target_idx = engine.locate(target)
+    similar_indices, similar_distances = engine.kneighbors(target_idx, metric, n_neighbors, diversity=DEFAULT_DIVERSITY)
     
-    # Εύρεση παρόμοιων
-    distances, indices = model.kneighbors(scaled_data.loc[[target_idx]])
-    
-    # Αποτελέσματα (χωρίς τον ίδιο)
-    similar_indices = indices[0][1:]
-    similar_distances = distances[0][1:]
+    if similar_indices is None:
+        print("❌ Δεν βρέθηκαν παρόμοιοι παίκτες (το προφίλ βαρών δεν έχει χρησιμοποιήσιμα βάρη).")
+        return None, None
     
     results = df.iloc[similar_indices].copy()
     
@@ -436,9 +2597,6 @@ def find_similar_players(df, n_neighbors=10):
             results['Similarity_Score'] = 100
     
     results['Similarity_Score'] = results['Similarity_Score'].clip(0, 100)
-
-    target_league = target.get('League_Clean', 'Unknown')
-    results = diversify_results(results, target_league, max_per_league=4)
     
     return target, results
 
@@ -446,125 +2604,394 @@ def find_similar_players(df, n_neighbors=10):
 
 # --- 🌍 LEAGUE DIVERSITY FILTER ---
 
-def diversify_results(results, target_league, max_per_league=4):
+def diversify_results(results, diversity=DEFAULT_DIVERSITY, k=None):
     """
-    Εξασφαλίζει ότι τα αποτελέσματα δεν είναι όλα από την ίδια λίγκα.
-    Max 4 παίκτες από την ίδια λίγκα με τον target.
+    Εξασφαλίζει ότι τα αποτελέσματα δεν είναι όλα από την ίδια λίγκα / ομάδα / ηλικία.
+    Τα results πρέπει να είναι ταξινομημένα από τον πιο παρόμοιο (ίδιοι κανόνες με
+    το SimilarityEngine.kneighbors(diversity=...), αλλά πάνω σε έτοιμο DataFrame).
+
+    Για πλήρη λίστα k παικτών προτίμησε το kneighbors/query με diversity,
+    που φέρνει επιπλέον υποψήφιους όταν χρειάζεται.
     """
-    league_counts = {}
-    final_indices = []
-    
-    for idx, row in results.iterrows():
-        league = row.get('League_Clean', 'Unknown')
-        count = league_counts.get(league, 0)
-        
-        if league == target_league and count >= max_per_league:
-            continue
-            
-        league_counts[league] = count + 1
-        final_indices.append(idx)
-        
-        if len(final_indices) == 10:
-            break
+    rules = [(rule, cap) for rule, cap in diversity.items() if cap is not None]
+
+    groups = np.array([
+        diversity_codes(results[DIVERSITY_COLUMNS[rule]] if DIVERSITY_COLUMNS.get(rule) in results.columns
+                        else np.zeros(len(results)), rule)
+        for rule, _ in rules
+    ]).reshape(len(rules), len(results))
+
+    keep = select_diverse(groups, [cap for _, cap in rules], len(results) if k is None else k)
     
-    return results.loc[final_indices]
+    return results.iloc[keep]
 
 
 
 # --- 🔍 SIMILARITY SEARCH (API VERSION για Streamlit) ---
 
-def find_similar_players_gui(df, target_player, algorithm='cosine', n_neighbors=10):
+def find_similar_players_gui(df, target_player, algorithm='cosine', n_neighbors=10, engine=None, diversity=None,
+                             filters=None, profile=None, explain=False):
     
     """
     Βρίσκει παρόμοιους παίκτες (χωρίς input() - για Streamlit/API).
     
     Args:
         df (DataFrame): Το prepared dataframe με παίκτες
-        target_player (Series): Η γραμμή του παίκτη που ψάχνουμε (df.iloc[x])
+        target_player (Series | str): Η γραμμή του παίκτη (df.iloc[x]) ή το Player_ID του
         algorithm (str): 'cosine' ή 'euclidean'
         n_neighbors (int): Πόσους παρόμοιους να βρει
+        engine (SimilarityEngine): Έτοιμο engine (αλλιώς χρησιμοποιείται το get_engine(df))
+        diversity (dict): Όρια ανά λίγκα/ομάδα/age band (π.χ. DEFAULT_DIVERSITY)
+        filters (dict): Predicates πριν το top-k, π.χ. {'age': (None, 22), 'exclude_league': 'Premier League'}
+        profile (str): Προφίλ βαρών (built-in ή custom, βλ. WEIGHT_PROFILES). Default: του ρόλου του target
+        explain (bool): Και το μερίδιο κάθε feature στην ομοιότητα ανά παίκτη (βλ. SimilarityEngine.contributions)
     
     Returns:
-        DataFrame: Παρόμοιοι παίκτες με Similarity_Score στήλη
+        DataFrame: Παρόμοιοι παίκτες με Similarity_Score στήλη.
+                   Με explain=True: (results, contributions) με ίδιο index
     """
-    metric = algorithm
-    role = target_player['Role']
-    weights = get_weights_by_role(role)
+    if engine is None:
+        engine = get_engine(df)
     
-    # Προετοιμασία Feature Data
-    feature_data = pd.DataFrame()
-    final_weights = {}
-    
-    for feat, w in weights.items():
-        if feat in df.columns:
-            feature_data[feat] = df[feat]
-            final_weights[feat] = w
-            
-    if feature_data.empty:
-        return None
-    
-    # Normalization
-    scaler = MinMaxScaler()
-    scaled_data = pd.DataFrame(
-        scaler.fit_transform(feature_data), 
-        columns=feature_data.columns,
-        index=df.index
-    )
-    
-    # Apply Weights
-    for col, w in final_weights.items():
-        scaled_data[col] = scaled_data[col] * w
-        
-    # K-Nearest Neighbors
-    model = NearestNeighbors(n_neighbors=n_neighbors+1, metric=metric)
-    model.fit(scaled_data)
-    
-    # Βρίσκουμε το index του target
-    target_matches = df[
-        (df['Player'] == target_player['Player']) &
-        (df['Squad'] == target_player['Squad'])
-    ]
-    
-    if len(target_matches) == 0:
-        target_matches = df[df['Player'] == target_player['Player']]
-        
-    if len(target_matches) == 0:
+    return engine.query(target_player, algorithm=algorithm, k=n_neighbors, diversity=diversity, filters=filters,
+                        profile=profile, explain=explain)
+
+
+def find_similar_players_batch(df, targets, algorithm='cosine', n_neighbors=10, engine=None, diversity=None,
+                               filters=None, profile=None):
+
+    """
+    Παρόμοιοι για πολλά targets μαζί (π.χ. ένα shortlist), σε ένα batched query
+    αντί για ένα find_similar_players_gui ανά target.
+
+    Args:
+        targets (list): Γραμμές παικτών (Series) ή Player_IDs
+
+    Returns:
+        dict: Player_ID -> DataFrame με Similarity_Score (ή None), με τη σειρά των targets
+    """
+    if engine is None:
+        engine = get_engine(df)
+
+    return engine.query_many(targets, algorithm=algorithm, k=n_neighbors, diversity=diversity, filters=filters,
+                             profile=profile)
+
+
+def find_similar_to_blend(df, targets, weights=None, algorithm='cosine', n_neighbors=10, engine=None, diversity=None,
+                          filters=None, profile=None):
+
+    """
+    Παρόμοιοι με τον (weighted) μέσο όρο πολλών παικτών: "ποιος παίζει σαν
+    τον μέσο όρο των A, B και C;". Τα βάρη features είναι του ρόλου του πρώτου target.
+
+    Args:
+        targets (list): Γραμμές παικτών (Series) ή Player_IDs
+        weights (list): Βάρος ανά target (default: ίσα βάρη)
+
+    Returns:
+        DataFrame: Παρόμοιοι παίκτες με Similarity_Score στήλη (χωρίς τους ίδιους τους targets)
+    """
+    if engine is None:
+        engine = get_engine(df)
+
+    check_profile(profile)
+
+    return engine.query_blend(targets, weights, algorithm=algorithm, k=n_neighbors, role=profile, diversity=diversity,
+                              filters=filters)
+
+
+
+# --- 📋 BATCH SIMILARITY (ΟΛΟΙ ΟΙ ΠΑΙΚΤΕΣ ΜΑΖΙ) ---
+
+def find_all_similar_players(df, algorithm='cosine', n_neighbors=10, engine=None, block_size=None, workers=None):
+
+    """
+    Βρίσκει τους n_neighbors πιο παρόμοιους για ΚΑΘΕ παίκτη σε ένα vectorized pass
+    (π.χ. shortlist sheets). Κάθε παίκτης χρησιμοποιεί τα βάρη του ρόλου του.
+    Με workers > 1 τα blocks μοιράζονται σε διεργασίες (βλ. parallel.neighbor_tables).
+
+    Returns:
+        DataFrame: Μία γραμμή ανά (παίκτης, γείτονας) με Rank και Similarity_Score
+    """
+
+    if engine is None:
+        engine = get_engine(df)
+
+    indices, scores = engine.own_role_neighbors(n_neighbors, algorithm, block_size, workers)
+    n, k = indices.shape
+
+    targets = np.repeat(np.arange(n), k)
+    neighbors = indices.ravel()
+
+    return pd.DataFrame({
+        'Player': engine.df['Player'].to_numpy()[targets],
+        'Squad': engine.df['Squad'].to_numpy()[targets],
+        'Rank': np.tile(np.arange(1, k + 1), n),
+        'Similar_Player': engine.df['Player'].to_numpy()[neighbors],
+        'Similar_Squad': engine.df['Squad'].to_numpy()[neighbors],
+        'Similar_Role': engine.df['Role'].to_numpy()[neighbors],
+        'Similarity_Score': scores.ravel(),
+    })
+
+
+
+# --- 📦 BATCH MODE (NON-INTERACTIVE CLI) ---
+
+# Targets ανά batched query στο batch mode (η έξοδος γράφεται ανά chunk)
+BATCH_TARGETS = 256
+
+BATCH_COLUMNS = ['Player_ID', 'Player', 'Squad', 'League_Clean', 'Role', 'Age', 'Gls', 'Ast', 'Similarity_Score']
+
+
+def read_targets(args):
+
+    """
+    Οι targets από τα arguments και από το --file / stdin (μία γραμμή ανά παίκτη).
+    """
+
+    targets = list(args.targets)
+
+    if args.file:
+        handle = sys.stdin if args.file == '-' else open(args.file, encoding='utf-8')
+        with handle:
+            targets += [line.strip() for line in handle if line.strip() and not line.startswith('#')]
+
+    return targets
+
+
+def batch_diversity(args):
+
+    """
+    Οι κανόνες διαφορετικότητας από τα arguments (None αν δεν ζητήθηκε κανένας).
+    """
+
+    if not (args.diversify or args.max_per_squad or args.max_per_age_band):
         return None
-    
-    target_idx = target_matches.index[0]
-    
-    # Εύρεση παρόμοιων
-    distances, indices = model.kneighbors(scaled_data.loc[[target_idx]])
-    
-    # Αποτελέσματα (χωρίς τον ίδιο)
-    similar_indices = indices[0][1:]
-    similar_distances = distances[0][1:]
-    
-    results = df.iloc[similar_indices].copy()
-    
-    # Διαφορετικός υπολογισμός score ανά αλγόριθμο
-    if metric == 'cosine':
-        results['Similarity_Score'] = (1 - similar_distances) * 100
-    else:  # euclidean
-        median_distance = np.median(similar_distances)
-        
-        if median_distance > 0:
-            results['Similarity_Score'] = 100 * np.exp(-similar_distances / (median_distance * 1.5))
+
+    return {
+        'league': args.max_per_league if args.diversify else None,
+        'squad': args.max_per_squad,
+        'age_band': args.max_per_age_band,
+    }
+
+
+def batch_filters(args):
+
+    """
+    Τα predicates του kNN από τα arguments (None αν δεν ζητήθηκε κανένα, βλ. FILTER_KEYS).
+    """
+
+    filters = {
+        'age': None if args.age_min is None and args.age_max is None else (args.age_min, args.age_max),
+        'min_minutes': args.min_minutes,
+        'league': args.league,
+        'exclude_league': args.exclude_league,
+        'role': args.role,
+        'exclude_role': args.exclude_role,
+        'squad': args.squad,
+        'exclude_squad': args.exclude_squad,
+    }
+
+    return {key: value for key, value in filters.items() if value is not None} or None
+
+
+def _target_hits(df, name_index, query):
+    name, _, squad = query.partition('|')
+    hits = name_index.search(name.strip())
+
+    if squad.strip():
+        squad_key = fold_name(squad)
+        hits = [hit for hit in hits if fold_name(df['Squad'].iloc[hit[0]]) == squad_key]
+
+    return hits
+
+
+def resolve_target(df, name_index, query, engine=None):
+
+    """
+    Βρίσκει τη γραμμή του target. Δέχεται Player_ID (αν δοθεί engine),
+    'Όνομα' ή 'Όνομα|Ομάδα' για ομώνυμους. Αν βρεθούν μόνο fuzzy προτάσεις
+    (score < NameIndex.SUBSTRING) επιστρέφει None (βλ. target_suggestions),
+    ώστε να μην απαντήσουμε σιωπηλά για άλλον παίκτη.
+    """
+
+    if engine is not None:
+        row = engine.locate(query.strip())
+        if row is not None:
+            return row
+
+    hits = _target_hits(df, name_index, query)
+
+    return hits[0][0] if hits and hits[0][1] >= NameIndex.SUBSTRING else None
+
+
+def target_suggestions(df, name_index, query, limit=5):
+
+    """
+    Οι fuzzy προτάσεις για ένα target που δεν βρέθηκε, ως 'Όνομα|Ομάδα'
+    (ίδιο format με το query, ώστε να ξαναδοθούν αυτούσιες).
+    """
+
+    hits = _target_hits(df, name_index, query)[:limit]
+
+    return [f"{df['Player'].iloc[row]}|{df['Squad'].iloc[row]}" for row, _ in hits]
+
+
+def run_batch(args):
+
+    """
+    Non-interactive mode: φορτώνει τα δεδομένα μία φορά, απαντάει για τα targets
+    (ανά BATCH_TARGETS σε ένα batched query) και γράφει τα αποτελέσματα (CSV/JSONL)
+    σε stdout ή αρχείο όσο προχωράει. Με --blend όλα τα targets γίνονται ένας
+    συνθετικός παίκτης (weighted μέσος όρος, βλ. kneighbors_blend).
+    Τα μηνύματα προόδου πάνε στο stderr ώστε το stdout να μένει καθαρό.
+    """
+
+    targets = read_targets(args)
+    weights = args.weights
+    blend = args.blend or weights is not None
+
+    if weights is not None and len(weights) != len(targets):
+        print(f"❌ --weights: {len(weights)} βάρη για {len(targets)} targets", file=sys.stderr)
+        return 1
+
+    # Custom προφίλ βαρών (ίδιο format με το weight_profiles.json)
+    if args.profiles:
+        WEIGHT_PROFILES.load(args.profiles)
+
+    if args.profile is not None and args.profile not in WEIGHT_PROFILES.names:
+        print(f"❌ --profile: άγνωστο προφίλ '{args.profile}'. Διαθέσιμα: {', '.join(WEIGHT_PROFILES.names)}", file=sys.stderr)
+        return 1
+
+    with contextlib.redirect_stdout(sys.stderr):
+        df = load_and_prep_data(args.data, compact=args.compact)
+
+    if df is None:
+        return 1
+
+    if args.backend == 'exact':
+        engine = get_engine(df)
+    else:
+        engine = SimilarityEngine(df, backend=args.backend, n_probe=args.n_probe)
+    name_index = NameIndex(df['Player'])
+    diversity = batch_diversity(args)
+    filters = batch_filters(args)
+    profile = args.profile
+    columns = [col for col in BATCH_COLUMNS if col in df.columns or col == 'Similarity_Score']
+
+    # Οι στήλες εξόδου ως arrays μία φορά (χωρίς pandas indexing ανά target)
+    values = {col: df[col].to_numpy() for col in columns if col != 'Similarity_Score'}
+
+    out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    writer = csv.writer(out) if args.format == 'csv' else None
+
+    if writer is not None:
+        writer.writerow(['Target', 'Target_Squad', 'Rank'] + columns)
+
+    def not_found(query):
+        suggestions = target_suggestions(df, name_index, query)
+        print(f"❌ Not found: '{query}'" + (f" (μήπως: {', '.join(suggestions)})" if suggestions else ""), file=sys.stderr)
+        if writer is None:
+            out.write(json.dumps({'query': query, 'error': 'not found', 'suggestions': suggestions}, ensure_ascii=False) + '\n')
+
+    def write(query, target, indices, distances):
+        if indices is None:
+            indices, distances = np.array([], dtype=int), np.array([])
+
+        scores = similarity_scores(distances, args.algorithm)
+
+        fields = {col: values[col][indices].tolist() for col in values}
+        fields['Similarity_Score'] = np.round(scores, 2).tolist()
+        records = [dict(zip(columns, row_values)) for row_values in zip(*(fields[col] for col in columns))]
+
+        if writer is not None:
+            for rank, record in enumerate(records, 1):
+                writer.writerow([target['Player'], target['Squad'], rank] + [record[col] for col in columns])
         else:
-            results['Similarity_Score'] = 100
-            
-    results['Similarity_Score'] = results['Similarity_Score'].clip(0, 100)
-    
-    return results
+            out.write(json.dumps({
+                'query': query,
+                'target': target['Player'],
+                'target_id': target.get('Player_ID'),
+                'squad': target['Squad'],
+                'role': target['Role'],
+                'algorithm': args.algorithm,
+                'results': records,
+            }, ensure_ascii=False) + '\n')
 
+        out.flush()
 
+    answered = 0
+    start = time.perf_counter()
 
-# --- 🚀 MAIN APP ---
+    try:
+        if blend:
+            # 🧪 Ένας συνθετικός παίκτης από όλα τα targets που βρέθηκαν
+            rows = [resolve_target(df, name_index, query, engine) for query in targets]
+            for query, row in zip(targets, rows):
+                if row is None:
+                    not_found(query)
 
-if __name__ == "__main__":
+            found = [i for i, row in enumerate(rows) if row is not None]
+            if found:
+                blend_rows = [rows[i] for i in found]
+                blend_weights = None if weights is None else [weights[i] for i in found]
+                members = df.iloc[blend_rows]
+
+                indices, distances = engine.kneighbors_blend(
+                    blend_rows, blend_weights, args.algorithm, args.k, profile, diversity, filters
+                )
+                target = {
+                    'Player': ' + '.join(members['Player']),
+                    'Player_ID': ' + '.join(members['Player_ID']) if 'Player_ID' in members.columns else None,
+                    'Squad': ' + '.join(members['Squad']),
+                    'Role': members['Role'].iloc[0],
+                }
+                write(' + '.join(targets[i] for i in found), target, indices, distances)
+                answered = len(found)
+        else:
+            for chunk_start in range(0, len(targets), BATCH_TARGETS):
+                chunk = targets[chunk_start:chunk_start + BATCH_TARGETS]
+                rows = [resolve_target(df, name_index, query, engine) for query in chunk]
+
+                # Ένα batched query για όλα τα targets του chunk
+                found = [row for row in rows if row is not None]
+                neighbors = iter(engine.kneighbors_batch(found, args.algorithm, args.k, profile, diversity, filters))
+
+                for query, row in zip(chunk, rows):
+                    if row is None:
+                        not_found(query)
+                        continue
+
+                    indices, distances = next(neighbors)
+                    write(query, df.iloc[row], indices, distances)
+                    answered += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    rate = answered / elapsed if elapsed > 0 else float('inf')
+    print(f"⚡ {answered}/{len(targets)} targets in {elapsed:.3f}s ({rate:.0f} players/s)", file=sys.stderr)
+
+    return 0
+
+
+# --- 💬 INTERACTIVE MODE ---
+
+def run_interactive(data='perfect_merge.csv', compact=None):
+
+    """
+    Interactive mode: αναζήτηση παίκτη με input() και πίνακας αποτελεσμάτων.
+    """
+
+    # Το tabulate χρειάζεται μόνο για τον πίνακα του interactive mode
+    try:
+        from tabulate import tabulate
+    except ImportError:
+        tabulate = None
 
     # 1️⃣ Φόρτωση δεδομένων
-    df_final = load_and_prep_data('perfect_merge.csv')
+    df_final = load_and_prep_data(data, compact=compact)
     
     if df_final is not None:
         # 2️⃣ Εύρεση παρόμοιων παικτών (CLI VERSION)
@@ -639,4 +3066,28 @@ if __name__ == "__main__":
             
             print("\n" + "="*100)
             print("💡 Legend: 🔥 Excellent (85%+) | ✅ Good (70-85%) | 👍 Decent (60-70%) | ⚪ Fair (<60%)")
-            print("="*100)
\ No newline at end of file
+            print("="*100)
+
+    return 0 if df_final is not None else 1
+
+
+
+# --- 🚀 MAIN APP ---
+
+if __name__ == "__main__":
+
+    # Ο parser ζει στο ελαφρύ cli.py (το `python cli.py` κάνει το ίδιο χωρίς να φορτώνει το sonar για --help)
+    from cli import build_arg_parser
+
+    # 🛰️ `python sonar.py serve ...` -> τοπικός HTTP/JSON server
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        import server
+        sys.exit(server.main(sys.argv[2:]))
+
+    args = build_arg_parser().parse_args()
+
+    # 📦 Batch mode όταν δίνονται targets (αλλιώς interactive)
+    if args.targets or args.file:
+        sys.exit(run_batch(args))
+
+    sys.exit(run_interactive(args.data, args.compact))
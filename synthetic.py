@@ -0,0 +1,243 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+
+# --- 🧪 SYNTHETIC DATASET GENERATOR ---
+
+# Οι στήλες του perfect_merge.csv (με τη σειρά τους)
+COLUMNS = [
+    'Rk', 'Player', 'Nation', 'Pos', 'Squad', 'Comp', 'Age', 'Born', 'MP', 'Starts', 'Min', '90s',
+    'Gls', 'Ast', 'G+A', 'G-PK', 'PK', 'PKatt', 'CrdY', 'CrdR',
+    'Gls.1', 'Ast.1', 'G+A.1', 'G-PK.1', 'G+A-PK',
+    'Sh', 'SoT', 'SoT%', 'Sh/90', 'SoT/90', 'G/Sh', 'G/SoT'
+]
+
+# Μικρές ομάδες (league, pos) παίρνουν τις παραμέτρους της θέσης σε όλες τις λίγκες
+MIN_GROUP_SIZE = 15
+
+# Συγκέντρωση των Beta κατανομών (ευστοχία / μετατροπή) γύρω από το μέσο της ομάδας
+BETA_CONCENTRATION = 20.0
+
+# Τα per-90 rates υπολογίζονται μόνο από παίκτες με >= 3 ολόκληρα ματς
+# (με 10 λεπτά συμμετοχής ένα σουτ δίνει 9 Sh/90 και χαλάει τη διασπορά)
+MIN_RATE_MINUTES = 270
+
+PLAYERS_PER_SQUAD = 27
+
+
+def gamma_params(values):
+
+    """
+    Method of moments για Gamma(shape, scale). Επιστρέφει (shape, scale).
+    """
+
+    mean, var = float(np.mean(values)), float(np.var(values))
+
+    if mean <= 0:
+        return 1.0, 0.0
+    if var <= 0:
+        return 100.0, mean / 100.0
+
+    return mean ** 2 / var, var / mean
+
+
+def fit_profile(reference):
+
+    """
+    Παράμετροι ανά (Comp, Pos) από το πραγματικό dataset: συχνότητες ομάδων,
+    εμπειρικά λεπτά/ηλικίες και Gamma/Beta κατανομές για τα per-90 stats.
+    """
+
+    ref = reference.copy()
+    for col in ['Min', 'Age', 'Sh', 'SoT', 'Gls', 'Ast', 'PK', 'PKatt', 'CrdY', 'CrdR']:
+        ref[col] = pd.to_numeric(ref[col], errors='coerce').fillna(0)
+
+    ref = ref[ref['Min'] > 0]
+    ref = ref.assign(
+        nineties=ref['Min'] / 90,
+        sh90=ref['Sh'] / (ref['Min'] / 90),
+        ast90=ref['Ast'] / (ref['Min'] / 90),
+        pk90=ref['PKatt'] / (ref['Min'] / 90),
+        crd90=ref['CrdY'] / (ref['Min'] / 90),
+    )
+
+    def group_params(group):
+        regular = group[group['Min'] >= MIN_RATE_MINUTES]
+        rates = regular if len(regular) >= 5 else group
+        shots, on_target = group['Sh'].sum(), group['SoT'].sum()
+        non_pk_goals = (group['Gls'] - group['PK']).clip(lower=0).sum()
+
+        return {
+            'minutes': group['Min'].to_numpy(),
+            'ages': group['Age'][group['Age'] > 0].to_numpy(),
+            'sh90': gamma_params(rates['sh90']),
+            'ast90': gamma_params(rates['ast90']),
+            'pk90': gamma_params(rates['pk90']),
+            'crd90': gamma_params(rates['crd90']),
+            'p_sot': on_target / shots if shots else 0.3,
+            'p_goal': non_pk_goals / on_target if on_target else 0.3,
+            'p_pk': group['PK'].sum() / group['PKatt'].sum() if group['PKatt'].sum() else 0.75,
+            'p_red': group['CrdR'].sum() / max(len(group), 1),
+        }
+
+    by_position = {pos: group_params(group) for pos, group in ref.groupby('Pos')}
+
+    groups = []
+    for (comp, pos), group in ref.groupby(['Comp', 'Pos']):
+        params = group_params(group) if len(group) >= MIN_GROUP_SIZE else by_position[pos]
+        groups.append({'Comp': comp, 'Pos': pos, 'weight': len(group), **params})
+
+    return {
+        'groups': groups,
+        'squads': {comp: sorted(group['Squad'].unique()) for comp, group in reference.groupby('Comp')},
+        'nations': reference['Nation'].dropna().to_numpy(),
+        'max_matches': int(pd.to_numeric(reference['MP'], errors='coerce').max()),
+        'max_minutes': float(ref['Min'].max()),
+    }
+
+
+def beta(rng, mean, size):
+
+    """
+    Beta με δεδομένο μέσο όρο (per-player ευστοχία γύρω από τον μέσο της ομάδας).
+    """
+
+    mean = np.clip(mean, 0.01, 0.99)
+    return rng.beta(mean * BETA_CONCENTRATION, (1 - mean) * BETA_CONCENTRATION, size)
+
+
+def generate_players(n, reference='perfect_merge.csv', seed=0):
+
+    """
+    Παράγει n παίκτες στο schema του perfect_merge.csv, με κατανομές ανά λίγκα
+    και θέση που βγαίνουν από το πραγματικό dataset (reference).
+
+    Όλα τα παράγωγα stats είναι συνεπή μεταξύ τους
+    (π.χ. SoT <= Sh, Gls <= SoT + PK, SoT% = SoT / Sh, Sh/90 = Sh / 90s).
+
+    Args:
+        n (int): Πλήθος παικτών
+        reference (str | DataFrame): Το πραγματικό dataset για το fit των κατανομών
+        seed (int): Seed για αναπαραγωγιμότητα
+
+    Returns:
+        DataFrame: Συνθετικά δεδομένα (μορφή perfect_merge.csv)
+    """
+
+    if isinstance(reference, str):
+        reference = pd.read_csv(reference)
+
+    profile = fit_profile(reference)
+    groups = profile['groups']
+    rng = np.random.default_rng(seed)
+
+    weights = np.array([group['weight'] for group in groups], dtype=float)
+    group_ids = rng.choice(len(groups), size=n, p=weights / weights.sum())
+
+    columns = {name: np.zeros(n) for name in ['Min', 'Age', 'Sh', 'SoT', 'Gls', 'Ast', 'PK', 'PKatt', 'CrdY', 'CrdR']}
+    comp = np.empty(n, dtype=object)
+    pos = np.empty(n, dtype=object)
+
+    for gid, group in enumerate(groups):
+        idx = np.flatnonzero(group_ids == gid)
+        size = len(idx)
+        if size == 0:
+            continue
+
+        comp[idx] = group['Comp']
+        pos[idx] = group['Pos']
+
+        # Λεπτά & ηλικίες: εμπειρική κατανομή της ομάδας + λίγος θόρυβος
+        minutes = rng.choice(group['minutes'], size) * rng.uniform(0.9, 1.1, size)
+        minutes = np.clip(np.round(minutes), 1, profile['max_minutes'])
+        nineties = minutes / 90
+
+        ages = group['ages'] if len(group['ages']) else np.array([25])
+        columns['Age'][idx] = rng.choice(ages, size)
+        columns['Min'][idx] = minutes
+
+        # Per-90 ρυθμοί ανά παίκτη (Gamma) -> counts (Poisson / Binomial)
+        sh90 = rng.gamma(*group['sh90'], size) if group['sh90'][1] > 0 else np.zeros(size)
+        ast90 = rng.gamma(*group['ast90'], size) if group['ast90'][1] > 0 else np.zeros(size)
+        pk90 = rng.gamma(*group['pk90'], size) if group['pk90'][1] > 0 else np.zeros(size)
+        crd90 = rng.gamma(*group['crd90'], size) if group['crd90'][1] > 0 else np.zeros(size)
+
+        shots = rng.poisson(sh90 * nineties)
+        pk_att = np.minimum(rng.poisson(pk90 * nineties), shots)
+        on_target = rng.binomial(shots - pk_att, beta(rng, group['p_sot'], size)) + pk_att
+        pk = rng.binomial(pk_att, group['p_pk'])
+        goals = rng.binomial(on_target - pk_att, beta(rng, group['p_goal'], size)) + pk
+
+        columns['Sh'][idx] = shots
+        columns['SoT'][idx] = on_target
+        columns['PKatt'][idx] = pk_att
+        columns['PK'][idx] = pk
+        columns['Gls'][idx] = goals
+        columns['Ast'][idx] = rng.poisson(ast90 * nineties)
+        columns['CrdY'][idx] = rng.poisson(crd90 * nineties)
+        columns['CrdR'][idx] = rng.binomial(1, min(group['p_red'], 1.0), size)
+
+    df = pd.DataFrame({name: values.astype(int) for name, values in columns.items() if name != 'Min'})
+    df['Min'] = columns['Min']
+
+    # Ομάδες: οι πραγματικές κάθε λίγκας + συνθετικές όταν δεν φτάνουν για το n
+    squads = np.empty(n, dtype=object)
+    for league, real_squads in profile['squads'].items():
+        idx = np.flatnonzero(comp == league)
+        needed = max(len(real_squads), int(np.ceil(len(idx) / PLAYERS_PER_SQUAD)))
+        names = list(real_squads) + [f"{league.split(' ', 1)[-1]} FC {i:04d}" for i in range(needed - len(real_squads))]
+        squads[idx] = np.array(names, dtype=object)[rng.integers(0, len(names), len(idx))]
+
+    nineties = df['Min'] / 90
+    matches = np.ceil(df['Min'] / rng.uniform(55, 90, n)).clip(1, profile['max_matches']).astype(int)
+
+    df['Rk'] = np.arange(1, n + 1)
+    df['Player'] = [f"Player {i:07d}" for i in range(n)]
+    df['Nation'] = rng.choice(profile['nations'], n)
+    df['Pos'] = pos
+    df['Squad'] = squads
+    df['Comp'] = comp
+    df['Born'] = 2025 - df['Age']
+    df['MP'] = matches
+    df['Starts'] = np.minimum(matches, np.round(df['Min'] / 90)).astype(int)
+    df['90s'] = nineties.round(1)
+    df['G+A'] = df['Gls'] + df['Ast']
+    df['G-PK'] = df['Gls'] - df['PK']
+
+    per90 = np.where(nineties > 0, 1 / nineties, 0)
+    df['Gls.1'] = (df['Gls'] * per90).round(2)
+    df['Ast.1'] = (df['Ast'] * per90).round(2)
+    df['G+A.1'] = (df['G+A'] * per90).round(2)
+    df['G-PK.1'] = (df['G-PK'] * per90).round(2)
+    df['G+A-PK'] = ((df['G-PK'] + df['Ast']) * per90).round(2)
+
+    shots = df['Sh'].to_numpy(dtype=float)
+    on_target = df['SoT'].to_numpy(dtype=float)
+    goals = df['Gls'].to_numpy(dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df['SoT%'] = np.round(np.where(shots > 0, on_target / shots * 100, 0), 1)
+        df['Sh/90'] = (df['Sh'] * per90).round(2)
+        df['SoT/90'] = (df['SoT'] * per90).round(2)
+        df['G/Sh'] = np.round(np.where(shots > 0, goals / shots, 0), 2)
+        df['G/SoT'] = np.round(np.where(on_target > 0, goals / on_target, 0), 2)
+
+    return df[COLUMNS]
+
+
+# --- 🚀 MAIN ---
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="🔱 Project Trident - synthetic dataset generator")
+    parser.add_argument('rows', type=int, help="Πλήθος παικτών (π.χ. 1000, 10000, 100000, 1000000)")
+    parser.add_argument('-o', '--output', help="Αρχείο εξόδου (default: synthetic_<rows>.csv)")
+    parser.add_argument('--reference', default='perfect_merge.csv', help="Πραγματικό dataset για το fit")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    output = args.output or f"synthetic_{args.rows}.csv"
+    generate_players(args.rows, args.reference, args.seed).to_csv(output, index=False)
+    print(f"✅ {args.rows} synthetic players -> {output}")
@@ -0,0 +1,40 @@
+import contextlib
+import io
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Τα modules του project είναι flat στη ρίζα του repo (χωρίς package)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import sonar
+import synthetic
+
+
+# Μικρό συνθετικό dataset (ίδιες κατανομές με το perfect_merge.csv), σταθερό seed
+N_PLAYERS = 800
+
+
+@pytest.fixture(scope='session')
+def raw():
+    return synthetic.generate_players(N_PLAYERS, os.path.join(ROOT, 'perfect_merge.csv'), seed=0)
+
+
+@pytest.fixture(scope='session')
+def df(raw):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return sonar.prep_player_data(raw)
+
+
+@pytest.fixture(scope='session')
+def engine(df):
+    return sonar.SimilarityEngine(df)
+
+
+@pytest.fixture(scope='session')
+def rows(df):
+    # Τα targets των ελέγχων ισοδυναμίας (single vs batch / filtered / parallel)
+    return sorted(int(row) for row in np.random.default_rng(1).choice(len(df), 12, replace=False))
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+import sonar
+
+
+# --- 📋 kneighbors_batch / kneighbors_blend == single queries ---
+
+DIVERSITY = (None, sonar.DEFAULT_DIVERSITY, {'league': 1, 'squad': 1})
+
+
+@pytest.mark.parametrize('algorithm', sonar.SimilarityEngine.METRICS)
+@pytest.mark.parametrize('diversity', DIVERSITY)
+@pytest.mark.parametrize('role', [None, '⚽ Striker'])
+def test_batch_equals_single(engine, rows, algorithm, diversity, role):
+    batch = engine.kneighbors_batch(rows, algorithm, 10, role, diversity, block_size=5)
+
+    for row, (indices, distances) in zip(rows, batch):
+        single = engine.kneighbors(row, algorithm, 10, role, diversity)
+        assert np.array_equal(indices, single[0]) and np.array_equal(distances, single[1]), row
+
+
+@pytest.mark.parametrize('algorithm', sonar.SimilarityEngine.METRICS)
+def test_blend_of_one_equals_single(engine, rows, algorithm):
+    for row in rows[:4]:
+        indices, distances = engine.kneighbors_blend([row], None, algorithm, 10)
+        single = engine.kneighbors(row, algorithm, 10)
+        assert np.array_equal(indices, single[0]) and np.allclose(distances, single[1]), row
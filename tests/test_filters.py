@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import sonar
+
+
+# --- 🔧 Filtered kNN == unfiltered αποστάσεις + post-filter ---
+
+def filter_mask(df, filters):
+
+    """
+    Τα predicates του filters με pandas, ανεξάρτητα από το BrowseIndex.
+    """
+
+    mask = pd.Series(True, index=df.index)
+    as_list = lambda value: [value] if isinstance(value, str) else list(value)
+
+    if 'age' in filters:
+        low, high = filters['age']
+        if low is not None:
+            mask &= df['Age'] >= low
+        if high is not None:
+            mask &= df['Age'] <= high
+    if 'min_minutes' in filters:
+        mask &= df['Min'] >= filters['min_minutes']
+
+    for key, col in (('league', 'League_Clean'), ('role', 'Role'), ('squad', 'Squad')):
+        if key in filters:
+            mask &= df[col].isin(as_list(filters[key]))
+        if f'exclude_{key}' in filters:
+            mask &= ~df[col].isin(as_list(filters[f'exclude_{key}']))
+
+    return mask.to_numpy().copy()
+
+
+def post_filtered(engine, row, algorithm, k, filters):
+    distances = engine.distances([row], algorithm, engine.df['Role'].iloc[row])[0]
+
+    passes = filter_mask(engine.df, filters)
+    passes[row] = False
+    candidates = np.flatnonzero(passes)
+
+    order = np.lexsort((candidates, distances[candidates]))[:k]
+    return candidates[order], distances[candidates][order]
+
+
+def filter_cases(df):
+    squads = df['Squad'].value_counts().index[:3].tolist()
+    leagues = df['League_Clean'].value_counts().index[:2].tolist()
+
+    return [
+        {'age': (None, 22)},
+        {'age': (None, 22), 'exclude_league': leagues[0]},
+        {'league': leagues, 'min_minutes': 1500},
+        {'role': sonar.ROLES[1], 'exclude_squad': squads[0]},
+        {'squad': squads, 'age': (25, 29)},
+        {'age': (40, 41)},
+        {'min_minutes': 0},
+        {'exclude_role': sonar.ROLES[:4], 'age': (21, None)},
+    ]
+
+
+@pytest.mark.parametrize('algorithm', sonar.SimilarityEngine.METRICS)
+def test_filtered_equals_post_filtered(engine, rows, algorithm):
+    for filters in filter_cases(engine.df):
+        batch = engine.kneighbors_batch(rows, algorithm, 10, filters=filters)
+
+        for row, (batch_indices, batch_distances) in zip(rows, batch):
+            indices, distances = engine.kneighbors(row, algorithm, 10, filters=filters)
+            expected_indices, expected_distances = post_filtered(engine, row, algorithm, 10, filters)
+
+            assert np.array_equal(indices, expected_indices), (filters, row)
+            assert np.allclose(distances, expected_distances, atol=1e-9), (filters, row)
+            assert np.array_equal(batch_indices, indices) and np.array_equal(batch_distances, distances)
+
+
+def test_filtered_with_diversity_respects_filters(engine, rows):
+    filters = {'age': (None, 24)}
+    passes = filter_mask(engine.df, filters)
+
+    for row in rows:
+        indices, _ = engine.kneighbors(row, 'cosine', 10, diversity={'league': 2}, filters=filters)
+        assert passes[indices].all()
@@ -0,0 +1,86 @@
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import sonar
+
+
+# --- 🔄 LiveDataset.apply_update == πλήρες rebuild ---
+
+def assert_rebuild_equal(live):
+
+    """
+    Το df και ο engine του LiveDataset ταυτίζονται με prep_player_data(raw) +
+    SimilarityEngine από την αρχή (πίνακες ρόλων, lookup και queries).
+    """
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        full = sonar.prep_player_data(live.raw)
+
+    pd.testing.assert_frame_equal(live.df, full)
+
+    fresh = sonar.SimilarityEngine(full)
+    for role, profile in live.engine._profiles.items():
+        expected = fresh.profile(role)
+        if profile is None:
+            assert expected is None
+            continue
+
+        for metric, (matrix, sq_norms) in profile.items():
+            assert np.array_equal(matrix, expected[metric][0]), (role, metric)
+            if sq_norms is not None:
+                assert np.array_equal(sq_norms, expected[metric][1]), (role, metric)
+
+    assert live.engine._by_key == fresh._by_key
+
+    for row in range(0, len(full), max(1, len(full) // 10)):
+        for algorithm in sonar.SimilarityEngine.METRICS:
+            pd.testing.assert_frame_equal(
+                live.engine.query(full.iloc[row], algorithm, 10), fresh.query(full.iloc[row], algorithm, 10)
+            )
+
+
+@pytest.fixture
+def live(raw):
+    return sonar.LiveDataset(raw)
+
+
+def test_stat_change(live):
+    player = live.df.iloc[5]
+    live.apply_update([{'Player': player['Player'], 'Squad': player['Squad'], 'Ast': int(player['Ast']) + 1}])
+    assert_rebuild_equal(live)
+
+
+def test_player_leaves_and_enters(live):
+    player = live.df.iloc[7]
+    live.apply_update([{'Player': player['Player'], 'Squad': player['Squad'], 'Min': 300}])
+    assert_rebuild_equal(live)
+
+    low = live.pool[live.pool['Min'] <= 450].iloc[0]
+    live.apply_update([{'Player': low['Player'], 'Squad': low['Squad'], 'Min': 900}])
+    assert_rebuild_equal(live)
+
+
+def test_insert_with_rescale(live, raw):
+    new = raw.iloc[[0]].copy()
+    new['Player'], new['Squad'], new['Min'], new['Gls'] = 'Zz New', live.df['Squad'].iloc[0], 2000, 99
+
+    live.apply_update(new)
+    assert_rebuild_equal(live)
+
+
+def test_batch_update(live):
+    delta = live.raw.sample(50, random_state=0)[['Player', 'Squad', 'Gls', 'Min']].copy()
+    delta['Gls'] = pd.to_numeric(delta['Gls'], errors='coerce').fillna(0) + 1
+
+    live.apply_update(delta)
+    assert_rebuild_equal(live)
+
+
+def test_new_column(live):
+    player = live.df.iloc[3]
+    live.apply_update([{'Player': player['Player'], 'Squad': player['Squad'], 'Extra': 1}])
+    assert_rebuild_equal(live)
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+import parallel
+import sonar
+
+
+# --- 🧵 Parallel builds == σειριακό build ---
+
+@pytest.mark.parametrize('algorithm', sonar.SimilarityEngine.METRICS)
+def test_parallel_neighbors_equal_serial(engine, algorithm, monkeypatch):
+    calls = []
+    neighbor_tables = parallel.neighbor_tables
+    monkeypatch.setattr(parallel, 'neighbor_tables', lambda *args: calls.append(args) or neighbor_tables(*args))
+
+    serial = engine.own_role_neighbors(10, algorithm, workers=1)
+    assert not calls
+
+    shared = engine.own_role_neighbors(10, algorithm, workers=2)
+    assert calls, "the process pool was not used"
+
+    for expected, result in zip(serial, shared):
+        assert np.array_equal(expected, result)
+
+
+def test_parallel_profiles_equal_serial(df, engine):
+    threaded = sonar.SimilarityEngine(df, workers=2)
+
+    for role, profile in engine._profiles.items():
+        if profile is None:
+            assert threaded._profiles[role] is None
+            continue
+
+        for metric, (matrix, _) in profile.items():
+            assert np.array_equal(matrix, threaded._profiles[role][metric][0]), (role, metric)